@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+"""Compare the cost of building objects from their dictionaries.
+
+Usage: python3 -m benchmarks.hydration [number of records]
+
+"baseline" re-implements the path reload() took before the class
+registry: the class found by eval(), then the old __init__ drawing a new
+id and two datetimes before copying the attributes and parsing the dates
+with strptime(). "kwargs" is cls(**value) with the current __init__, and
+"from_dict" is the path reload() takes now.
+"""
+import sys
+import timeit
+import uuid
+from datetime import datetime
+import models
+from models import classes
+from models.engine.file_storage import FileStorage
+
+
+def baseline(value):
+    """Build an object from its dictionary the way reload() used to."""
+    obj = object.__new__(eval(value["__class__"], vars(models)))
+    obj.__dict__["id"] = str(uuid.uuid4())
+    obj.__dict__["created_at"] = datetime.now()
+    obj.__dict__["updated_at"] = datetime.now()
+    for key, item in value.items():
+        if key in ("created_at", "updated_at") and \
+                not isinstance(item, datetime):
+            item = datetime.strptime(item, "%Y-%m-%dT%H:%M:%S.%f")
+        if key != "__class__":
+            obj.__dict__[key] = item
+    return obj
+
+
+def main(count=20000):
+    """Print the time per record of each hydration path."""
+    values = [classes[name]().to_dict()
+              for name in ("Place", "User", "Review", "City")
+              for _ in range(count // 4)]
+    FileStorage._FileStorage__objects.clear()
+    for value in values:
+        # the old path only parsed dates written with microseconds
+        for key in ("created_at", "updated_at"):
+            value[key] = datetime.fromisoformat(value[key]).isoformat(
+                timespec="microseconds")
+    paths = {
+        "baseline": lambda: [baseline(value) for value in values],
+        "kwargs": lambda: [classes[value["__class__"]](**value)
+                           for value in values],
+        "from_dict": lambda: [classes[value["__class__"]].from_dict(value)
+                              for value in values],
+    }
+    for name, path in paths.items():
+        seconds = min(timeit.repeat(path, number=1, repeat=5))
+        print("{:<10} {:8.2f} us/record".format(
+            name, seconds / len(values) * 1e6))
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,66 @@
+#!/usr/bin/python3
+"""Compare Place.search() with a scan of every place.
+
+Usage: python3 -m benchmarks.place_search [number of places]
+
+The places are only created in memory, the storage file isn't written.
+"""
+import random
+import sys
+import time
+from models import storage
+from models.engine import column_store
+from models.place import Place
+
+
+def main(count=1000000):
+    """Print the best of 5 times of each way to run the same query."""
+    random.seed(0)
+    cities = ["city-{}".format(i) for i in range(100)]
+    start = time.perf_counter()
+    for i in range(count):
+        storage.new(Place.from_dict({
+            "id": str(i), "__class__": "Place",
+            "created_at": "2024-01-01T00:00:00.000000",
+            "updated_at": "2024-01-01T00:00:00.000000",
+            "city_id": random.choice(cities),
+            "price_by_night": random.randrange(20, 500),
+            "max_guest": random.randrange(1, 10),
+            "number_rooms": random.randrange(1, 6),
+            "number_bathrooms": random.randrange(1, 4)}))
+    storage.columns(Place)
+    print("{} places created in {:.1f} s".format(
+        count, time.perf_counter() - start))
+
+    def scan():
+        return [obj.id for obj in storage.all(Place).values()
+                if obj.price_by_night <= 100 and obj.max_guest >= 4 and
+                obj.number_rooms >= 2 and obj.number_bathrooms >= 1]
+
+    def search():
+        return Place.search(max_price=100, min_guests=4, min_rooms=2,
+                            min_bathrooms=1)
+
+    def scan_city():
+        return [obj.id for obj in storage.all(Place).values()
+                if obj.city_id == "city-7" and obj.price_by_night <= 100 and
+                obj.max_guest >= 4]
+
+    def search_city():
+        return Place.search(city_id="city-7", max_price=100, min_guests=4)
+
+    print("search runs on", "NumPy" if column_store.numpy else "Python")
+    for name, run in (("scan", scan), ("search", search),
+                      ("scan, city", scan_city),
+                      ("search, city", search_city)):
+        times = []
+        for _ in range(5):
+            start = time.perf_counter()
+            found = run()
+            times.append(time.perf_counter() - start)
+        print("{:<13} {:8.1f} ms  {} places".format(
+            name, min(times) * 1000, len(found)))
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -2,29 +2,18 @@
 """Console's Module."""
 
 import cmd
-from models import storage
+from models import classes, storage
+from models.base_model import LazyDatetime
+from models.engine.aggregate import KEYS
 import re
 from shlex import split
-from models.base_model import BaseModel
-from models.user import User
-from models.state import State
-from models.city import City
-from models.place import Place
-from models.amenity import Amenity
-from models.review import Review
 
 
 class HBNBCommand(cmd.Cmd):
     """The console class."""
 
     prompt = "(hbnb) "
-    __classes = {"BaseModel",
-                 "User",
-                 "State",
-                 "City",
-                 "Place",
-                 "Amenity",
-                 "Review"}
+    __saving = False
 
     def default(self, arg):
         """Handle invalid input."""
@@ -34,6 +23,12 @@ class HBNBCommand(cmd.Cmd):
             "destroy": self.do_destroy,
             "count": self.do_count,
             "update": self.do_update,
+            "where": self.do_where,
+            "search": self.do_search,
+            "near": self.do_near,
+            "within": self.do_within,
+            "find": self.do_find,
+            "aggregate": self.do_aggregate,
         }
         match = re.search(r"\.", arg)
         if match is not None:
@@ -47,6 +42,35 @@ class HBNBCommand(cmd.Cmd):
         print("*** Unknown command: {}".format(arg))
         return False
 
+    def postcmd(self, stop, line):
+        """Report the end of a background save."""
+        if self.__saving:
+            status = storage.bgsave_status()
+            if status != "in progress":
+                self.__saving = False
+                if status == "err":
+                    print("** background save failed **")
+                else:
+                    print("Background saving terminated with success")
+        return stop
+
+    def do_bgsave(self, arg):
+        """Save all instances to the JSON file from a child process.
+
+        The console goes on while the file is written.
+        Usage: bgsave
+        """
+        try:
+            started = storage.bgsave()
+        except ValueError as error:
+            print("** {} **".format(error))
+            return False
+        if started:
+            self.__saving = True
+            print("Background saving started")
+        else:
+            print("** background save already in progress **")
+
     def do_count(self, arg):
         """Return the number of count.
 
@@ -54,19 +78,64 @@ class HBNBCommand(cmd.Cmd):
         Example: User.count().
         """
         argl = parsing(arg)
-        count = 0
-        for obj in storage.all().values():
-            if argl[0] == obj.__class__.__name__:
-                count += 1
-        print(count)
+        if len(argl) == 0:
+            print(storage.count())
+        else:
+            print(storage.count(argl[0]))
+
+    def do_aggregate(self, arg):
+        """Print aggregates of attributes of the instances of a class.
+
+        The functions are count, sum, min, max and avg; by groups the
+        instances by the values of an attribute, or by the domain of an
+        email or the year of a date with by=<attr>@domain or
+        by=<attr>@year. The instances are counted when no function is
+        given.
+        Usage: aggregate <class_name> <function>=<attribute> ... by=<attr>
+        or   : <class_name>.aggregate(<function>=<attribute>, by=<attr>)
+        Example: Place.aggregate(avg=price_by_night, by=city_id)
+        Example: User.aggregate(by=email@domain)
+        """
+        argl = parsing(arg)
+        if len(argl) == 0:
+            print("** class name missing **")
+            return False
+        if argl[0] not in classes:
+            print("** class doesn't exist **")
+            return False
+        functions = {}
+        for item in ",".join(argl[1:]).split(","):
+            if not item:
+                continue
+            if item.count("=") != 1:
+                print("** invalid arguments: {} **".format(item))
+                return False
+            function, attr = item.split("=")
+            functions[function] = attr
+        by = functions.pop("by", None)
+        key = None
+        if by is not None and "@" in by:
+            by, name = by.split("@", 1)
+            key = KEYS.get(name)
+            if key is None:
+                print("** invalid arguments: {} **".format(
+                    ", ".join(argl[1:])))
+                return False
+        try:
+            print(storage.aggregate(argl[0], by=by, key=key, **functions))
+        except ValueError:
+            print("** invalid arguments: {} **".format(", ".join(argl[1:])))
+            return False
 
     def do_EOF(self, line):
         """EOF command to EOF the program."""
+        storage.flush()
         print("")
         return True
 
     def do_quit(self, arg):
         """Quit command to exit the program."""
+        storage.flush()
         print("")
         return True
 
@@ -83,12 +152,111 @@ class HBNBCommand(cmd.Cmd):
         argv = parsing(arg)
         if len(argv) == 0:
             print("** class name missing **")
-        elif argv[0] not in HBNBCommand.__classes:
+        elif argv[0] not in classes:
             print("** class doesn't exist **")
         else:
-            print(eval(argv[0])().id)
+            print(classes[argv[0]]().id)
             storage.save()
 
+    def do_find(self, arg):
+        """Print the ids of the instances whose texts hold words.
+
+        All the words must be found, or any of them when joined by OR.
+        The best matches come first.
+        Usage: find <class_name> <word> ...
+        or   : <class_name>.find("<word> OR <word>")
+        Example: Place.find("pool OR garden")
+        """
+        argl = parsing(arg)
+        if len(argl) == 0:
+            print("** class name missing **")
+            return False
+        if argl[0] not in classes:
+            print("** class doesn't exist **")
+            return False
+        if storage.text_index(argl[0]) is None:
+            print("** class has no text index **")
+            return False
+        objs = storage.find(argl[0], " ".join(argl[1:]))
+        print([obj.id for obj in objs])
+
+    def do_near(self, arg):
+        """Print the ids of the instances nearest to a position.
+
+        Usage: near <class_name> <latitude> <longitude> [<k>]
+        or   : <class_name>.near(<latitude>, <longitude>, <k>)
+        Example: Place.near(33.57, -7.59, 5)
+        """
+        self.__spatial("near", arg)
+
+    def do_within(self, arg):
+        """Print the ids of the instances within a circle or a box.
+
+        Usage: within <class_name> <latitude> <longitude> <radius in km>
+        or   : within <class_name> <south> <west> <north> <east>
+        or   : <class_name>.within(...)
+        Example: Place.within(33.57, -7.59, 10)
+        """
+        self.__spatial("within", arg)
+
+    def __spatial(self, query, arg):
+        """Run a spatial query of a class with the numbers of arg."""
+        argl = parsing(arg)
+        if len(argl) == 0:
+            print("** class name missing **")
+            return
+        if argl[0] not in classes:
+            print("** class doesn't exist **")
+            return
+        if not hasattr(classes[argl[0]], query):
+            print("** class has no position **")
+            return
+        try:
+            numbers = [float(value) for value in argl[1:]]
+            print(getattr(classes[argl[0]], query)(*numbers))
+        except (TypeError, ValueError):
+            print("** invalid arguments: {} **".format(", ".join(argl[1:])))
+
+    def do_search(self, arg):
+        """Print the ids of the instances matching search criteria.
+
+        Usage: search <class_name> <criterion>=<value> ...
+        or   : <class_name>.search(<criterion>=<value>, ...)
+        Example: Place.search(city_id="0001", max_price=100, min_guests=4)
+        The criteria of Place are city_id, max_price, min_guests,
+        min_rooms and min_bathrooms.
+        """
+        argl = parsing(arg)
+        if len(argl) == 0:
+            print("** class name missing **")
+            return False
+        if argl[0] not in classes:
+            print("** class doesn't exist **")
+            return False
+        cls = classes[argl[0]]
+        if not hasattr(cls, "search"):
+            print("** class can't be searched **")
+            return False
+        criteria = {}
+        for item in argl[1:]:
+            if "=" not in item:
+                print("** invalid criteria: {} **".format(item))
+                return False
+            attr, value = item.split("=", 1)
+            if attr != "city_id":
+                try:
+                    value = float(value)
+                except ValueError:
+                    print("** invalid criteria: {} **".format(item))
+                    return False
+            criteria[attr] = value
+        try:
+            print(cls.search(**criteria))
+        except TypeError:
+            print("** invalid criteria: {} **".format(
+                ", ".join(argl[1:])))
+            return False
+
     def do_show(self, arg):
         """
         Print the string representation of an instance based on the class name.
@@ -97,17 +265,16 @@ class HBNBCommand(cmd.Cmd):
         Example: show BaseModel 1234-1234-1234
         """
         argl = parsing(arg)
-        objdict = storage.all()
         if len(argl) == 0:
             print("** class name missing **")
-        elif argl[0] not in HBNBCommand.__classes:
+        elif argl[0] not in classes:
             print("** class doesn't exist **")
         elif len(argl) == 1:
             print("** instance id missing **")
-        elif "{}.{}".format(argl[0], argl[1]) not in objdict:
+        elif storage.get(argl[0], argl[1]) is None:
             print("** no instance found **")
         else:
-            print(objdict["{}.{}".format(argl[0], argl[1])])
+            print(storage.get(argl[0], argl[1]))
 
     def do_destroy(self, arg):
         """
@@ -117,18 +284,16 @@ class HBNBCommand(cmd.Cmd):
         Example: destroy BaseModel 1234-1234-1234
         """
         argl = parsing(arg)
-        objdict = storage.all()
         if len(argl) == 0:
             print("** class name missing **")
-        elif argl[0] not in HBNBCommand.__classes:
+        elif argl[0] not in classes:
             print("** class doesn't exist **")
         elif len(argl) == 1:
             print("** instance id missing **")
-        elif "{}.{}".format(argl[0], argl[1]) not in objdict:
+        elif storage.get(argl[0], argl[1]) is None:
             print("** no instance found **")
         else:
-            del objdict["{}.{}".format(argl[0], argl[1])]
-            storage.__objects = objdict
+            storage.delete(storage.get(argl[0], argl[1]))
             storage.save()
 
     def do_all(self, arg):
@@ -140,18 +305,16 @@ class HBNBCommand(cmd.Cmd):
         or   : all <class_name>
         """
         argl = parsing(arg)
-        objdict = storage.all()
         if len(argl) == 0:
+            objdict = storage.all()
             res = []
             for key in objdict:
                 res.append(str(objdict[key]))
             print(res)
-        elif argl[0] and argl[0] in HBNBCommand.__classes:
+        elif argl[0] and argl[0] in classes:
             res = []
-            for key in objdict:
-                classLen = len(argl[0]) + 2
-                if str(objdict[key])[:classLen] == "[{}]".format(argl[0]):
-                    res.append(str(objdict[key]))
+            for obj in storage.all(argl[0]).values():
+                res.append(str(obj))
             print(res)
         else:
             print("** class doesn't exist **")
@@ -163,18 +326,18 @@ class HBNBCommand(cmd.Cmd):
         Usage: update <class name> <id> <attribute name> '<attribute value>'
         """
         argl = parsing(arg)
-        objdict = storage.all()
 
         if len(argl) == 0:
             print("** class name missing **")
             return False
-        if argl[0] not in HBNBCommand.__classes:
+        if argl[0] not in classes:
             print("** class doesn't exist **")
             return False
         if len(argl) == 1:
             print("** instance id missing **")
             return False
-        if "{}.{}".format(argl[0], argl[1]) not in objdict.keys():
+        obj = storage.get(argl[0], argl[1])
+        if obj is None:
             print("** no instance found **")
             return False
         if len(argl) == 2:
@@ -188,24 +351,65 @@ class HBNBCommand(cmd.Cmd):
                 return False
 
         if len(argl) == 4:
-            obj = objdict["{}.{}".format(argl[0], argl[1])]
-            if argl[2] in obj.__class__.__dict__.keys():
+            if argl[2] in obj.__class__.__dict__.keys() and type(
+                obj.__class__.__dict__[argl[2]]
+            ) is not LazyDatetime:
                 valtype = type(obj.__class__.__dict__[argl[2]])
-                obj.__dict__[argl[2]] = valtype(argl[3])
+                setattr(obj, argl[2], valtype(argl[3]))
             else:
-                obj.__dict__[argl[2]] = argl[3]
+                try:
+                    setattr(obj, argl[2], argl[3])
+                except ValueError:
+                    print("** invalid date: {} **".format(argl[3]))
+                    return False
         elif type(eval(argl[2])) == dict:
-            obj = objdict["{}.{}".format(argl[0], argl[1])]
             for k, v in eval(argl[2]).items():
                 if k in obj.__class__.__dict__.keys() and type(
                     obj.__class__.__dict__[k]
                 ) in {str, int, float}:
                     valtype = type(obj.__class__.__dict__[k])
-                    obj.__dict__[k] = valtype(v)
+                    setattr(obj, k, valtype(v))
                 else:
-                    obj.__dict__[k] = v
+                    try:
+                        setattr(obj, k, v)
+                    except (TypeError, ValueError):
+                        print("** invalid date: {} **".format(v))
+                        return False
         storage.save()
 
+    def do_where(self, arg):
+        """
+        Print string representation of the instances matching attributes.
+
+        Usage: where <class_name> <attribute name>=<value> ...
+        or   : <class_name>.where(<attribute name>="<value>", ...)
+        """
+        argl = parsing(arg)
+        if len(argl) == 0:
+            print("** class name missing **")
+            return False
+        if argl[0] not in classes:
+            print("** class doesn't exist **")
+            return False
+        criteria = {}
+        cls = classes[argl[0]]
+        for item in argl[1:]:
+            if "=" not in item:
+                print("** invalid criteria: {} **".format(item))
+                return False
+            attr, value = item.split("=", 1)
+            if type(cls.__dict__.get(attr)) in {str, int, float}:
+                try:
+                    value = type(cls.__dict__[attr])(value)
+                except ValueError:
+                    print("** invalid criteria: {} **".format(item))
+                    return False
+            criteria[attr] = value
+        res = []
+        for obj in storage.where(argl[0], **criteria).values():
+            res.append(str(obj))
+        print(res)
+
 
 def parsing(arg):
     """Parse argument."""
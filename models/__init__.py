@@ -1,7 +1,39 @@
 #!/usr/bin/python3
 """Load storage."""
+import os
+from models.base_model import BaseModel
+from models.user import User
+from models.state import State
+from models.city import City
+from models.place import Place
+from models.amenity import Amenity
+from models.review import Review
 
-from models.engine.file_storage import FileStorage
-
-storage = FileStorage()
+classes = {cls.__name__: cls
+           for cls in (BaseModel, User, State, City, Place, Amenity, Review)}
+options = {"lazy": os.getenv("HBNB_STORAGE_LAZY") == "1",
+           "coalesce": int(os.getenv("HBNB_STORAGE_COALESCE", 0)),
+           "background": os.getenv("HBNB_STORAGE_BACKGROUND") == "1",
+           "workers": int(os.getenv("HBNB_STORAGE_WORKERS", 1))}
+if os.getenv("HBNB_TYPE_STORAGE") == "db":
+    from models.engine.db_storage import DBStorage
+    storage = DBStorage(os.getenv("HBNB_DB_PATH", "hbnb.db"),
+                        fsync=os.getenv("HBNB_STORAGE_FSYNC", "always"),
+                        **options)
+else:
+    from models.engine.file_storage import FileStorage
+    storage = FileStorage(journal=os.getenv("HBNB_STORAGE_JOURNAL") == "1",
+                          shards=os.getenv("HBNB_STORAGE_SHARDS"),
+                          format=os.getenv("HBNB_STORAGE_FORMAT", "json"),
+                          mapped=os.getenv("HBNB_STORAGE_MMAP") == "1",
+                          fsync=os.getenv("HBNB_STORAGE_FSYNC", "never"),
+                          **options)
+storage.add_index("City", "state_id")
+storage.add_index("Place", "city_id")
+storage.add_index("Review", "place_id")
+storage.add_columns("Place", "number_rooms", "number_bathrooms", "max_guest",
+                    "price_by_night", "latitude", "longitude")
+storage.add_spatial_index("Place", "latitude", "longitude")
+storage.add_text_index("Place", "name", "description")
+storage.add_text_index("Review", "text")
 storage.reload()
@@ -2,12 +2,64 @@
 """BaseModel's Module."""
 import json
 import uuid
+import weakref
 import models
 from datetime import datetime
 
 
+class LazyDatetime:
+    """Datetime attribute kept as its ISO string until it's first read.
+
+    Objects built from a dictionary keep the strings of created_at and
+    updated_at in their __dict__; the string is parsed, and replaced by
+    the datetime, on first access. An object that is only passed from a
+    file to another is never parsed, and to_dict() gives back its strings
+    as they were read.
+    """
+
+    def __set_name__(self, owner, name):
+        """Record the name of the attribute."""
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        """Return the datetime, parsing it if it's still a string."""
+        if obj is None:
+            return self
+        try:
+            value = obj.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name) from None
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+            obj.__dict__[self.name] = value
+        return value
+
+    def __set__(self, obj, value):
+        """Set the datetime, or its ISO string, parsed right away.
+
+        Raises:
+            TypeError: if value is neither a datetime nor a string
+            ValueError: if value is a string that isn't an ISO date
+        """
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        elif not isinstance(value, datetime):
+            raise TypeError("{} must be a datetime or an ISO string"
+                            .format(self.name))
+        obj.__dict__[self.name] = value
+
+
 class BaseModel:
-    """BaseModel class."""
+    """BaseModel class.
+
+    to_json() keeps the JSON text of each object until one of its
+    attributes is set, so saving an object that didn't change doesn't
+    encode it again.
+    """
+
+    created_at = LazyDatetime()
+    updated_at = LazyDatetime()
+    __fragments = weakref.WeakKeyDictionary()
 
     def __init__(self, *args, **kwargs):
         """Initialize the model.
@@ -16,21 +68,55 @@ class BaseModel:
             *args: not used
             **kwargs: attributes
         """
-        self.id = str(uuid.uuid4())
-        self.created_at = datetime.now()
-        self.updated_at = datetime.now()
         if kwargs:
-            for key, value in kwargs.items():
-                if key == "created_at":
-                    value = datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f")
-                if key == "updated_at":
-                    value = datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f")
-                if key != "__class__":
-                    # setattr(self, key, value)
-                    self.__dict__[key] = value
+            self.__dict__.update(self.__attributes(kwargs))
         else:
+            self.id = str(uuid.uuid4())
+            self.created_at = datetime.now()
+            self.updated_at = datetime.now()
             models.storage.new(self)
 
+    @classmethod
+    def from_dict(cls, value):
+        """Build an instance from its dictionary, without storing it.
+
+        Unlike cls(**value), no id or date is generated for the attributes
+        found in value, and __init__() and __setattr__() aren't run.
+
+        Args:
+            value: dictionary returned by to_dict()
+
+        Returns:
+            the new instance
+        """
+        obj = cls.__new__(cls)
+        obj.__dict__.update(cls.__attributes(value))
+        return obj
+
+    @staticmethod
+    def __attributes(value):
+        """Return the attributes described by a dictionary of to_dict()."""
+        attributes = {"id": None, "created_at": None, "updated_at": None}
+        attributes.update(value)
+        attributes.pop("__class__", None)
+        if "id" not in value:
+            attributes["id"] = str(uuid.uuid4())
+        for key in ("created_at", "updated_at"):
+            if key not in value:
+                attributes[key] = datetime.now()
+            elif not isinstance(attributes[key], (str, datetime)):
+                raise TypeError("{} must be a datetime or an ISO string"
+                                .format(key))
+        return attributes
+
+    def __setattr__(self, name, value):
+        """Set an attribute and record the change in the storage."""
+        super().__setattr__(name, value)
+        models.storage.touch(self)
+        # after touch(), which waits for a save encoding self on another
+        # thread, so that save can't cache the value set before
+        BaseModel.__fragments.pop(self, None)
+
     def __str__(self):
         """Representation of the model.
 
@@ -38,6 +124,10 @@ class BaseModel:
             representation
         """
         class_name = self.__class__.__name__
+        # reading the dates parses those still kept as ISO strings, so
+        # __dict__ shows datetimes as it did before they were lazy
+        for name in ("created_at", "updated_at"):
+            getattr(self, name)
         return "[{}] ({}) {}".format(class_name, self.id, self.__dict__)
 
     def save(self):
@@ -45,6 +135,10 @@ class BaseModel:
         self.updated_at = datetime.now()
         models.storage.save()
 
+    def delete(self):
+        """Delete the instance from the storage."""
+        models.storage.delete(self)
+
     def to_dict(self):
         """Keys/values of __dict__.
 
@@ -52,7 +146,20 @@ class BaseModel:
             Keys/valeus dictionary
         """
         new_dict = self.__dict__.copy()
-        new_dict["updated_at"] = self.updated_at.isoformat()
-        new_dict["created_at"] = self.created_at.isoformat()
+        for key in ("updated_at", "created_at"):
+            if not isinstance(new_dict[key], str):
+                new_dict[key] = new_dict[key].isoformat()
         new_dict["__class__"] = self.__class__.__name__
         return new_dict
+
+    def to_json(self):
+        """JSON text of to_dict(), kept until an attribute is set.
+
+        Returns:
+            JSON text
+        """
+        text = BaseModel.__fragments.get(self)
+        if text is None:
+            text = json.dumps(self.to_dict())
+            BaseModel.__fragments[self] = text
+        return text
@@ -0,0 +1,114 @@
+#!/usr/bin/python3
+"""Aggregation's Module."""
+import json
+
+FUNCTIONS = ("count", "sum", "min", "max", "avg")
+
+
+def domain(value):
+    """Return the domain of an email address, or None."""
+    if not isinstance(value, str) or "@" not in value:
+        return None
+    return value.rpartition("@")[2].lower()
+
+
+def year(value):
+    """Return the year of a datetime or of its ISO string, or None."""
+    if isinstance(value, str):
+        value = value[:4]
+        return int(value) if value.isdigit() else None
+    return getattr(value, "year", None)
+
+
+KEYS = {"domain": domain, "year": year}
+
+
+class Aggregation:
+    """Hash aggregation of attributes of objects, grouped by a key.
+
+    Each row added updates the accumulators of its group, found in a
+    dictionary, so the rows are gone through once and only one set of
+    accumulators per group is kept. count counts the values that aren't
+    None; sum, min, max and avg only take numbers into account.
+    """
+
+    def __init__(self, functions):
+        """Initialize the aggregation.
+
+        Args:
+            functions: dictionary of function names to the name of the
+                attribute they aggregate
+
+        Raises:
+            ValueError: if a function is unknown
+        """
+        for function in functions:
+            if function not in FUNCTIONS:
+                raise ValueError(
+                    "unknown aggregate function: {}".format(function))
+        self.functions = dict(functions)
+        self.attrs = tuple(dict.fromkeys(self.functions.values()))
+        self.__groups = {}
+
+    def __len__(self):
+        """Return the number of groups."""
+        return len(self.__groups)
+
+    def add(self, group, values):
+        """Add a row to the accumulators of its group.
+
+        Args:
+            group: key of the group of the row; lists are turned into
+                tuples, and other values that can't be hashed, such as
+                dictionaries, into their JSON text with sorted keys
+            values: values of the attributes, in the order of attrs
+        """
+        if isinstance(group, list):
+            group = tuple(group)
+        try:
+            accumulators = self.__groups.get(group)
+        except TypeError:
+            group = json.dumps(group, sort_keys=True, default=str)
+            accumulators = self.__groups.get(group)
+        if accumulators is None:
+            accumulators = [[0, 0, 0, None, None] for attr in self.attrs]
+            self.__groups[group] = accumulators
+        for accumulator, value in zip(accumulators, values):
+            if value is None:
+                continue
+            accumulator[0] += 1
+            if not isinstance(value, (int, float)):
+                continue
+            accumulator[1] += 1
+            accumulator[2] += value
+            if accumulator[3] is None or value < accumulator[3]:
+                accumulator[3] = value
+            if accumulator[4] is None or value > accumulator[4]:
+                accumulator[4] = value
+
+    def result(self):
+        """Return the aggregates of every group.
+
+        Returns:
+            dictionary of the groups, in the order they were first added,
+            to dictionaries of function names to their value; min, max and
+            avg are None for a group without numbers
+        """
+        columns = {attr: column for column, attr in enumerate(self.attrs)}
+        result = {}
+        for group, accumulators in self.__groups.items():
+            values = {}
+            for function, attr in self.functions.items():
+                count, numbers, total, low, high = accumulators[columns[attr]]
+                if function == "count":
+                    values[function] = count
+                elif function == "sum":
+                    values[function] = total
+                elif function == "min":
+                    values[function] = low
+                elif function == "max":
+                    values[function] = high
+                else:
+                    values[function] = total / numbers if numbers else None
+            result[group] = values
+        return result
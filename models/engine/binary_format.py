@@ -0,0 +1,290 @@
+#!/usr/bin/python3
+"""Binary snapshot's Module.
+
+A snapshot starts with MAGIC and the number of classes, followed by one
+section per class: the class name, the names of the attributes of the
+class (its schema), the number of records and the records themselves,
+each one being the tagged values of the schema attributes in order.
+created_at and updated_at are stored as microseconds since the epoch.
+
+Usage: python3 -m models.engine.binary_format to-binary|to-json SRC DST
+"""
+import json
+import struct
+import sys
+from datetime import datetime, timedelta
+
+MAGIC = b"\x89HBNB\r\n\x1a\n"
+TIMESTAMPS = ("created_at", "updated_at")
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+FLOAT = struct.Struct("<d")
+
+ABSENT = 0
+NONE = 1
+FALSE = 2
+TRUE = 3
+INT = 4
+FLOAT_TAG = 5
+STR = 6
+LIST = 7
+DICT = 8
+DATETIME = 9
+
+
+def detect(file):
+    """Tell if a binary file holds a binary snapshot.
+
+    The file is left positioned at its start.
+
+    Args:
+        file: binary file positioned at its start
+
+    Returns:
+        True if the file starts with MAGIC
+    """
+    start = file.read(len(MAGIC))
+    file.seek(0)
+    return start == MAGIC
+
+
+def dump(records, file):
+    """Write records as a binary snapshot.
+
+    Args:
+        records: iterable of (key, dictionary) of the objects, where
+            created_at and updated_at are datetimes or ISO strings
+        file: binary file to write to
+    """
+    sections = {}
+    for key, value in records:
+        sections.setdefault(key.split(".", 1)[0], []).append(value)
+
+    out = bytearray(MAGIC)
+    _uint(out, len(sections))
+    for class_name, values in sections.items():
+        fields = {}
+        for value in values:
+            for name in value:
+                if name != "__class__":
+                    fields.setdefault(name)
+        _str(out, class_name)
+        _uint(out, len(fields))
+        for name in fields:
+            _str(out, name)
+        _uint(out, len(values))
+        for value in values:
+            for name in fields:
+                if name not in value:
+                    out.append(ABSENT)
+                elif name in TIMESTAMPS:
+                    _timestamp(out, value[name])
+                else:
+                    _value(out, value[name])
+    file.write(out)
+
+
+def load(file):
+    """Yield the (key, dictionary) pairs of a binary snapshot.
+
+    created_at and updated_at are returned as datetimes.
+
+    Args:
+        file: binary file positioned at its start
+
+    Raises:
+        ValueError: if the file isn't a valid binary snapshot
+    """
+    reader = _Reader(file.read())
+    if reader.take(len(MAGIC)) != MAGIC:
+        raise ValueError("not a binary snapshot")
+    try:
+        for _ in range(reader.uint()):
+            class_name = reader.str()
+            fields = [reader.str() for _ in range(reader.uint())]
+            for _ in range(reader.uint()):
+                value = {}
+                for name in fields:
+                    if reader.peek() == ABSENT:
+                        reader.pos += 1
+                    else:
+                        value[name] = reader.value()
+                value["__class__"] = class_name
+                yield class_name + "." + str(value.get("id")), value
+    except (IndexError, struct.error, UnicodeDecodeError):
+        raise ValueError("truncated binary snapshot")
+    if reader.pos != len(reader.data):
+        raise ValueError("extra data after binary snapshot")
+
+
+def to_binary(src, dst):
+    """Convert a JSON storage file to a binary snapshot.
+
+    Args:
+        src: path of the JSON file
+        dst: path of the binary snapshot
+    """
+    with open(src, "r", encoding="UTF8") as file:
+        records = json.load(file)
+    with open(dst, "wb") as file:
+        dump(records.items(), file)
+
+
+def to_json(src, dst):
+    """Convert a binary snapshot to a JSON storage file.
+
+    Args:
+        src: path of the binary snapshot
+        dst: path of the JSON file
+    """
+    with open(src, "rb") as file:
+        records = {}
+        for key, value in load(file):
+            for name in TIMESTAMPS:
+                if isinstance(value.get(name), datetime):
+                    value[name] = value[name].isoformat()
+            records[key] = value
+    with open(dst, "w", encoding="UTF8") as file:
+        json.dump(records, file)
+
+
+def _uint(out, number):
+    """Append an unsigned LEB128 number."""
+    while number > 0x7f:
+        out.append(number & 0x7f | 0x80)
+        number >>= 7
+    out.append(number)
+
+
+def _str(out, text):
+    """Append a string as its length and UTF-8 bytes."""
+    data = text.encode("UTF8")
+    _uint(out, len(data))
+    out += data
+
+
+def _timestamp(out, value):
+    """Append created_at or updated_at as microseconds if possible."""
+    moment = value
+    if isinstance(value, str):
+        try:
+            moment = datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    if isinstance(moment, datetime) and moment.tzinfo is None:
+        out.append(DATETIME)
+        _sint(out, (moment - EPOCH) // MICROSECOND)
+    else:
+        _value(out, value)
+
+
+def _sint(out, number):
+    """Append a signed number in zigzag encoding."""
+    _uint(out, number * 2 if number >= 0 else -number * 2 - 1)
+
+
+def _value(out, value):
+    """Append a tagged JSON value."""
+    if value is None:
+        out.append(NONE)
+    elif value is False:
+        out.append(FALSE)
+    elif value is True:
+        out.append(TRUE)
+    elif isinstance(value, int):
+        out.append(INT)
+        _sint(out, value)
+    elif isinstance(value, float):
+        out.append(FLOAT_TAG)
+        out += FLOAT.pack(value)
+    elif isinstance(value, str):
+        out.append(STR)
+        _str(out, value)
+    elif isinstance(value, (list, tuple)):
+        out.append(LIST)
+        _uint(out, len(value))
+        for item in value:
+            _value(out, item)
+    elif isinstance(value, dict):
+        out.append(DICT)
+        _uint(out, len(value))
+        for key, item in value.items():
+            _str(out, str(key))
+            _value(out, item)
+    else:
+        raise TypeError("Object of type {} is not serializable"
+                        .format(type(value).__name__))
+
+
+class _Reader:
+    """Decode the values of a binary snapshot."""
+
+    def __init__(self, data):
+        """Initialize the reader on the bytes of a snapshot."""
+        self.data = data
+        self.pos = 0
+
+    def take(self, size):
+        """Return the next size bytes."""
+        if self.pos + size > len(self.data):
+            raise IndexError("truncated")
+        data = self.data[self.pos:self.pos + size]
+        self.pos += size
+        return data
+
+    def peek(self):
+        """Return the next byte without consuming it."""
+        return self.data[self.pos]
+
+    def uint(self):
+        """Decode an unsigned LEB128 number."""
+        number = 0
+        shift = 0
+        while True:
+            byte = self.data[self.pos]
+            self.pos += 1
+            number |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                return number
+            shift += 7
+
+    def sint(self):
+        """Decode a signed number in zigzag encoding."""
+        number = self.uint()
+        return -(number + 1 >> 1) if number & 1 else number >> 1
+
+    def str(self):
+        """Decode a string."""
+        return self.take(self.uint()).decode("UTF8")
+
+    def value(self):
+        """Decode a tagged value."""
+        tag = self.data[self.pos]
+        self.pos += 1
+        if tag == STR:
+            return self.str()
+        if tag == DATETIME:
+            return EPOCH + self.sint() * MICROSECOND
+        if tag == INT:
+            return self.sint()
+        if tag == NONE:
+            return None
+        if tag == FALSE:
+            return False
+        if tag == TRUE:
+            return True
+        if tag == FLOAT_TAG:
+            return FLOAT.unpack(self.take(FLOAT.size))[0]
+        if tag == LIST:
+            return [self.value() for _ in range(self.uint())]
+        if tag == DICT:
+            return {self.str(): self.value() for _ in range(self.uint())}
+        raise ValueError("unknown value tag: {}".format(tag))
+
+
+if __name__ == "__main__":
+    commands = {"to-binary": to_binary, "to-json": to_json}
+    if len(sys.argv) != 4 or sys.argv[1] not in commands:
+        print(__doc__.splitlines()[-1], file=sys.stderr)
+        sys.exit(2)
+    commands[sys.argv[1]](sys.argv[2], sys.argv[3])
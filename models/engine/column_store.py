@@ -0,0 +1,163 @@
+#!/usr/bin/python3
+"""Column store's Module."""
+import math
+from array import array
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class ColumnStore:
+    """Numeric attributes of the objects of a class, one array per attribute.
+
+    Row i of every column holds the attributes of the object stored under
+    keys[i], as doubles in an array.array. Values that aren't numbers are
+    stored as NaN. Removing a row moves the last row into its place, so
+    rows are in no particular order.
+
+    select() compares whole columns at once with NumPy when it's
+    installed, and row by row otherwise.
+    """
+
+    def __init__(self, attrs):
+        """Initialize the store.
+
+        Args:
+            attrs: names of the stored attributes
+        """
+        self.attrs = tuple(attrs)
+        self.keys = []
+        self.__rows = {}
+        self.__columns = {attr: array("d") for attr in self.attrs}
+
+    def __len__(self):
+        """Return the number of rows."""
+        return len(self.keys)
+
+    def __contains__(self, key):
+        """Tell if the object stored under key has a row."""
+        return key in self.__rows
+
+    def column(self, attr):
+        """Return the array of the values of attr.
+
+        Raises:
+            KeyError: if attr isn't stored
+        """
+        return self.__columns[attr]
+
+    def row(self, key):
+        """Return the dictionary of the values stored for key.
+
+        Raises:
+            KeyError: if key has no row
+        """
+        row = self.__rows[key]
+        return {attr: column[row] for attr, column in self.__columns.items()}
+
+    def select(self, bounds, keys=None):
+        """Return the keys whose values are within bounds.
+
+        NaN values are never within bounds.
+
+        Args:
+            bounds: dictionary of attribute names to (low, high) inclusive
+                bounds, either of which can be None
+            keys: keys the result is restricted to
+
+        Returns:
+            list of the matching keys, in the order of their rows
+
+        Raises:
+            KeyError: if an attribute isn't stored
+        """
+        rows = None
+        if keys is not None:
+            rows = sorted(self.__rows[key] for key in keys
+                          if key in self.__rows)
+        for attr in bounds:
+            if attr not in self.__columns:
+                raise KeyError(attr)
+        if not self.keys:
+            return []
+        if numpy is not None:
+            return self.__select_arrays(bounds, rows)
+        for attr, (low, high) in bounds.items():
+            column = self.__columns[attr]
+            low = -math.inf if low is None else low
+            high = math.inf if high is None else high
+            if rows is None:
+                rows = [row for row, value in enumerate(column)
+                        if low <= value <= high]
+            else:
+                rows = [row for row in rows if low <= column[row] <= high]
+        if rows is None:
+            rows = range(len(self.keys))
+        return [self.keys[row] for row in rows]
+
+    def __select_arrays(self, bounds, rows):
+        """select() on NumPy views of the columns."""
+        if rows is not None:
+            rows = numpy.array(rows, dtype=numpy.intp)
+        mask = numpy.ones(len(self.keys) if rows is None else len(rows),
+                          dtype=bool)
+        for attr, (low, high) in bounds.items():
+            values = numpy.frombuffer(self.__columns[attr],
+                                      dtype=numpy.float64)
+            if rows is not None:
+                values = values[rows]
+            mask &= values >= (-math.inf if low is None else low)
+            mask &= values <= (math.inf if high is None else high)
+        found = numpy.flatnonzero(mask)
+        if rows is not None:
+            found = rows[found]
+        return [self.keys[row] for row in found.tolist()]
+
+    def update(self, key, values):
+        """Store the values of the object stored under key.
+
+        Args:
+            key: key of the object
+            values: values of the attributes, in the order of attrs
+        """
+        row = self.__rows.get(key)
+        if row is None:
+            self.__rows[key] = len(self.keys)
+            self.keys.append(key)
+            for attr, value in zip(self.attrs, values):
+                self.__columns[attr].append(self.__number(value))
+        else:
+            for attr, value in zip(self.attrs, values):
+                self.__columns[attr][row] = self.__number(value)
+
+    def remove(self, key):
+        """Remove the row of the object stored under key."""
+        row = self.__rows.pop(key, None)
+        if row is None:
+            return
+        last = self.keys.pop()
+        for column in self.__columns.values():
+            value = column.pop()
+            if last != key:
+                column[row] = value
+        if last != key:
+            self.keys[row] = last
+            self.__rows[last] = row
+
+    def clear(self):
+        """Remove every row."""
+        self.keys.clear()
+        self.__rows.clear()
+        for attr in self.attrs:
+            self.__columns[attr] = array("d")
+
+    @staticmethod
+    def __number(value):
+        """Return value as a float, or NaN if it isn't a number."""
+        if isinstance(value, (int, float)):
+            try:
+                return float(value)
+            except OverflowError:
+                pass
+        return math.nan
@@ -0,0 +1,179 @@
+#!/usr/bin/python3
+"""Database storage Module."""
+import json
+import re
+import sqlite3
+import models
+from models.engine.file_storage import FileStorage
+
+IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*\Z")
+SYNCHRONOUS = {"always": "FULL", "never": "OFF"}
+
+
+class DBStorage(FileStorage):
+    """Store the objects in a SQLite database.
+
+    Each class has its own table with an id primary key, one indexed
+    column per foreign key attribute (the class attributes ending with
+    _id) and the JSON text of the object. A save upserts the rows of the
+    objects that changed and deletes the rows of the deleted objects in a
+    single transaction.
+    """
+
+    __foreign = {}
+
+    def __init__(self, path="hbnb.db", lazy=False, fsync="always",
+                 coalesce=0, background=False, workers=1):
+        """Initialize the storage.
+
+        Args:
+            path: path of the SQLite database
+            lazy: build the objects read by reload() on first use
+            fsync: "always" to flush each transaction to disk, "never" to
+                leave it to the system, or a number of milliseconds, which
+                SQLite approximates by syncing at its checkpoints only
+            coalesce: number of milliseconds after a write during which
+                saves are deferred
+            background: run the transactions on a writer thread
+            workers: number of processes encoding the objects of a save
+        """
+        super().__init__(lazy=lazy, fsync=fsync, coalesce=coalesce,
+                         background=background, workers=workers)
+        self.__connection = sqlite3.connect(path, check_same_thread=False)
+        self.__connection.execute("PRAGMA synchronous = {}".format(
+            SYNCHRONOUS.get(fsync, "NORMAL")))
+        self.__columns = {}
+
+    def bgsave(self):
+        """Save the changes, SQLite already writing them row by row.
+
+        Returns:
+            True
+        """
+        self.save()
+        self.flush()
+        return True
+
+    def compact(self):
+        """Save the changes and rebuild the database file."""
+        self.save()
+        self.flush()
+        self.__connection.execute("VACUUM")
+
+    def close(self):
+        """Close the connection to the database."""
+        self.__connection.close()
+
+    def _prepare(self, changed, deleted):
+        """Prepare the transaction upserting and deleting changed rows.
+
+        Args:
+            changed: list of (key, object, JSON text) of the objects added
+                or modified since the last save
+            deleted: list of keys of the objects deleted since the last save
+
+        Returns:
+            the job running the transaction
+        """
+        rows = []
+        for key, obj, text in changed:
+            class_name, obj_id = key.split(".", 1)
+            values = [obj_id]
+            for column in self.__foreign_keys(class_name):
+                value = getattr(obj, column, None)
+                if not isinstance(value, (str, int, float)):
+                    value = None
+                values.append(value)
+            values.append(text)
+            rows.append((class_name, values))
+        removed = [key.split(".", 1) for key in deleted]
+        return lambda: self.__transaction(rows, removed)
+
+    def __transaction(self, rows, removed):
+        """Upsert rows and delete the removed rows in one transaction.
+
+        Args:
+            rows: list of (class name, [id, foreign keys..., JSON text])
+            removed: list of [class name, id]
+        """
+        with self.__connection:
+            for class_name, values in rows:
+                columns = self.__table(class_name)
+                self.__connection.execute(
+                    'INSERT OR REPLACE INTO "{}" (id, {}data) '
+                    'VALUES ({})'.format(
+                        class_name,
+                        "".join(column + ", " for column in columns),
+                        ", ".join("?" * len(values))),
+                    values)
+            for class_name, obj_id in removed:
+                if class_name not in self.__columns and \
+                        not self.__exists(class_name):
+                    continue
+                self.__connection.execute(
+                    'DELETE FROM "{}" WHERE id = ?'.format(class_name),
+                    (obj_id,))
+
+    def _read(self):
+        """Read the rows of every class table with _load()."""
+        tables = self.__connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'")
+        for class_name, in tables.fetchall():
+            if class_name not in models.classes:
+                continue
+            rows = self.__connection.execute(
+                'SELECT id, data FROM "{}"'.format(class_name))
+            for obj_id, data in rows:
+                self._load(class_name + "." + obj_id, json.loads(data), data)
+
+    @classmethod
+    def __foreign_keys(cls, class_name):
+        """Return the names of the foreign key attributes of a class.
+
+        Raises:
+            ValueError: if class_name isn't a model class
+        """
+        if class_name in cls.__foreign:
+            return cls.__foreign[class_name]
+        model = models.classes.get(class_name)
+        if model is None or not IDENTIFIER.match(class_name):
+            raise ValueError("unknown class: {}".format(class_name))
+        columns = sorted(attr for attr in dir(model)
+                         if attr.endswith("_id") and IDENTIFIER.match(attr))
+        cls.__foreign[class_name] = columns
+        return columns
+
+    def __exists(self, class_name):
+        """Return True if the database has a table for class_name."""
+        row = self.__connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+            (class_name,)).fetchone()
+        return row is not None
+
+    def __table(self, class_name):
+        """Create the table of a class and its missing columns.
+
+        Args:
+            class_name: name of the class
+
+        Returns:
+            the names of the foreign key columns of the table
+        """
+        if class_name in self.__columns:
+            return self.__columns[class_name]
+        columns = self.__foreign_keys(class_name)
+        self.__connection.execute(
+            'CREATE TABLE IF NOT EXISTS "{}" '
+            '(id TEXT PRIMARY KEY, data TEXT NOT NULL)'.format(class_name))
+        existing = {row[1] for row in self.__connection.execute(
+            'PRAGMA table_info("{}")'.format(class_name))}
+        for column in columns:
+            if column not in existing:
+                self.__connection.execute(
+                    'ALTER TABLE "{}" ADD COLUMN {}'.format(class_name,
+                                                            column))
+            self.__connection.execute(
+                'CREATE INDEX IF NOT EXISTS "{0}_{1}" '
+                'ON "{0}" ({1})'.format(class_name, column))
+        self.__columns[class_name] = columns
+        return columns
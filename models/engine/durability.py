@@ -0,0 +1,124 @@
+#!/usr/bin/python3
+"""Durability's Module."""
+import atexit
+import os
+import threading
+from contextlib import contextmanager
+
+
+class Durability:
+    """Write files atomically and flush them to disk on a policy.
+
+    The policy is "always" to fsync every file before it's used, "never"
+    to leave flushing to the operating system, or a number of milliseconds
+    to fsync every file written during that interval at its end (and at
+    exit), at most once.
+    """
+
+    def __init__(self, policy="never"):
+        """Initialize the policy.
+
+        Args:
+            policy: "always", "never" or an interval in milliseconds
+
+        Raises:
+            ValueError: if policy is none of these
+        """
+        self.policy = policy
+        self.__interval = None
+        if policy not in ("always", "never"):
+            try:
+                self.__interval = int(policy) / 1000
+            except (TypeError, ValueError):
+                raise ValueError("unknown fsync policy: {}".format(policy))
+            if self.__interval < 0:
+                raise ValueError("unknown fsync policy: {}".format(policy))
+            atexit.register(self.sync)
+        self.__lock = threading.Lock()
+        self.__unsynced = set()
+        self.__timer = None
+
+    @contextmanager
+    def replace(self, path, mode="w", **kwargs):
+        """Open a temporary file that replaces path once it's written.
+
+        A crash while writing leaves path as it was: the new content only
+        takes its place, in one rename, after it's completely written.
+
+        Args:
+            path: path of the file to replace
+            mode: mode the temporary file is opened with
+            **kwargs: other arguments of open()
+        """
+        temp = path + ".tmp"
+        try:
+            with open(temp, mode, **kwargs) as file:
+                yield file
+                file.flush()
+                if self.policy == "always":
+                    os.fsync(file.fileno())
+            os.replace(temp, path)
+        except BaseException:
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+            raise
+        if self.policy == "always":
+            self.__sync_directory(path)
+        elif self.__interval is not None:
+            self.__later(path)
+
+    def written(self, file):
+        """Apply the policy to a file written in place, such as a log.
+
+        Args:
+            file: the open file, after writing to it
+        """
+        if self.policy == "always":
+            file.flush()
+            os.fsync(file.fileno())
+        elif self.__interval is not None:
+            self.__later(file.name)
+
+    def sync(self):
+        """Flush the files written since the last sync to disk."""
+        with self.__lock:
+            paths = self.__unsynced
+            self.__unsynced = set()
+            if self.__timer is not None:
+                self.__timer.cancel()
+                self.__timer = None
+        for path in paths:
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except FileNotFoundError:
+                continue
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            self.__sync_directory(path)
+
+    def __later(self, path):
+        """Sync path at the end of the current interval."""
+        with self.__lock:
+            self.__unsynced.add(path)
+            if self.__timer is None:
+                self.__timer = threading.Timer(self.__interval, self.sync)
+                self.__timer.daemon = True
+                self.__timer.start()
+
+    @staticmethod
+    def __sync_directory(path):
+        """Flush the directory entry of path, where the system allows it."""
+        try:
+            fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
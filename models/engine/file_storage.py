@@ -1,52 +1,1497 @@
 #!/usr/bin/python3
 """Storage Module."""
+import asyncio
+import atexit
+import io
 import json
-from models.base_model import BaseModel
-from models.amenity import Amenity
-from models.city import City
-from models.place import Place
-from models.state import State
-from models.review import Review
-from models.user import User
-from models.state import State
-from models.city import City
-from models.place import Place
-from models.amenity import Amenity
-from models.review import Review
+import mmap
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+import models
+from models.engine import binary_format
+from models.engine.aggregate import Aggregation
+from models.engine.column_store import ColumnStore
+from models.engine import parallel
+from models.engine.durability import Durability
+from models.engine.grid_index import GridIndex
+from models.engine.hash_index import HashIndex
+from models.engine.text_index import TextIndex
+from models.engine.journal import Journal
+from models.engine.writer import Writer
+from models.engine.json_stream import ObjectReader, ObjectWriter
 
 
 class FileStorage:
-    """Handle serialization and deserialization."""
+    """Handle serialization and deserialization.
+
+    Objects report their changes through new(), touch() and delete(), so
+    a save only encodes the objects that changed since the previous one
+    and reuses the cached encoding of the others.
+
+    Objects are also kept partitioned by class name so listing or
+    counting the objects of one class doesn't go through the others, and
+    attributes declared with add_index() are indexed for where(). The
+    numeric attributes declared with add_columns() are also kept in the
+    arrays of a ColumnStore per class, which columns() returns, and the
+    positions declared with add_spatial_index() in a GridIndex, which
+    spatial_index() returns. The text attributes declared with
+    add_text_index() are indexed by word for find(). When the storage is
+    a single snapshot file, the text indexes are saved with it to
+    <file path>.text. reload() only checks they were saved with the file
+    it reads, and the first text_index() then reads them back instead of
+    indexing every text again.
+    aggregate() computes counts, sums, minimums, maximums and averages of
+    attributes per group of objects in one pass over them.
+
+    reload() reads the file one object at a time and keeps the JSON text
+    of each object as its cached encoding. In lazy mode it keeps only that
+    text and builds an instance when all(), get() or where() returns it.
+
+    With a shards directory each class is stored in its own
+    <directory>/<class name>.json file: a save only rewrites the files of
+    the classes that changed, and the file of a class is only read when
+    the objects of that class are first needed.
+
+    In binary format the snapshot is written with binary_format instead
+    of JSON; reload() reads either format, whatever the format setting.
+
+    In mapped mode reload() memory-maps the JSON file and only keeps the
+    (offset, length) of each object in it, taken from the <file path>.idx
+    index. An object is decoded from its slice of the map when it's used,
+    and the index is only rebuilt when the size or modification time of
+    the file changed.
+
+    Files are written to a temporary file renamed over the old one, so a
+    crash never leaves a half-written file behind, and flushed to disk
+    according to the fsync policy.
+
+    Saves can be coalesced: the saves made in a batch() block, or within
+    the coalesce window of the last write, are deferred and written
+    together at the end of the block, when the window closes, by flush()
+    or at exit.
+
+    In background mode save() only takes a snapshot of what changed; the
+    files are written by a writer thread while the caller goes on.
+
+    bgsave() writes the snapshot from a forked child process, which
+    serializes its copy-on-write view of the objects while this process
+    keeps serving commands.
+
+    asave(), areload() and aall() let an asyncio event loop use the
+    storage: the file reads and writes run on a thread of the storage
+    while the loop goes on. The objects are tracked under a lock, which
+    a save holds while it takes what it writes, and a reload while it
+    reads, so the loop can keep changing them meanwhile.
+
+    With several workers, a save that encodes at least parallel_threshold
+    objects splits them between that many worker processes and stitches
+    their JSON texts into the file.
+    """
 
     __file_path = "file.json"
     __objects = {}
+    __tracked = __objects
+    __dirty = set()
+    __deleted = set()
+    __encoded = {}
+    __by_class = {}
+    __pending = {}
+    __pending_by_class = {}
+    __indexes = {}
+    __columns = {}
+    __spatial = {}
+    __texts = {}
+    __texts_indexed = False
+    __texts_saved = None
+    __texts_changed = set()
+    __indexed = False
+    __unloaded = set()
+    __map = None
+    __lock = threading.RLock()
+    __writing = threading.Lock()
+
+    def __init__(self, journal=False, compact_threshold=1000, lazy=False,
+                 shards=None, format="json", mapped=False, fsync="never",
+                 coalesce=0, background=False, backlog=4, workers=1,
+                 parallel_threshold=10000):
+        """Initialize the storage.
+
+        Args:
+            journal: append each change to <file path>.journal instead of
+                rewriting the whole JSON file on every save
+            compact_threshold: number of journal records after which the
+                journal is folded back into a new JSON file
+            lazy: build the objects read by reload() on first use
+            shards: directory holding one JSON file per class, used
+                instead of the JSON file
+            format: "json" or "binary", format of the snapshot written
+                by save()
+            mapped: memory-map the JSON file and decode the objects from
+                it on first use
+            fsync: "always" to flush every write to disk before save()
+                returns, "never" to leave it to the system, or a number of
+                milliseconds to flush the writes of each such interval
+                together
+            coalesce: number of milliseconds after a write during which
+                saves are deferred
+            background: write the files on a writer thread
+            backlog: number of saves that can wait for the writer thread
+                before save() blocks
+            workers: number of processes encoding the objects of a save
+            parallel_threshold: number of objects to encode from which
+                the workers are used
+        """
+        if journal and shards is not None:
+            raise ValueError("journal mode needs a single JSON file")
+        if format not in ("json", "binary"):
+            raise ValueError("unknown format: {}".format(format))
+        if format == "binary" and shards is not None:
+            raise ValueError("binary format needs a single snapshot file")
+        if mapped and (shards is not None or format != "json"):
+            raise ValueError("mapped mode needs a single JSON file")
+        if mapped and background:
+            raise ValueError("mapped mode can't write in the background")
+        self.__durability = Durability(fsync)
+        self.__journal = None
+        if journal:
+            self.__journal = Journal(self.__file_path + ".journal",
+                                     self.__durability)
+        self.__compact_threshold = compact_threshold
+        self.__lazy = lazy
+        self.__shards = shards
+        self.__binary = format == "binary"
+        self.__mapped = mapped
+        self.__window = coalesce / 1000
+        self.__batches = 0
+        self.__unsaved = False
+        self.__last_write = None
+        self.__timer = None
+        self.__at_exit = False
+        self.__child = None
+        self.__bgsave = None
+        self.__forked = None
+        self.__snapshots = 0
+        self.__executor = None
+        self.__text_dumps = {}
+        self.__workers = workers
+        self.__parallel_threshold = parallel_threshold
+        self.__writer = None
+        if background:
+            self.__writer = Writer(backlog)
+            atexit.register(self.flush)
+            self.__at_exit = True
+
+    def all(self, cls=None):
+        """Return the dictionary __objects.
+
+        Args:
+            cls: class or class name to return the objects of
+
+        Returns:
+            __objects, or a new dictionary with the objects of cls
+        """
+        if cls is None:
+            self.__sync()
+            self.__load_shards()
+            for key in list(self.__pending):
+                self.__hydrate(key)
+            return self.__objects
+        cls = self.__name(cls)
+        self.__sync()
+        self.__load_shards(cls)
+        for key in list(self.__pending_by_class.get(cls, ())):
+            self.__hydrate(key)
+        return dict(self.__by_class.get(cls, {}))
+
+    async def aall(self, cls=None, chunk=100):
+        """Iterate asynchronously over the objects of all(cls).
+
+        The class files of a shards directory are read on the storage
+        thread, and control goes back to the event loop every chunk
+        objects. In lazy mode each object is built when it's reached.
+
+        Args:
+            cls: class or class name to iterate over the objects of
+            chunk: number of objects yielded between two returns to the
+                event loop
+        """
+        name = None if cls is None else self.__name(cls)
+        await self.__in_thread(self.__load_shards, name)
+        self.__sync()
+        if name is None:
+            keys = list(self.__objects) + list(self.__pending)
+        else:
+            keys = list(self.__by_class.get(name, ()))
+            keys += list(self.__pending_by_class.get(name, ()))
+        for i, key in enumerate(keys):
+            if i and not i % chunk:
+                await asyncio.sleep(0)
+            obj = self.__objects.get(key)
+            if obj is None and key in self.__pending:
+                obj = self.__hydrate(key)
+            if obj is not None:
+                yield obj
+
+    async def asave(self):
+        """Save on the storage thread without blocking the event loop.
+
+        The save also waits for the writer thread in background mode.
+        Objects changed while the save runs are saved by the next one if
+        the save missed their change; changes wait for the lock while the
+        save takes the objects it writes.
+        """
+        await self.__in_thread(self.__save_and_wait)
+
+    async def areload(self):
+        """Reload on the storage thread without blocking the event loop."""
+        await self.__in_thread(self.reload)
+
+    def count(self, cls=None):
+        """Return the number of objects.
+
+        Args:
+            cls: class or class name to count the objects of
+        """
+        if cls is None:
+            self.__sync()
+            self.__load_shards()
+            return len(self.__objects) + len(self.__pending)
+        partition = self.__partition(cls)
+        pending = self.__pending_by_class.get(self.__name(cls), {})
+        return len(partition) + len(pending)
+
+    def get(self, cls, id):
+        """Return the object of a class with an id.
+
+        Args:
+            cls: class or class name
+            id: id of the object
+
+        Returns:
+            the object, or None if there is no such object
+        """
+        key = self.__name(cls) + "." + str(id)
+        self.__sync()
+        self.__load_shards(self.__name(cls))
+        if key in self.__pending:
+            return self.__hydrate(key)
+        return self.__objects.get(key)
+
+    def add_index(self, cls, attr):
+        """Declare an equality index on an attribute of a class.
+
+        Args:
+            cls: class or class name
+            attr: name of the attribute
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        indexes = self.__indexes.setdefault(cls, {})
+        if attr not in indexes:
+            indexes[attr] = HashIndex(attr)
+            FileStorage.__indexed = False
+
+    def add_columns(self, cls, *attrs):
+        """Keep numeric attributes of a class in a ColumnStore.
+
+        Args:
+            cls: class or class name
+            *attrs: names of the attributes
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        store = self.__columns.get(cls)
+        if store is not None:
+            attrs = store.attrs + tuple(attr for attr in attrs
+                                        if attr not in store.attrs)
+            if attrs == store.attrs:
+                return
+        self.__columns[cls] = ColumnStore(attrs)
+        FileStorage.__indexed = False
+
+    def columns(self, cls):
+        """Return the ColumnStore of a class, up to date with its objects.
+
+        Args:
+            cls: class or class name
+
+        Returns:
+            the ColumnStore, or None if add_columns() wasn't called for cls
+        """
+        self.__partition(cls)
+        store = self.__columns.get(self.__name(cls))
+        if store is not None and not FileStorage.__indexed:
+            self.__build_indexes()
+        return store
+
+    def add_spatial_index(self, cls, lat_attr, lng_attr, cell=1.0):
+        """Declare a spatial index on the position of the objects of a class.
+
+        Args:
+            cls: class or class name
+            lat_attr: name of the latitude attribute
+            lng_attr: name of the longitude attribute
+            cell: size of the cells of the index in degrees
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        self.__spatial[cls] = GridIndex(lat_attr, lng_attr, cell)
+        FileStorage.__indexed = False
+
+    def spatial_index(self, cls):
+        """Return the GridIndex of a class, up to date with its objects.
+
+        Args:
+            cls: class or class name
+
+        Returns:
+            the GridIndex, or None if add_spatial_index() wasn't called
+            for cls
+        """
+        self.__partition(cls)
+        index = self.__spatial.get(self.__name(cls))
+        if index is not None and not FileStorage.__indexed:
+            self.__build_indexes()
+        return index
+
+    def add_text_index(self, cls, *attrs):
+        """Declare a full-text index on text attributes of a class.
+
+        Args:
+            cls: class or class name
+            *attrs: names of the attributes
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        self.__texts[cls] = TextIndex(attrs)
+        FileStorage.__texts_indexed = False
+        FileStorage.__texts_saved = None
+
+    def text_index(self, cls):
+        """Return the TextIndex of a class, up to date with its objects.
+
+        Args:
+            cls: class or class name
+
+        Returns:
+            the TextIndex, or None if add_text_index() wasn't called for cls
+        """
+        self.__partition(cls)
+        index = self.__texts.get(self.__name(cls))
+        if index is not None and not FileStorage.__texts_indexed:
+            if not self.__read_text_indexes():
+                self.__build_text_indexes()
+        return index
 
-    def all(self):
-        """Return the dictionary __objects."""
-        return self.__objects
+    def find(self, cls, query):
+        """Return the objects of a class whose texts match a query.
+
+        Args:
+            cls: class or class name with a text index
+            query: words that must all be found, or any of them if the
+                query holds OR
+
+        Returns:
+            list of the matching objects, best first
+
+        Raises:
+            ValueError: if cls has no text index
+        """
+        index = self.text_index(cls)
+        if index is None:
+            raise ValueError("no text index on {}".format(self.__name(cls)))
+        return [self.get(*key.split(".", 1))
+                for score, key in index.search(query)]
+
+    def aggregate(self, cls, by=None, key=None, **functions):
+        """Aggregate attributes of the objects of a class, per group.
+
+        The objects are gone through once, without building instances in
+        lazy mode, and each updates the aggregates of its group.
+
+        Args:
+            cls: class or class name
+            by: name of the attribute whose values are the groups, or
+                None for a single group None
+            key: function returning the group of a value of by
+            **functions: names of aggregate functions (count, sum, min,
+                max or avg) to the name of the attribute they aggregate;
+                the objects are counted when there are none
+
+        Returns:
+            dictionary of the groups to dictionaries of function names to
+            their value
+
+        Raises:
+            ValueError: if a function is unknown
+        """
+        aggregation = Aggregation(functions or {"count": "id"})
+        self.__partition(cls)
+        attrs = aggregation.attrs
+        if by is not None:
+            attrs = (by,) + attrs
+        for obj_key, values in self.__records(self.__name(cls), attrs):
+            group = None
+            if by is not None:
+                group = values.pop(0)
+            aggregation.add(group if key is None else key(group), values)
+        return aggregation.result()
+
+    def where(self, cls, **criteria):
+        """Return the objects of a class whose attributes equal criteria.
+
+        Criteria on indexed attributes are answered by their index, the
+        others by comparing the candidates one by one.
+
+        Args:
+            cls: class or class name
+            **criteria: attribute names and the values to match
+
+        Returns:
+            a new dictionary with the matching objects
+        """
+        partition = self.__partition(cls)
+        cls = self.__name(cls)
+        pending = self.__pending_by_class.get(cls, {})
+        indexes = self.__indexes.get(cls, {})
+        if indexes and not FileStorage.__indexed:
+            self.__build_indexes()
+        keys = None
+        for attr, value in criteria.items():
+            if attr in indexes:
+                found = indexes[attr].lookup(value)
+                keys = found if keys is None else keys & found
+        if keys is None:
+            keys = list(partition) + list(pending)
+        defaults = {}
+        if pending:
+            defaults = {attr: getattr(models.classes[cls], attr, None)
+                        for attr in criteria}
+
+        result = {}
+        for key in keys:
+            if key in partition:
+                obj = partition[key]
+                values = [getattr(obj, attr, None) for attr in criteria]
+            elif key in pending:
+                value = json.loads(self.__text(pending[key]))
+                values = [value.get(attr, defaults[attr])
+                          for attr in criteria]
+            else:
+                continue
+            if values == list(criteria.values()):
+                if key in partition:
+                    result[key] = partition[key]
+                else:
+                    result[key] = self.__hydrate(key)
+        return result
 
     def new(self, obj):
         """Set in __objects the obj with key <obj class name>.id."""
-        key = obj.__class__.__name__ + "." + str(obj.id)
-        self.__objects[key] = obj
+        class_name = obj.__class__.__name__
+        key = class_name + "." + str(obj.id)
+        with self.__lock:
+            self.__objects[key] = obj
+            self.__by_class.setdefault(class_name, {})[key] = obj
+            if self.__pending.pop(key, None) is not None:
+                del self.__pending_by_class[class_name][key]
+            self.__dirty.add(key)
+            self.__deleted.discard(key)
+            self.__update_indexes(class_name, key, obj)
+
+    def touch(self, obj):
+        """Record that obj has been modified since the last save."""
+        class_name = obj.__class__.__name__
+        key = class_name + "." + str(obj.id)
+        with self.__lock:
+            if key in self.__objects:
+                self.__dirty.add(key)
+                self.__update_indexes(class_name, key, obj)
+
+    def delete(self, obj=None):
+        """Delete obj from __objects if it's inside."""
+        if obj is None:
+            return
+        class_name = obj.__class__.__name__
+        key = class_name + "." + str(obj.id)
+        with self.__lock:
+            if self.__objects.pop(key, None) is None:
+                return
+            self.__by_class[class_name].pop(key, None)
+            self.__dirty.discard(key)
+            self.__deleted.add(key)
+            for index in self.__indexes.get(class_name, {}).values():
+                index.remove(key)
+            if class_name in self.__columns:
+                self.__columns[class_name].remove(key)
+            if class_name in self.__spatial:
+                self.__spatial[class_name].remove(key)
+            if class_name in self.__texts:
+                self.__texts[class_name].remove(key)
+                if FileStorage.__texts_saved is not None:
+                    self.__texts_changed.add(key)
 
     def save(self):
-        """Serialize __objects to the JSON file."""
-        json_obj = {}
-        for key in self.__objects:
-            json_obj[key] = self.__objects[key].to_dict()
+        """Serialize __objects to the JSON file.
+
+        In journal mode only the objects that changed since the last save
+        are appended to the journal. Inside a batch() block, or within the
+        coalesce window of the last write, the save is deferred; a timer
+        writes it when the window closes. In background mode the write is
+        left to the writer thread.
+
+        Raises:
+            the error of a previous write that failed in the background
+        """
+        if self.__writer is not None:
+            self.__writer.check()
+        if self.__batches or (self.__last_write is not None and
+                              time.monotonic() - self.__last_write <
+                              self.__window):
+            self.__unsaved = True
+            if not self.__at_exit:
+                atexit.register(self.flush)
+                self.__at_exit = True
+            if not self.__batches:
+                with self.__lock:
+                    if self.__timer is None:
+                        self.__close_window()
+            return
+        self.__save()
+
+    def __close_window(self):
+        """Write the deferred saves when the coalesce window closes."""
+        delay = self.__last_write + self.__window - time.monotonic()
+        self.__timer = threading.Timer(max(delay, 0), self.__window_closed)
+        self.__timer.daemon = True
+        self.__timer.start()
+
+    def __window_closed(self):
+        """Write the deferred saves, unless a batch() block defers them."""
+        with self.__lock:
+            self.__timer = None
+            if self.__batches or not self.__unsaved:
+                return
+            if time.monotonic() - self.__last_write < self.__window:
+                self.__close_window()
+                return
+        self.__save()
+
+    def flush(self):
+        """Write the changes of the deferred saves now.
+
+        In background mode, also wait until the writer thread is done.
+        """
+        if self.__unsaved:
+            self.__save()
+        self.wait()
+
+    def wait(self):
+        """Wait until the writer thread wrote every save made so far.
+
+        Raises:
+            the error of a write that failed in the background
+        """
+        if self.__writer is not None:
+            self.__writer.wait()
 
-        with open(self.__file_path, "w") as file:
-            json.dump(json_obj, file)
+    @contextmanager
+    def batch(self):
+        """Defer the saves made in the block to a single write at its end.
+
+        Blocks can be nested; the write happens at the end of the
+        outermost one.
+        """
+        self.__batches += 1
+        try:
+            yield self
+        finally:
+            self.__batches -= 1
+            if not self.__batches:
+                self.flush()
+
+    def bgsave(self):
+        """Write every object to the file from a forked child process.
+
+        The child writes its copy-on-write view of the objects to
+        <file path>.bgsave while this process goes on. bgsave_status()
+        puts that file in place once the child is done, unless a save
+        wrote a newer snapshot meanwhile, and removes the journal records
+        it covers. Without os.fork() the snapshot is written before
+        returning.
+
+        Returns:
+            False if a background save is already in progress
+
+        Raises:
+            ValueError: with a shards directory
+        """
+        if self.__shards is not None:
+            raise ValueError("background saves need a single snapshot file")
+        if self.bgsave_status() == "in progress":
+            return False
+        if not hasattr(os, "fork"):
+            self.compact()
+            self.__bgsave = "ok"
+            return True
+        self.wait()
+        journal = None
+        if self.__journal is not None:
+            try:
+                journal = os.path.getsize(self.__journal.path)
+            except FileNotFoundError:
+                journal = 0
+        with self.__lock:
+            pid = os.fork()
+            if pid == 0:
+                self.__bgsave_child()
+        if self.__child is None and self.__bgsave is None:
+            atexit.register(self.bgsave_status, True)
+        self.__child = pid
+        self.__forked = (self.__snapshots, journal)
+        self.__bgsave = "in progress"
+        return True
+
+    def bgsave_status(self, wait=False):
+        """Return the state of the last background save.
+
+        Args:
+            wait: wait for a background save in progress to end
+
+        Returns:
+            None if there was none, "in progress", "ok" or "err"
+        """
+        if self.__child is None:
+            return self.__bgsave
+        try:
+            pid, status = os.waitpid(self.__child,
+                                     0 if wait else os.WNOHANG)
+        except ChildProcessError:
+            pid, status = self.__child, -1
+        if not pid:
+            return self.__bgsave
+        self.__child = None
+        temp = self.__file_path + ".bgsave"
+        snapshots, journal = self.__forked
+        if status != 0 or snapshots != self.__snapshots:
+            try:
+                os.remove(temp)
+            except FileNotFoundError:
+                pass
+        else:
+            self.wait()
+            os.replace(temp, self.__file_path)
+            if journal is not None:
+                self.__journal.drop(journal)
+        self.__bgsave = "ok" if status == 0 else "err"
+        return self.__bgsave
+
+    def compact(self):
+        """Fold the journal into a new JSON file and empty the journal.
+
+        The journal is only removed once the new JSON file is written, so
+        a crash in between replays records that are already applied, which
+        is harmless.
+        """
+        self.__unsaved = False
+
+        def prepare():
+            with self.__lock:
+                self.__sync()
+                self.__encode_dirty()
+                self.__deleted.clear()
+                return self.__prepare_compaction()
+        self.__run(prepare)
 
     def reload(self):
-        """Deserialize the JSON file to __objects."""
+        """Deserialize the JSON file to __objects.
+
+        In journal mode the journal is replayed on top of the JSON file.
+        With a shards directory the file of each class is read the first
+        time the objects of that class are needed.
+        Indexes are rebuilt the next time where() needs them.
+        The changes of deferred saves are written first.
+        """
+        self.flush()
+        with self.__lock:
+            self.__sync()
+            FileStorage.__indexed = False
+            FileStorage.__texts_indexed = False
+            FileStorage.__texts_saved = None
+            self._read()
+
+    def __save_and_wait(self):
+        """Save, then wait for the writer thread."""
+        self.save()
+        self.wait()
+
+    def __in_thread(self, function, *args):
+        """Run function on the storage thread from an event loop.
+
+        Returns:
+            a future of the result of function
+        """
+        if self.__executor is None:
+            self.__executor = ThreadPoolExecutor(
+                1, thread_name_prefix="storage")
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self.__executor, function, *args)
+
+    def __save(self):
+        """Write the changes made since the last write."""
+        self.__unsaved = False
+        self.__last_write = time.monotonic()
+        with self.__lock:
+            if self.__timer is not None:
+                self.__timer.cancel()
+                self.__timer = None
+
+        def prepare():
+            with self.__lock:
+                self.__sync()
+                changed = self.__encode_dirty()
+                deleted = list(self.__deleted)
+                self.__deleted.difference_update(deleted)
+                job = self._prepare(changed, deleted)
+            return self.__retrying(
+                job, [key for key, obj, text in changed], deleted)
+        self.__run(prepare)
+
+    def __retrying(self, job, changed, deleted):
+        """Wrap a write job so a failed write is made again by the next save.
+
+        Args:
+            job: the write job
+            changed: keys of the objects the job writes
+            deleted: keys of the objects the job deletes
+
+        Returns:
+            a job marking the keys dirty or deleted again if job raises,
+            then raising its error
+        """
+        def write():
+            try:
+                job()
+            except BaseException:
+                with self.__lock:
+                    self.__dirty.update(key for key in changed
+                                        if key in self.__objects)
+                    self.__deleted.update(key for key in deleted
+                                          if key not in self.__objects)
+                raise
+        return write
+
+    def __run(self, prepare):
+        """Prepare a write job and run it under the write lock.
+
+        In background mode the job runs on the writer thread. The lock is
+        held from the preparation of the job until it has run, or has been
+        queued for the writer thread, so writes made from several threads
+        never overlap and land in the order they were prepared.
+
+        Args:
+            prepare: function without arguments returning the job
+        """
+        with self.__writing:
+            job = prepare()
+            if self.__writer is None:
+                job()
+            else:
+                self.__writer.submit(job)
+
+    def _prepare(self, changed, deleted):
+        """Prepare the write of the changes made since the last save.
+
+        Everything the write needs is taken from the objects here, so the
+        returned job can run on another thread while they keep changing.
+        Storages keeping the objects somewhere else override this method
+        and _read().
+
+        Args:
+            changed: list of (key, object, JSON text) of the objects added
+                or modified since the last save
+            deleted: list of keys of the objects deleted since the last save
+
+        Returns:
+            the job doing the write, a function without arguments
+        """
+        if self.__shards is not None:
+            classes = {key.split(".", 1)[0] for key, obj, text in changed}
+            classes.update(key.split(".", 1)[0] for key in deleted)
+            return self.__prepare_shards(classes)
+        if self.__journal is None:
+            return self.__prepare_snapshot()
+
+        records = []
+        for key, obj, text in changed:
+            class_name, obj_id = key.split(".", 1)
+            records.append(Journal.put(class_name, obj_id, text))
+        for key in deleted:
+            class_name, obj_id = key.split(".", 1)
+            records.append(Journal.delete(class_name, obj_id))
+        if self.__journal.count + len(records) >= self.__compact_threshold:
+            return self.__prepare_compaction()
+        journal = self.__journal
+        return lambda: journal.append(records)
+
+    def _read(self):
+        """Read the objects of the JSON file with _load()."""
+        if self.__shards is not None:
+            try:
+                names = os.listdir(self.__shards)
+            except FileNotFoundError:
+                names = []
+            for name in names:
+                if name.endswith(".json"):
+                    self.__unloaded.add(name[:-len(".json")])
+            self.__deleted.clear()
+            return
         try:
             """if the JSON file (__file_path) exists"""
-            with open(self.__file_path, "r", encoding="UTF8") as file:
-                data = json.load(file)
-                for key, value in data.items():
-                    attr_value = eval(value["__class__"])(**value)
-                    self.__objects[key] = attr_value
+            with open(self.__file_path, "rb") as file:
+                stat = os.fstat(file.fileno())
+                if binary_format.detect(file):
+                    for key, value in binary_format.load(file):
+                        self._load(key, value)
+                elif self.__mapped:
+                    self.__map_snapshot(file)
+                else:
+                    stream = io.TextIOWrapper(file, encoding="UTF8")
+                    for key, value, text in ObjectReader(stream).members():
+                        self._load(key, value, text)
         except FileNotFoundError:
+            stat = None
+        if self.__journal is None:
+            if stat is not None and self.__texts:
+                self.__check_text_indexes(stat)
+            return
+
+        for record in self.__journal.replay():
+            key = record["class"] + "." + record["id"]
+            if record["op"] == "put":
+                self._load(key, record["value"])
+            else:
+                self.__unload(key, record["class"])
+
+    def _load(self, key, value, text=None):
+        """Put the object read from the storage file in __objects.
+
+        In lazy mode only the JSON text of the object is kept until the
+        object is used.
+
+        Args:
+            key: key of the object
+            value: dictionary of the object
+            text: JSON text of value in the file, if it was read from one
+        """
+        class_name = value["__class__"]
+        self.__dirty.discard(key)
+        self.__deleted.discard(key)
+        if text is None:
+            self.__encoded.pop(key, None)
+        else:
+            self.__encoded[key] = text
+        if not self.__lazy:
+            obj = models.classes[class_name].from_dict(value)
+            self.__objects[key] = obj
+            self.__by_class.setdefault(class_name, {})[key] = obj
+            return
+        if text is None:
+            text = json.dumps(value, default=datetime.isoformat)
+        if self.__objects.pop(key, None) is not None:
+            del self.__by_class[class_name][key]
+        self.__pending[key] = text
+        self.__pending_by_class.setdefault(class_name, {})[key] = text
+
+    def __load_span(self, key, span):
+        """Keep the (offset, length) of an object in the mapped file."""
+        class_name = key.split(".", 1)[0]
+        self.__dirty.discard(key)
+        self.__deleted.discard(key)
+        self.__encoded.pop(key, None)
+        if self.__objects.pop(key, None) is not None:
+            del self.__by_class[class_name][key]
+        self.__pending[key] = span
+        self.__pending_by_class.setdefault(class_name, {})[key] = span
+
+    def __map_snapshot(self, file):
+        """Map the JSON file and keep the location of each object.
+
+        The locations are read from the index file when it matches the
+        size and modification time of the JSON file, and the index file
+        is rebuilt from the JSON file otherwise. Objects located in the
+        file mapped before and missing from this one were deleted from
+        it, so they are dropped before that file is unmapped.
+
+        Args:
+            file: the JSON file, opened in binary mode
+        """
+        stat = os.fstat(file.fileno())
+        index = self.__read_index(stat)
+        if index is None:
+            index = {}
+            stream = io.TextIOWrapper(file, encoding="latin-1", newline="")
+            # the file is read as latin-1 so that offsets count bytes; the
+            # keys are decoded again from their bytes, as UTF-8
+            for key, text, offset, length in ObjectReader(stream).spans():
+                index[json.loads(text.encode("latin-1"))] = (offset, length)
+            stream.detach()
+            self.__write_index(stat, index)
+        for key, value in list(self.__pending.items()):
+            if not isinstance(value, str) and key not in index:
+                self.__unload(key, key.split(".", 1)[0])
+        self.__open_map(file)
+        for key, span in index.items():
+            self.__load_span(key, tuple(span))
+
+    def __open_map(self, file):
+        """Map file in place of the file mapped before, if any."""
+        if FileStorage.__map is not None:
+            FileStorage.__map.close()
+        try:
+            FileStorage.__map = mmap.mmap(file.fileno(), 0,
+                                          access=mmap.ACCESS_READ)
+        except ValueError:
+            FileStorage.__map = None
+
+    def __read_index(self, stat):
+        """Return the index of the JSON file, or None if it's stale.
+
+        Args:
+            stat: os.stat_result of the JSON file
+        """
+        try:
+            with open(self.__file_path + ".idx", "r") as file:
+                index = json.load(file)
+        except (FileNotFoundError, ValueError):
+            return None
+        if not isinstance(index, dict) or \
+                index.get("mtime") != stat.st_mtime_ns or \
+                index.get("size") != stat.st_size:
+            return None
+        return index.get("index")
+
+    def __write_index(self, stat, index):
+        """Write the index of the JSON file.
+
+        Args:
+            stat: os.stat_result of the JSON file
+            index: dictionary from key to (offset, length)
+        """
+        with self.__durability.replace(self.__file_path + ".idx") as file:
+            json.dump({"mtime": stat.st_mtime_ns, "size": stat.st_size,
+                       "index": index}, file)
+
+    def __text(self, value):
+        """Return the JSON text of a record kept by a lazy reload.
+
+        Args:
+            value: JSON text, or (offset, length) in the mapped file
+        """
+        if isinstance(value, str):
+            return value
+        offset, length = value
+        with memoryview(FileStorage.__map) as view, \
+                view[offset:offset + length] as record:
+            return str(record, "UTF8")
+
+    def __load_shards(self, class_name=None):
+        """Read the files of classes not read since reload().
+
+        Objects already in memory are newer than the ones in the files,
+        so they are kept.
+
+        Args:
+            class_name: class to read the file of, or None for every class
+        """
+        with self.__lock:
+            self.__read_shards(class_name)
+
+    def __read_shards(self, class_name):
+        """__load_shards() holding the lock."""
+        if class_name is None:
+            names = list(self.__unloaded)
+        elif class_name in self.__unloaded:
+            names = [class_name]
+        else:
+            return
+        for name in names:
+            self.__unloaded.discard(name)
+            path = os.path.join(self.__shards, name + ".json")
+            try:
+                with open(path, "r", encoding="UTF8") as file:
+                    for key, value, text in ObjectReader(file).members():
+                        if key not in self.__objects and \
+                                key not in self.__pending and \
+                                key not in self.__deleted:
+                            self._load(key, value, text)
+            except FileNotFoundError:
+                pass
+            FileStorage.__indexed = False
+            FileStorage.__texts_indexed = False
+            FileStorage.__texts_saved = None
+
+    def __unload(self, key, class_name):
+        """Remove the object deleted from the storage file."""
+        if self.__objects.pop(key, None) is not None:
+            del self.__by_class[class_name][key]
+        elif self.__pending.pop(key, None) is not None:
+            del self.__pending_by_class[class_name][key]
+        self.__encoded.pop(key, None)
+
+    def __hydrate(self, key):
+        """Build the object of a record kept by a lazy reload.
+
+        Returns:
+            the new object, now in __objects
+        """
+        with self.__lock:
+            text = self.__text(self.__pending.pop(key))
+            self.__encoded.setdefault(key, text)
+            value = json.loads(text)
+            class_name = value["__class__"]
+            del self.__pending_by_class[class_name][key]
+            obj = models.classes[class_name].from_dict(value)
+            self.__objects[key] = obj
+            self.__by_class.setdefault(class_name, {})[key] = obj
+            return obj
+
+    @staticmethod
+    def __name(cls):
+        """Return the name of a class given as a class or a class name."""
+        if isinstance(cls, str):
+            return cls
+        return cls.__name__
+
+    def __partition(self, cls):
+        """Return the dictionary of the objects of a class.
+
+        Args:
+            cls: class or class name
+        """
+        self.__sync()
+        self.__load_shards(self.__name(cls))
+        return self.__by_class.get(self.__name(cls), {})
+
+    def __sync(self):
+        """Track __objects again if it was replaced or changed directly."""
+        with self.__lock:
+            self.__track()
+
+    def __track(self):
+        """__sync() holding the lock."""
+        partitioned = sum(len(part) for part in self.__by_class.values())
+        if (FileStorage.__tracked is self.__objects and
+                partitioned == len(self.__objects)):
+            return
+        self.__by_class.clear()
+        FileStorage.__indexed = False
+        FileStorage.__texts_indexed = False
+        FileStorage.__texts_saved = None
+        for key, obj in self.__objects.items():
+            class_name = obj.__class__.__name__
+            self.__by_class.setdefault(class_name, {})[key] = obj
+        if FileStorage.__tracked is self.__objects:
+            return
+        FileStorage.__tracked = self.__objects
+        self.__unloaded.clear()
+        self.__pending.clear()
+        self.__pending_by_class.clear()
+        for key in list(self.__encoded):
+            if key not in self.__objects:
+                del self.__encoded[key]
+                self.__deleted.add(key)
+        self.__dirty.update(self.__objects)
+
+    def __update_indexes(self, class_name, key, obj):
+        """Update the indexes of a class with the attributes of obj."""
+        text = self.__texts.get(class_name)
+        if text is not None and FileStorage.__texts_indexed:
+            text.update(key, [getattr(obj, attr, None)
+                              for attr in text.attrs])
+        elif text is not None and FileStorage.__texts_saved is not None:
+            self.__texts_changed.add(key)
+        if not FileStorage.__indexed:
+            return
+        for attr, index in self.__indexes.get(class_name, {}).items():
+            index.update(key, getattr(obj, attr, None))
+        store = self.__columns.get(class_name)
+        if store is not None:
+            store.update(key, [getattr(obj, attr, None)
+                               for attr in store.attrs])
+        spatial = self.__spatial.get(class_name)
+        if spatial is not None:
+            spatial.update(key, getattr(obj, spatial.lat_attr, None),
+                           getattr(obj, spatial.lng_attr, None))
+
+    def __build_indexes(self):
+        """Rebuild every index, column store and spatial index.
+
+        The objects of each class are gone through once for all the
+        structures of the class.
+        """
+        names = (self.__indexes.keys() | self.__columns.keys() |
+                 self.__spatial.keys())
+        for class_name in names:
+            indexes = self.__indexes.get(class_name, {})
+            store = self.__columns.get(class_name)
+            spatial = self.__spatial.get(class_name)
+            attrs = list(indexes)
+            if store is not None:
+                attrs += [attr for attr in store.attrs if attr not in attrs]
+                store.clear()
+            if spatial is not None:
+                attrs += [attr for attr in (spatial.lat_attr,
+                                            spatial.lng_attr)
+                          if attr not in attrs]
+                spatial.clear()
+            for index in indexes.values():
+                index.clear()
+            for key, values in self.__records(class_name, attrs):
+                row = dict(zip(attrs, values))
+                for attr, index in indexes.items():
+                    index.update(key, row[attr])
+                if store is not None:
+                    store.update(key, [row[attr] for attr in store.attrs])
+                if spatial is not None:
+                    spatial.update(key, row[spatial.lat_attr],
+                                   row[spatial.lng_attr])
+        FileStorage.__indexed = True
+
+    def __records(self, class_name, attrs):
+        """Yield the values of attributes of the objects of a class.
+
+        The records of a lazy reload are decoded once each, without
+        building their objects, and their missing attributes take the
+        default of the class.
+
+        Args:
+            class_name: name of the class
+            attrs: names of the attributes
+
+        Yields:
+            (key, list of the values of attrs) of each object
+        """
+        for key, obj in list(self.__by_class.get(class_name, {}).items()):
+            yield key, [getattr(obj, attr, None) for attr in attrs]
+        pending = self.__pending_by_class.get(class_name)
+        if not pending:
+            return
+        cls = models.classes.get(class_name)
+        defaults = [getattr(cls, attr, None) for attr in attrs]
+        for key, text in list(pending.items()):
+            value = json.loads(self.__text(text))
+            yield key, [value.get(attr, default)
+                        for attr, default in zip(attrs, defaults)]
+
+    def __build_text_indexes(self):
+        """Index the texts of the objects of every class with one."""
+        for class_name, index in self.__texts.items():
+            index.clear()
+            for key, values in self.__records(class_name, index.attrs):
+                index.update(key, values)
+        FileStorage.__texts_indexed = True
+
+    def __encode_dirty(self):
+        """Encode the objects modified since the last save.
+
+        Returns:
+            list of (key, object, JSON text) of the encoded objects
+        """
+        dirty = list(self.__dirty)
+        self.__dirty.difference_update(dirty)
+        items = [(key, self.__objects.get(key)) for key in dirty]
+        items = [(key, obj) for key, obj in items if obj is not None]
+        if self.__binary and self.__journal is None:
+            for key, obj in items:
+                self.__encoded.pop(key, None)
+            changed = [(key, obj, None) for key, obj in items]
+        else:
+            texts = self.__encode([obj for key, obj in items])
+            changed = [(key, obj, text)
+                       for (key, obj), text in zip(items, texts)]
+            for key, obj, text in changed:
+                self.__encoded[key] = text
+        for key in list(self.__deleted):
+            self.__encoded.pop(key, None)
+        return changed
+
+    def __encode(self, objects):
+        """Return the JSON texts of a list of objects.
+
+        The workers encode them when there are enough objects.
+        """
+        if self.__workers > 1 and \
+                len(objects) >= self.__parallel_threshold:
+            return parallel.encode(objects, self.__workers)
+        return [obj.to_json() for obj in objects]
+
+    def __prepare_compaction(self):
+        """Prepare the write of every object to the storage file(s).
+
+        Returns:
+            the job writing them and emptying the journal, if any
+        """
+        if self.__shards is not None:
+            return self.__prepare_shards(self.__by_class.keys() |
+                                         self.__unloaded)
+        write = self.__prepare_snapshot()
+        journal = self.__journal
+        if journal is None:
+            return write
+
+        def job():
+            write()
+            journal.truncate()
+        return job
+
+    def __bgsave_child(self):
+        """Write the snapshot in the child process of bgsave() and exit."""
+        status = 1
+        try:
+            self.__sync()
+            self.__encode_dirty()
+            if self.__durability.policy != "never":
+                self.__durability = Durability("always")
+            self.__prepare_snapshot(self.__file_path + ".bgsave")()
+            status = 0
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            os._exit(status)
+
+    def __prepare_snapshot(self, path=None):
+        """Prepare the write of every object of __objects to the file.
+
+        Args:
+            path: path to write to instead of the file, which is then
+                left unmapped
+
+        Returns:
+            the job writing them
+        """
+        remap = self.__mapped or FileStorage.__map is not None
+        texts = None
+        if path is None:
+            path = self.__file_path
+            self.__snapshots += 1
+            if self.__journal is None:
+                texts = self.__dump_text_indexes()
+        else:
+            remap = False
+        job = self.__prepare_file(path, remap)
+        if texts is None:
+            return job
+
+        def write_texts():
+            job()
+            self.__write_text_indexes(path, texts)
+        return write_texts
+
+    def __prepare_file(self, path, remap):
+        """Prepare the write of every object of __objects to a file.
+
+        Args:
+            path: path of the file
+            remap: map the file once it's written
+
+        Returns:
+            the job writing them
+        """
+        if self.__binary:
+            records = [(key, dict(obj.__dict__))
+                       for key, obj in self.__objects.items()]
+            records += [(key, json.loads(self.__text(text)))
+                        for key, text in self.__pending.items()]
+
+            def job():
+                with self.__durability.replace(path, "wb") as file:
+                    binary_format.dump(records, file)
+            return job
+        members = self.__members(self.__objects, self.__pending)
+        if not remap:
+            return lambda: self.__dump(path, members)
+
+        spans = {}
+
+        def remap():
+            self.__dump(path, members, spans)
+            with open(path, "rb") as file, self.__lock:
+                stat = os.fstat(file.fileno())
+                self.__open_map(file)
+                for key, value in list(self.__pending.items()):
+                    if not isinstance(value, str):
+                        self.__load_span(key, spans[key])
+            self.__write_index(stat, spans)
+        return remap
+
+    def __dump_text_indexes(self):
+        """Return the JSON texts of the text indexes to save.
+
+        The JSON text of an index is only encoded again when the index
+        changed.
+
+        Returns:
+            list of (class name, JSON text), or None if the text indexes
+            aren't up to date
+        """
+        if not self.__texts or not FileStorage.__texts_indexed:
+            return None
+        texts = []
+        for class_name, index in self.__texts.items():
+            cached = self.__text_dumps.get(class_name)
+            if cached is None or cached[0] is not index or \
+                    cached[1] != index.version:
+                cached = (index, index.version, json.dumps(index.dump()))
+                self.__text_dumps[class_name] = cached
+            texts.append((class_name, cached[2]))
+        return texts
+
+    def __write_text_indexes(self, path, texts):
+        """Write the text indexes beside the snapshot file they match.
+
+        Args:
+            path: path of the snapshot file
+            texts: list of (class name, JSON text of its index)
+        """
+        stat = os.stat(path)
+        with self.__durability.replace(path + ".text", "w",
+                                       encoding="UTF8") as file:
+            writer = ObjectWriter(file)
+            writer.write("fingerprint", json.dumps(
+                {"mtime": stat.st_mtime_ns, "size": stat.st_size}))
+            for class_name, text in texts:
+                writer.write(class_name, text)
+            writer.close()
+
+    def __check_text_indexes(self, stat):
+        """Tell whether the text indexes saved beside the file match it.
+
+        Only the fingerprint at the start of <file path>.text is read:
+        the indexes are restored by the first text_index(), and the
+        objects changed until then are indexed again afterwards.
+
+        Args:
+            stat: os.stat_result of the snapshot file
+        """
+        fingerprint = {"mtime": stat.st_mtime_ns, "size": stat.st_size}
+        try:
+            with open(self.__file_path + ".text", "r",
+                      encoding="UTF8") as file:
+                for key, value in ObjectReader(file):
+                    if key == "fingerprint" and value == fingerprint:
+                        FileStorage.__texts_saved = fingerprint
+                    break
+        except (FileNotFoundError, ValueError):
             pass
+        self.__texts_changed.clear()
+
+    def __read_text_indexes(self):
+        """Restore the text indexes checked by the last reload().
+
+        Nothing is restored if the file was replaced since, or holds
+        indexes of other classes or attributes.
+
+        Returns:
+            True if the text indexes were restored
+        """
+        saved = FileStorage.__texts_saved
+        FileStorage.__texts_saved = None
+        changed = list(self.__texts_changed)
+        self.__texts_changed.clear()
+        if saved is None:
+            return False
+        try:
+            with open(self.__file_path + ".text", "r",
+                      encoding="UTF8") as file:
+                data = json.load(file)
+            if data["fingerprint"] != saved:
+                return False
+            for class_name, index in self.__texts.items():
+                index.restore(data[class_name])
+        except (OSError, KeyError, TypeError, ValueError, AttributeError):
+            return False
+        for key in changed:
+            class_name = key.split(".", 1)[0]
+            index = self.__texts.get(class_name)
+            if key in self.__objects:
+                obj = self.__objects[key]
+                index.update(key, [getattr(obj, attr, None)
+                                   for attr in index.attrs])
+            elif key not in self.__pending:
+                index.remove(key)
+        FileStorage.__texts_indexed = True
+        return True
+
+    def __prepare_shards(self, classes):
+        """Prepare the write of the objects of some classes to their files.
+
+        Args:
+            classes: names of the classes to write
+
+        Returns:
+            the job writing them
+        """
+        files = []
+        for class_name in classes:
+            self.__load_shards(class_name)
+            path = os.path.join(self.__shards, class_name + ".json")
+            files.append((path, self.__members(
+                self.__by_class.get(class_name, {}),
+                self.__pending_by_class.get(class_name, {}))))
+
+        def job():
+            os.makedirs(self.__shards, exist_ok=True)
+            for path, members in files:
+                self.__dump(path, members)
+        return job
+
+    def __members(self, objects, pending):
+        """Return the (key, JSON text) of objects, one at a time.
+
+        Outside background mode the texts are only looked up, or encoded,
+        while they're written. The writer thread gets them all at once,
+        as they are when the save is made.
+
+        Args:
+            objects: dictionary of the objects to write
+            pending: dictionary of the JSON text of objects never built
+        """
+        members = self.__each_member(dict(objects), dict(pending))
+        if self.__writer is not None:
+            members = list(members)
+        return members
+
+    def __each_member(self, objects, pending):
+        """Yield the (key, JSON text) of objects."""
+        for key, obj in objects.items():
+            value = self.__encoded.get(key)
+            if value is None:
+                with self.__lock:
+                    value = self.__encoded[key] = obj.to_json()
+            yield key, value
+        for key, value in pending.items():
+            yield key, self.__text(value)
+
+    def __dump(self, path, members, spans=None):
+        """Write a JSON object from its members to a file.
+
+        Args:
+            path: path of the file
+            members: iterable of the (key, JSON text) of the object
+            spans: dictionary filled with the (offset, length) in bytes of
+                each member's text in the file
+        """
+        with self.__durability.replace(path, "w", encoding="UTF8",
+                                       newline="") as file:
+            writer = ObjectWriter(file)
+            for key, text in members:
+                span = writer.write(key, text)
+                if spans is not None:
+                    spans[key] = span
+            writer.close()
@@ -0,0 +1,182 @@
+#!/usr/bin/python3
+"""Grid index's Module."""
+import math
+
+EARTH_RADIUS = 6371.0088
+
+
+class GridIndex:
+    """Spatial index from latitude and longitude to object keys.
+
+    The globe is cut in cells of cell x cell degrees and each key is kept
+    in the set of the cell holding its position, so a query only looks at
+    the keys of the cells it overlaps. Distances are great-circle
+    distances in kilometres. Positions that aren't numbers, or whose
+    latitude isn't within [-90, 90], aren't indexed.
+    """
+
+    def __init__(self, lat_attr, lng_attr, cell=1.0):
+        """Initialize the index.
+
+        Args:
+            lat_attr: name of the latitude attribute
+            lng_attr: name of the longitude attribute
+            cell: size of a cell in degrees
+        """
+        self.lat_attr = lat_attr
+        self.lng_attr = lng_attr
+        self.__cell = cell
+        self.__columns = math.ceil(360 / cell)
+        self.__cells = {}
+        self.__points = {}
+
+    def __len__(self):
+        """Return the number of indexed keys."""
+        return len(self.__points)
+
+    def update(self, key, lat, lng):
+        """Index the object stored under key at a position."""
+        if key in self.__points:
+            self.remove(key)
+        if not (isinstance(lat, (int, float)) and
+                isinstance(lng, (int, float))):
+            return
+        if not (-90 <= lat <= 90 and math.isfinite(lng)):
+            return
+        lng = (lng + 180) % 360 - 180
+        cell = (self.__row(lat), self.__column(lng))
+        self.__cells.setdefault(cell, set()).add(key)
+        self.__points[key] = (lat, lng, cell)
+
+    def remove(self, key):
+        """Remove the object stored under key from the index."""
+        point = self.__points.pop(key, None)
+        if point is None:
+            return
+        keys = self.__cells[point[2]]
+        keys.discard(key)
+        if not keys:
+            del self.__cells[point[2]]
+
+    def clear(self):
+        """Remove every key from the index."""
+        self.__cells.clear()
+        self.__points.clear()
+
+    def within(self, south, west, north, east):
+        """Return the keys inside a bounding box, borders included.
+
+        A box whose west longitude is greater than its east one crosses
+        the 180th meridian.
+
+        Returns:
+            list of keys
+        """
+        if east - west >= 360:
+            west = east = None
+            inside = (lambda lng: True)
+        else:
+            west = (west + 180) % 360 - 180
+            east = (east + 180) % 360 - 180
+            if west <= east:
+                inside = (lambda lng: west <= lng <= east)
+            else:
+                inside = (lambda lng: lng >= west or lng <= east)
+        return [key for key in self.__candidates(south, north, west, east)
+                if south <= self.__points[key][0] <= north and
+                inside(self.__points[key][1])]
+
+    def radius(self, lat, lng, distance):
+        """Return the keys within a distance of a position.
+
+        Args:
+            lat: latitude of the position
+            lng: longitude of the position
+            distance: distance in kilometres
+
+        Returns:
+            list of (distance, key), nearest first
+        """
+        angle = distance / EARTH_RADIUS
+        south = lat - math.degrees(angle)
+        north = lat + math.degrees(angle)
+        if south <= -90 or north >= 90 or angle >= math.pi / 2:
+            west = east = None
+        else:
+            spread = math.degrees(math.asin(
+                math.sin(angle) / math.cos(math.radians(lat))))
+            west = (lng - spread + 180) % 360 - 180
+            east = (lng + spread + 180) % 360 - 180
+        found = []
+        for key in self.__candidates(south, north, west, east):
+            point = self.__points[key]
+            away = self.distance(lat, lng, point[0], point[1])
+            if away <= distance:
+                found.append((away, key))
+        found.sort()
+        return found
+
+    def nearest(self, lat, lng, k=1):
+        """Return the k keys nearest to a position.
+
+        The radius searched starts at the size of a cell and doubles until
+        it holds k keys.
+
+        Returns:
+            list of (distance, key), nearest first
+        """
+        if k <= 0 or not self.__points:
+            return []
+        distance = math.radians(self.__cell) * EARTH_RADIUS
+        while True:
+            found = self.radius(lat, lng, distance)
+            if len(found) >= k or distance >= math.pi * EARTH_RADIUS:
+                return found[:k]
+            distance *= 2
+
+    @staticmethod
+    def distance(lat1, lng1, lat2, lng2):
+        """Return the great-circle distance between two positions in km."""
+        lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+        h = (math.sin((lat2 - lat1) / 2) ** 2 +
+             math.cos(lat1) * math.cos(lat2) *
+             math.sin((lng2 - lng1) / 2) ** 2)
+        return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(h)))
+
+    def __candidates(self, south, north, west=None, east=None):
+        """Yield the keys of the cells overlapping a bounding box.
+
+        west and east are None for a box around the whole globe. When the
+        box covers more cells than there are non-empty cells, these are
+        the ones gone through.
+        """
+        south, north = max(south, -90), min(north, 90)
+        if south > north:
+            return
+        rows = range(self.__row(south), self.__row(north) + 1)
+        if west is None:
+            columns = range(self.__columns)
+        else:
+            first, last = self.__column(west), self.__column(east)
+            if first <= last:
+                columns = range(first, last + 1)
+            else:
+                columns = (list(range(first, self.__columns)) +
+                           list(range(0, last + 1)))
+        if len(rows) * len(columns) > len(self.__cells):
+            columns = set(columns)
+            for (row, column), keys in list(self.__cells.items()):
+                if row in rows and column in columns:
+                    yield from list(keys)
+            return
+        for row in rows:
+            for column in columns:
+                yield from list(self.__cells.get((row, column), ()))
+
+    def __row(self, lat):
+        """Return the row of the cells holding a latitude."""
+        return math.floor((lat + 90) / self.__cell)
+
+    def __column(self, lng):
+        """Return the column of the cells holding a longitude."""
+        return math.floor((lng + 180) / self.__cell) % self.__columns
@@ -0,0 +1,53 @@
+#!/usr/bin/python3
+"""Hash index's Module."""
+
+
+class HashIndex:
+    """Equality index from the value of an attribute to object keys."""
+
+    def __init__(self, attr):
+        """Initialize the index.
+
+        Args:
+            attr: name of the indexed attribute
+        """
+        self.attr = attr
+        self.__keys = {}
+        self.__values = {}
+
+    def update(self, key, value):
+        """Index the object stored under key with the value of attr.
+
+        Values that can't be hashed (lists, dictionaries) aren't indexed.
+        """
+        if key in self.__values:
+            if self.__values[key] == value:
+                return
+            self.remove(key)
+        try:
+            self.__keys.setdefault(value, set()).add(key)
+        except TypeError:
+            return
+        self.__values[key] = value
+
+    def remove(self, key):
+        """Remove the object stored under key from the index."""
+        if key not in self.__values:
+            return
+        value = self.__values.pop(key)
+        keys = self.__keys[value]
+        keys.discard(key)
+        if not keys:
+            del self.__keys[value]
+
+    def lookup(self, value):
+        """Return the set of keys whose attribute equals value."""
+        try:
+            return set(self.__keys.get(value, ()))
+        except TypeError:
+            return set()
+
+    def clear(self):
+        """Remove every key from the index."""
+        self.__keys.clear()
+        self.__values.clear()
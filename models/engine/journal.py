@@ -0,0 +1,125 @@
+#!/usr/bin/python3
+"""Journal's Module."""
+import json
+import os
+
+
+class Journal:
+    """Append-only log of the changes made to a storage file.
+
+    Each line is one JSON record, either
+    {"op": "put", "class": ..., "id": ..., "value": {...}} or
+    {"op": "delete", "class": ..., "id": ...}.
+    """
+
+    def __init__(self, path, durability=None):
+        """Initialize the journal.
+
+        Args:
+            path: path of the journal file
+            durability: Durability applied to each append, if any
+        """
+        self.path = path
+        self.count = 0
+        self.__durability = durability
+
+    @staticmethod
+    def put(class_name, obj_id, value):
+        """Build the record storing an object.
+
+        Args:
+            class_name: class name of the object
+            obj_id: id of the object
+            value: JSON encoded dictionary of the object
+
+        Returns:
+            the record as a line of text
+        """
+        line = '{{"op": "put", "class": {}, "id": {}, "value": {}}}\n'
+        return line.format(json.dumps(class_name), json.dumps(obj_id), value)
+
+    @staticmethod
+    def delete(class_name, obj_id):
+        """Build the record removing an object.
+
+        Args:
+            class_name: class name of the object
+            obj_id: id of the object
+
+        Returns:
+            the record as a line of text
+        """
+        line = '{{"op": "delete", "class": {}, "id": {}}}\n'
+        return line.format(json.dumps(class_name), json.dumps(obj_id))
+
+    def append(self, records):
+        """Append records to the end of the journal.
+
+        Args:
+            records: list of records built by put() or delete()
+        """
+        if not records:
+            return
+        with open(self.path, "a", encoding="UTF8") as file:
+            file.writelines(records)
+            if self.__durability is not None:
+                self.__durability.written(file)
+        self.count += len(records)
+
+    def replay(self):
+        """Yield the records of the journal in the order they were written.
+
+        A last line left incomplete by a crash is cut off the file so
+        later appends start on a clean line.
+        """
+        self.count = 0
+        try:
+            file = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        with file:
+            offset = 0
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                self.count += 1
+                yield record
+            else:
+                return
+        with open(self.path, "r+b") as file:
+            file.truncate(offset)
+
+    def drop(self, size):
+        """Remove the records in the first size bytes of the journal.
+
+        Args:
+            size: size of the journal when a snapshot covering its
+                records was started
+        """
+        try:
+            with open(self.path, "rb") as file:
+                file.seek(size)
+                rest = file.read()
+        except FileNotFoundError:
+            return
+        if self.__durability is None:
+            with open(self.path + ".tmp", "wb") as file:
+                file.write(rest)
+            os.replace(self.path + ".tmp", self.path)
+        else:
+            with self.__durability.replace(self.path, "wb") as file:
+                file.write(rest)
+        self.count = rest.count(b"\n")
+
+    def truncate(self):
+        """Remove every record from the journal."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        self.count = 0
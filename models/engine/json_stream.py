@@ -0,0 +1,209 @@
+#!/usr/bin/python3
+"""JSON stream's Module."""
+import json
+import re
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+NUMBER_TAIL = re.compile(r"[0-9.eE+-]*\Z")
+PLAIN_KEY = re.compile(r'[^"\\\x00-\x1f\x7f-\U0010ffff]*\Z')
+
+
+class ObjectReader:
+    """Read the members of a top-level JSON object one at a time.
+
+    Only the member being decoded and the rest of the chunk it was read
+    from are held in memory, whatever the size of the file.
+    """
+
+    def __init__(self, file, chunk_size=65536):
+        """Initialize the reader.
+
+        Args:
+            file: text file positioned at the start of the JSON object
+            chunk_size: number of characters read from file at a time
+        """
+        self.__file = file
+        self.__chunk_size = chunk_size
+        self.__decoder = json.JSONDecoder()
+        self.__buffer = ""
+        self.__start = 0
+        self.__pos = 0
+        self.__eof = False
+
+    def __iter__(self):
+        """Yield the (key, value) pairs of the object."""
+        for key, value, text in self.members():
+            yield key, value
+
+    def members(self):
+        """Yield the (key, value, text) triples of the object.
+
+        text is the JSON text of value as it appears in the file.
+        """
+        for key, key_text, value, text, offset in self.__members():
+            yield key, value, text
+
+    def spans(self):
+        """Yield the (key, key_text, offset, length) of each member.
+
+        key_text is the JSON text of key as it appears in the file, and
+        offset and length locate the JSON text of the value of key, in
+        characters from the start of the file.
+        """
+        for key, key_text, value, text, offset in self.__members():
+            yield key, key_text, offset, len(text)
+
+    def __members(self):
+        """Yield the (key, key_text, value, text, offset) of each member."""
+        self.__expect("{")
+        if self.__skip() == "}":
+            self.__pos += 1
+        else:
+            while True:
+                key, key_text, offset = self.__value()
+                if not isinstance(key, str):
+                    self.__fail("Expecting property name enclosed in "
+                                "double quotes")
+                self.__expect(":")
+                value, text, offset = self.__value()
+                yield key, key_text, value, text, offset
+                if self.__expect(",}") == "}":
+                    break
+        if self.__skip() != "":
+            self.__fail("Extra data")
+
+    def __read(self):
+        """Read the next chunk of the file.
+
+        Returns:
+            False at the end of the file
+        """
+        if self.__eof:
+            return False
+        chunk = self.__file.read(self.__chunk_size)
+        if not chunk:
+            self.__eof = True
+            return False
+        self.__buffer = self.__buffer[self.__pos:] + chunk
+        self.__start += self.__pos
+        self.__pos = 0
+        return True
+
+    def __skip(self):
+        """Skip whitespace.
+
+        Returns:
+            the next character, or "" at the end of the file
+        """
+        while True:
+            self.__pos = WHITESPACE.match(self.__buffer, self.__pos).end()
+            if self.__pos < len(self.__buffer):
+                return self.__buffer[self.__pos]
+            if not self.__read():
+                return ""
+
+    def __expect(self, chars):
+        """Consume the next character, which must be one of chars."""
+        char = self.__skip()
+        if not char or char not in chars:
+            self.__fail("Expecting " + " or ".join(repr(c) for c in chars))
+        self.__pos += 1
+        return char
+
+    def __value(self):
+        """Decode the value at the current position.
+
+        A value followed by nothing but number characters up to the end of
+        the buffer is decoded again once more of the file is read, since it
+        could be a number cut in two.
+
+        Returns:
+            the value, its JSON text and the offset of the text
+        """
+        self.__skip()
+        while True:
+            try:
+                value, end = self.__decoder.raw_decode(self.__buffer,
+                                                       self.__pos)
+            except json.JSONDecodeError:
+                if self.__read():
+                    continue
+                raise
+            if NUMBER_TAIL.match(self.__buffer, end) and self.__read():
+                continue
+            text = self.__buffer[self.__pos:end]
+            offset = self.__start + self.__pos
+            self.__pos = end
+            return value, text, offset
+
+    def __fail(self, message):
+        """Raise the decoding error of the current position."""
+        raise json.JSONDecodeError(message, self.__buffer, self.__pos)
+
+
+class ObjectWriter:
+    """Write the members of a top-level JSON object one at a time.
+
+    Members are given as their key and the JSON text of their value, and
+    written to the file every chunk_size members, so only that many are
+    held in memory whatever the number of members.
+    """
+
+    def __init__(self, file, chunk_size=1024):
+        """Initialize the writer and start the object.
+
+        Args:
+            file: text file to write to
+            chunk_size: number of members written to file at a time
+        """
+        self.__file = file
+        self.__chunk_size = chunk_size
+        self.__pieces = ["{"]
+        self.__position = 1
+        self.__count = 0
+
+    def write(self, key, text):
+        """Add a member to the object.
+
+        Args:
+            key: key of the member
+            text: JSON text of its value
+
+        Returns:
+            the (offset, length) of text in the UTF-8 encoded file
+        """
+        head = self.__quote(key) + ": "
+        if self.__count:
+            head = ", " + head
+        self.__pieces += (head, text)
+        self.__count += 1
+        offset = self.__position + self.__size(head)
+        length = self.__size(text)
+        self.__position = offset + length
+        if self.__count % self.__chunk_size == 0:
+            self.__flush()
+        return offset, length
+
+    def close(self):
+        """End the object and write what's left of it."""
+        self.__pieces.append("}")
+        self.__flush()
+
+    def __flush(self):
+        """Write the pending pieces to the file."""
+        self.__file.writelines(self.__pieces)
+        self.__pieces = []
+
+    @staticmethod
+    def __quote(key):
+        """Return the JSON string of a key."""
+        if PLAIN_KEY.match(key):
+            return '"' + key + '"'
+        return json.dumps(key)
+
+    @staticmethod
+    def __size(text):
+        """Return the length of text encoded in UTF-8."""
+        if text.isascii():
+            return len(text)
+        return len(text.encode("UTF8"))
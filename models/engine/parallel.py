@@ -0,0 +1,54 @@
+#!/usr/bin/python3
+"""Parallel encoding's Module."""
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+_objects = []
+
+
+def encode(objects, workers):
+    """Encode objects to JSON texts on worker processes.
+
+    Where processes can be forked the workers inherit the objects and
+    call to_json() themselves, so nothing but the texts is sent between
+    processes. Elsewhere the dictionaries of the objects are sent to the
+    workers.
+
+    Args:
+        objects: list of the objects to encode
+        workers: number of worker processes
+
+    Returns:
+        the list of the JSON texts of objects, in the same order
+    """
+    global _objects
+    size = -(-len(objects) // workers)
+    ranges = [(start, min(start + size, len(objects)))
+              for start in range(0, len(objects), size)]
+    if "fork" not in multiprocessing.get_all_start_methods():
+        with ProcessPoolExecutor(workers) as pool:
+            parts = pool.map(_encode_values, [
+                [obj.to_dict() for obj in objects[start:end]]
+                for start, end in ranges])
+            return [text for part in parts for text in part]
+
+    _objects = objects
+    try:
+        context = multiprocessing.get_context("fork")
+        with ProcessPoolExecutor(workers, mp_context=context) as pool:
+            parts = pool.map(_encode_range, ranges)
+            return [text for part in parts for text in part]
+    finally:
+        _objects = []
+
+
+def _encode_range(bounds):
+    """Encode the inherited objects between two indexes."""
+    start, end = bounds
+    return [obj.to_json() for obj in _objects[start:end]]
+
+
+def _encode_values(values):
+    """Encode a list of dictionaries."""
+    return [json.dumps(value) for value in values]
@@ -0,0 +1,173 @@
+#!/usr/bin/python3
+"""Text index's Module."""
+import math
+import re
+
+WORD = re.compile(r"\w+")
+
+
+class TextIndex:
+    """Inverted index from the words of text attributes to object keys.
+
+    Texts are cut into words, lowercased, and each word keeps the posting
+    list of the keys whose texts hold it, with the number of times they
+    do. version changes whenever the index does.
+
+    The words of each key are also kept, to update or remove it; after
+    restore() they're only looked up in the posting lists, for the keys
+    updated or removed.
+    """
+
+    def __init__(self, attrs):
+        """Initialize the index.
+
+        Args:
+            attrs: names of the indexed text attributes
+        """
+        self.attrs = tuple(attrs)
+        self.version = 0
+        self.__postings = {}
+        self.__lengths = {}
+        self.__documents = {}
+
+    def __len__(self):
+        """Return the number of indexed keys."""
+        return len(self.__lengths)
+
+    @staticmethod
+    def words(text):
+        """Return the lowercased words of a text."""
+        return WORD.findall(text.lower())
+
+    def update(self, key, values):
+        """Index the texts of the object stored under key.
+
+        Args:
+            key: key of the object
+            values: values of the attributes, in the order of attrs; the
+                ones that aren't strings are ignored
+        """
+        counts = {}
+        for value in values:
+            if isinstance(value, str):
+                for word in self.words(value):
+                    counts[word] = counts.get(word, 0) + 1
+        if (self.__counts(key) or {}) == counts:
+            return
+        self.remove(key)
+        if counts:
+            self.__add(key, counts)
+        self.version += 1
+
+    def remove(self, key):
+        """Remove the object stored under key from the index."""
+        counts = self.__counts(key)
+        if counts is None:
+            return
+        del self.__documents[key]
+        del self.__lengths[key]
+        for word in counts:
+            postings = self.__postings[word]
+            del postings[key]
+            if not postings:
+                del self.__postings[word]
+        self.version += 1
+
+    def clear(self):
+        """Remove every key from the index."""
+        self.__postings.clear()
+        self.__lengths.clear()
+        self.__documents.clear()
+        self.version += 1
+
+    def search(self, query):
+        """Return the keys matching a query, best first.
+
+        The words of the query must all be in the texts of a key, unless
+        the query holds the OR operator, in which case any of them is
+        enough. Keys are ranked by the sum over the words of their
+        frequency in the texts of the key times their inverse document
+        frequency.
+
+        Args:
+            query: words, optionally joined by AND or OR
+
+        Returns:
+            list of (score, key)
+        """
+        operators = query.split()
+        words = []
+        for word in self.words(" ".join(word for word in operators
+                                        if word not in ("AND", "OR"))):
+            if word not in words:
+                words.append(word)
+        if not words:
+            return []
+        postings = [self.__postings.get(word, {}) for word in words]
+        if "OR" in operators:
+            keys = set().union(*postings)
+        else:
+            smallest = min(postings, key=len)
+            keys = {key for key in smallest
+                    if all(key in found for found in postings)}
+        scores = dict.fromkeys(keys, 0.0)
+        for found in postings:
+            if not found:
+                continue
+            weight = math.log(1 + len(self.__lengths) / len(found))
+            for key in keys.intersection(found):
+                scores[key] += found[key] * weight
+        for key in keys:
+            scores[key] /= self.__lengths[key]
+        return sorted(((score, key) for key, score in scores.items()),
+                      key=lambda item: (-item[0], item[1]))
+
+    def dump(self):
+        """Return the content of the index as a dictionary.
+
+        The dictionary holds the indexed keys, the number of words of
+        each, and for each word the positions of the keys of its posting
+        list among them and their counts. It can be encoded to JSON and
+        given to restore(); it isn't changed by later updates of the
+        index.
+        """
+        keys = list(self.__lengths)
+        positions = {key: position for position, key in enumerate(keys)}
+        postings = {word: [list(map(positions.__getitem__, found)),
+                           list(found.values())]
+                    for word, found in self.__postings.items()}
+        return {"attrs": list(self.attrs), "keys": keys,
+                "lengths": list(self.__lengths.values()),
+                "postings": postings}
+
+    def restore(self, data):
+        """Replace the content of the index with a dump().
+
+        Raises:
+            ValueError: if data was dumped from other attributes
+        """
+        if tuple(data["attrs"]) != self.attrs:
+            raise ValueError("text index of other attributes")
+        self.clear()
+        keys = data["keys"]
+        self.__lengths.update(zip(keys, data["lengths"]))
+        for word, (positions, counts) in data["postings"].items():
+            self.__postings[word] = dict(zip(map(keys.__getitem__,
+                                                 positions), counts))
+
+    def __counts(self, key):
+        """Return the word counts of a key, or None if it isn't indexed."""
+        counts = self.__documents.get(key)
+        if counts is None and key in self.__lengths:
+            counts = {word: found[key]
+                      for word, found in self.__postings.items()
+                      if key in found}
+            self.__documents[key] = counts
+        return counts
+
+    def __add(self, key, counts):
+        """Add the word counts of a key."""
+        self.__documents[key] = counts
+        self.__lengths[key] = sum(counts.values())
+        for word, count in counts.items():
+            self.__postings.setdefault(word, {})[key] = count
@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+"""Writer's Module."""
+import queue
+import threading
+
+
+class Writer:
+    """Run write jobs one after the other on a dedicated thread.
+
+    submit() blocks while backlog jobs are waiting, so a caller saving
+    faster than the disk can follow is slowed down instead of piling up
+    snapshots in memory. The error raised by a job is kept and raised by
+    the next call to submit(), wait() or check().
+    """
+
+    def __init__(self, backlog=4):
+        """Initialize the writer and start its thread.
+
+        Args:
+            backlog: number of jobs that can wait for the thread
+        """
+        self.__jobs = queue.Queue(backlog)
+        self.__error = None
+        self.__thread = threading.Thread(target=self.__work,
+                                         name="storage writer", daemon=True)
+        self.__thread.start()
+
+    def submit(self, job):
+        """Queue a job, waiting while the backlog is full.
+
+        Args:
+            job: function without arguments
+        """
+        self.check()
+        self.__jobs.put(job)
+
+    def wait(self):
+        """Wait until every queued job is done."""
+        self.__jobs.join()
+        self.check()
+
+    def check(self):
+        """Raise the error of a failed job, once."""
+        error = self.__error
+        if error is not None:
+            self.__error = None
+            raise error
+
+    def close(self):
+        """Run the queued jobs and stop the thread."""
+        self.__jobs.put(None)
+        self.__thread.join()
+        self.check()
+
+    def __work(self):
+        """Run the queued jobs until close()."""
+        while True:
+            job = self.__jobs.get()
+            try:
+                if job is None:
+                    return
+                job()
+            except Exception as error:
+                if self.__error is None:
+                    self.__error = error
+            finally:
+                self.__jobs.task_done()
@@ -1,5 +1,6 @@
 #!/usr/bin/python3
 """Class place."""
+import models
 from models.base_model import BaseModel
 
 
@@ -17,3 +18,74 @@ class Place(BaseModel):
     latitude = 0.0
     longitude = 0.0
     amenity_ids = []
+
+    @classmethod
+    def search(cls, city_id=None, max_price=None, min_guests=None,
+               min_rooms=None, min_bathrooms=None):
+        """Return the ids of the places matching every given criterion.
+
+        The numeric criteria are evaluated on the columns kept by the
+        storage, the city with the index of Place.city_id.
+
+        Args:
+            city_id: id of the city of the places
+            max_price: highest price_by_night
+            min_guests: lowest max_guest
+            min_rooms: lowest number_rooms
+            min_bathrooms: lowest number_bathrooms
+
+        Returns:
+            list of the ids of the matching places
+        """
+        bounds = {}
+        if max_price is not None:
+            bounds["price_by_night"] = (None, max_price)
+        for attr, low in (("max_guest", min_guests),
+                          ("number_rooms", min_rooms),
+                          ("number_bathrooms", min_bathrooms)):
+            if low is not None:
+                bounds[attr] = (low, None)
+        keys = None
+        if city_id is not None:
+            keys = models.storage.where(cls, city_id=city_id)
+        store = models.storage.columns(cls)
+        return [key.split(".", 1)[1] for key in store.select(bounds, keys)]
+
+    @classmethod
+    def near(cls, lat, lng, k=1):
+        """Return the ids of the k places nearest to a position.
+
+        Args:
+            lat: latitude of the position
+            lng: longitude of the position
+            k: number of places
+
+        Returns:
+            list of ids, nearest first
+        """
+        index = models.storage.spatial_index(cls)
+        return [key.split(".", 1)[1] for distance, key
+                in index.nearest(lat, lng, int(k))]
+
+    @classmethod
+    def within(cls, *area):
+        """Return the ids of the places within an area.
+
+        The area is either a circle, given as (lat, lng, radius in km), or
+        a bounding box, given as (south, west, north, east).
+
+        Returns:
+            list of ids, nearest first for a circle
+
+        Raises:
+            TypeError: if area has neither 3 nor 4 numbers
+        """
+        index = models.storage.spatial_index(cls)
+        if len(area) == 3:
+            keys = [key for distance, key in index.radius(*area)]
+        elif len(area) == 4:
+            keys = index.within(*area)
+        else:
+            raise TypeError("within() takes 3 or 4 arguments ({} given)"
+                            .format(len(area)))
+        return [key.split(".", 1)[1] for key in keys]
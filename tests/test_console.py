@@ -4,6 +4,7 @@
 import unittest
 import os
 from io import StringIO
+from datetime import datetime
 from unittest.mock import patch
 from console import HBNBCommand
 from models.engine.file_storage import FileStorage
@@ -39,6 +40,14 @@ class ConsolePromptTest(unittest.TestCase):
         with patch("sys.stdout", new=StringIO()) as output:
             self.assertTrue(HBNBCommand().onecmd("EOF"))
 
+    def test_Console_exit_flushes(self):
+        """Check quit and EOF write the deferred saves."""
+        for command in ("quit", "EOF"):
+            with patch("sys.stdout", new=StringIO()):
+                with patch.object(storage, "flush") as flush:
+                    HBNBCommand().onecmd(command)
+                    flush.assert_called_once_with()
+
 
 class ConsoleHelpTest(unittest.TestCase):
     """help testing."""
@@ -46,7 +55,10 @@ class ConsoleHelpTest(unittest.TestCase):
         """Check help exists."""
         _help = ("Documented commands (type help <topic>):\n" +
                  "========================================\n" +
-                 "EOF  all  count  create  destroy  help  quit  show  update")
+                 "EOF        all     count   destroy  help  quit    show    " +
+                 "where \n" +
+                 "aggregate  bgsave  create  find     near  search  update  " +
+                 "within")
         with patch("sys.stdout", new=StringIO()) as output:
             self.assertFalse(HBNBCommand().onecmd("help"))
             self.assertEqual(_help, output.getvalue().strip())
@@ -1583,6 +1595,36 @@ class ConsoleUpdateTest(unittest.TestCase):
             _dict = storage.all()["Place.{}".format(_id)].__dict__
             self.assertEqual([], _dict["amenity_ids"])
 
+    def test_Console_update_date(self):
+        """update an instance's date from its ISO string"""
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("create Place"))
+            _id = output.getvalue().strip()
+        with patch("sys.stdout", new=StringIO()) as output:
+            cmd = 'update Place {} created_at "2023-01-01T10:00:00"'
+            self.assertFalse(HBNBCommand().onecmd(cmd.format(_id)))
+            self.assertEqual("", output.getvalue().strip())
+        self.assertEqual(datetime(2023, 1, 1, 10),
+                         storage.all()["Place.{}".format(_id)].created_at)
+
+    def test_Console_update_invalid_date(self):
+        """update an instance's date with a string that isn't a date"""
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("create Place"))
+            _id = output.getvalue().strip()
+        created_at = storage.all()["Place.{}".format(_id)].created_at
+        for cmd in ('update Place {} created_at "yesterday"',
+                    'Place.update({}, {{"updated_at": "yesterday"}})'):
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(HBNBCommand().onecmd(cmd.format(_id)))
+                self.assertEqual("** invalid date: yesterday **",
+                                 output.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("all Place"))
+            self.assertIn(_id, output.getvalue())
+        self.assertEqual(created_at,
+                         storage.all()["Place.{}".format(_id)].created_at)
+
 
 class ConsoleCountTest(unittest.TestCase):
     """Test cases for count command"""
@@ -1668,3 +1710,406 @@ class ConsoleCountTest(unittest.TestCase):
         with patch("sys.stdout", new=StringIO()) as output:
             self.assertFalse(HBNBCommand().onecmd("State.count()"))
             self.assertEqual('3', output.getvalue().strip())
+
+
+class ConsoleWhereTest(unittest.TestCase):
+    """Test cases for where command"""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+
+    def test_Console_where_no_class(self):
+        """Test where with no class."""
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("where"))
+            expected = "** class name missing **"
+            self.assertEqual(expected, output.getvalue().strip())
+
+    def test_Console_where_invalid_class(self):
+        """Test where with an invalid class."""
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("Unknown.where()"))
+            expected = "** class doesn't exist **"
+            self.assertEqual(expected, output.getvalue().strip())
+
+    def test_Console_where_invalid_criteria(self):
+        """Test where with criteria missing a value."""
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("City.where(state_id)"))
+            expected = "** invalid criteria: state_id **"
+            self.assertEqual(expected, output.getvalue().strip())
+
+    def test_Console_where_doted(self):
+        """Test Class.where(attribute="value")."""
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("create City"))
+            city_id = output.getvalue().strip()
+            self.assertFalse(HBNBCommand().onecmd("create City"))
+        cmd = 'update City {} state_id "abc"'.format(city_id)
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(cmd))
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("show City " + city_id))
+            expected = output.getvalue().strip()
+        with patch("sys.stdout", new=StringIO()) as output:
+            cmd = 'City.where(state_id="abc")'
+            self.assertFalse(HBNBCommand().onecmd(cmd))
+            self.assertEqual("[{}]".format(repr(expected)),
+                             output.getvalue().strip())
+
+    def test_Console_where_typed_value(self):
+        """Test where casts the value to the attribute's type."""
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("create Place"))
+            place_id = output.getvalue().strip()
+        cmd = "update Place {} max_guest 4".format(place_id)
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(cmd))
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("where Place max_guest=4"))
+            self.assertIn(place_id, output.getvalue())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("where Place max_guest=5"))
+            self.assertEqual("[]", output.getvalue().strip())
+
+
+class ConsoleSearchTest(unittest.TestCase):
+    """Test cases for search command"""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+
+    def create_place(self, **attributes):
+        """Create a place with the console and update its attributes."""
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("create Place"))
+            place_id = output.getvalue().strip()
+            for attr, value in attributes.items():
+                cmd = 'update Place {} {} "{}"'.format(place_id, attr, value)
+                self.assertFalse(HBNBCommand().onecmd(cmd))
+        return place_id
+
+    def test_Console_search_no_class(self):
+        """Test search with no class."""
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("search"))
+            expected = "** class name missing **"
+            self.assertEqual(expected, output.getvalue().strip())
+
+    def test_Console_search_invalid_class(self):
+        """Test search with an invalid class."""
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("Unknown.search()"))
+            expected = "** class doesn't exist **"
+            self.assertEqual(expected, output.getvalue().strip())
+
+    def test_Console_search_not_searchable(self):
+        """Test search on a class without search()."""
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("search User"))
+            expected = "** class can't be searched **"
+            self.assertEqual(expected, output.getvalue().strip())
+
+    def test_Console_search_invalid_criteria(self):
+        """Test search with invalid criteria."""
+        for criteria in ("max_price", "max_price=cheap", "color=3"):
+            with patch("sys.stdout", new=StringIO()) as output:
+                cmd = "Place.search({})".format(criteria)
+                self.assertFalse(HBNBCommand().onecmd(cmd))
+                expected = "** invalid criteria: {} **".format(criteria)
+                self.assertEqual(expected, output.getvalue().strip())
+
+    def test_Console_search(self):
+        """Test search prints the ids of the matching places."""
+        match = self.create_place(city_id="c1", price_by_night=80,
+                                  max_guest=4, number_rooms=2)
+        self.create_place(city_id="c1", price_by_night=150, max_guest=4)
+        self.create_place(city_id="c2", price_by_night=80, max_guest=4)
+        with patch("sys.stdout", new=StringIO()) as output:
+            cmd = 'Place.search(city_id="c1", max_price=100, min_guests=3)'
+            self.assertFalse(HBNBCommand().onecmd(cmd))
+            self.assertEqual(str([match]), output.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as output:
+            cmd = "search Place max_price=100 min_rooms=2"
+            self.assertFalse(HBNBCommand().onecmd(cmd))
+            self.assertEqual(str([match]), output.getvalue().strip())
+
+
+class CommandTestMixin:
+    """Run console commands from a test case"""
+
+    def run_cmd(self, cmd):
+        """Run a command and return its output."""
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(cmd))
+            return output.getvalue().strip()
+
+
+class ConsoleSpatialTest(CommandTestMixin, unittest.TestCase):
+    """Test cases for near and within commands"""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.places = {}
+        for name, lat, lng in (("casa", 33.57, -7.59), ("rabat", 34.02, -6.84),
+                               ("paris", 48.86, 2.35)):
+            with patch("sys.stdout", new=StringIO()) as output:
+                HBNBCommand().onecmd("create Place")
+                self.places[name] = output.getvalue().strip()
+                for attr, value in (("latitude", lat), ("longitude", lng)):
+                    HBNBCommand().onecmd("update Place {} {} {}".format(
+                        self.places[name], attr, value))
+
+    @classmethod
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+
+    def test_Console_near(self):
+        """Test near prints the nearest places first."""
+        self.assertEqual(str([self.places["casa"], self.places["rabat"]]),
+                         self.run_cmd("Place.near(33.6, -7.6, 2)"))
+        self.assertEqual(str([self.places["paris"]]),
+                         self.run_cmd("near Place 48 2"))
+
+    def test_Console_within(self):
+        """Test within a radius and within a box."""
+        self.assertEqual(str([self.places["rabat"], self.places["casa"]]),
+                         self.run_cmd("Place.within(34, -7, 100)"))
+        self.assertEqual(str([self.places["paris"]]),
+                         self.run_cmd("within Place 40 -5 50 5"))
+
+    def test_Console_spatial_errors(self):
+        """Test near and within with invalid input."""
+        self.assertEqual("** class name missing **", self.run_cmd("near"))
+        self.assertEqual("** class doesn't exist **",
+                         self.run_cmd("Unknown.within(1, 2, 3)"))
+        self.assertEqual("** class has no position **",
+                         self.run_cmd("User.near(1, 2)"))
+        self.assertEqual("** invalid arguments: 1, x **",
+                         self.run_cmd("Place.near(1, x)"))
+        self.assertEqual("** invalid arguments: 1, 2 **",
+                         self.run_cmd("Place.within(1, 2)"))
+
+
+class ConsoleFindTest(CommandTestMixin, unittest.TestCase):
+    """Test cases for find command"""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.places = {}
+        for name, description in (("loft", "Loft with a pool"),
+                                  ("house", "House with a garden and a pool"),
+                                  ("studio", "Studio")):
+            with patch("sys.stdout", new=StringIO()) as output:
+                HBNBCommand().onecmd("create Place")
+                self.places[name] = output.getvalue().strip()
+                HBNBCommand().onecmd('update Place {} description "{}"'.format(
+                    self.places[name], description))
+
+    @classmethod
+    def tearDown(self):
+        FileStorage._FileStorage__texts_indexed = False
+        for name in ("file.json", "file.json.text"):
+            try:
+                os.remove(name)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+
+    def test_Console_find(self):
+        """Test find prints the ids of the matching places."""
+        self.assertEqual(str([self.places["house"]]),
+                         self.run_cmd('Place.find("garden pool")'))
+        self.assertEqual(str([self.places["studio"], self.places["loft"]]),
+                         self.run_cmd("find Place studio OR loft"))
+        self.assertEqual("[]", self.run_cmd("find Place beach"))
+
+    def test_Console_find_errors(self):
+        """Test find with invalid input."""
+        self.assertEqual("** class name missing **", self.run_cmd("find"))
+        self.assertEqual("** class doesn't exist **",
+                         self.run_cmd('Unknown.find("pool")'))
+        self.assertEqual("** class has no text index **",
+                         self.run_cmd('User.find("pool")'))
+
+
+class ConsoleAggregateTest(CommandTestMixin, unittest.TestCase):
+    """Test cases for aggregate command"""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        for city_id, price in (("c1", 100), ("c2", 40), ("c1", 50)):
+            with patch("sys.stdout", new=StringIO()) as output:
+                HBNBCommand().onecmd("create Place")
+                place_id = output.getvalue().strip()
+                HBNBCommand().onecmd("update Place {} city_id {}".format(
+                    place_id, city_id))
+                HBNBCommand().onecmd(
+                    "update Place {} price_by_night {}".format(
+                        place_id, price))
+
+    @classmethod
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+
+    def test_Console_aggregate(self):
+        """Test aggregate prints the aggregates of each group."""
+        self.assertEqual(
+            str({"c1": {"avg": 75.0}, "c2": {"avg": 40.0}}),
+            self.run_cmd("Place.aggregate(avg=price_by_night, by=city_id)"))
+        self.assertEqual(
+            str({"c1": {"min": 50, "max": 100}, "c2": {"min": 40, "max": 40}}),
+            self.run_cmd("aggregate Place min=price_by_night "
+                         "max=price_by_night by=city_id"))
+        self.assertEqual(str({None: {"count": 3}}),
+                         self.run_cmd("Place.aggregate()"))
+        self.assertEqual(
+            str({"c1": {"count": 2}, "c2": {"count": 1}}),
+            self.run_cmd("Place.aggregate(count=id,by=city_id)"))
+
+    def test_Console_aggregate_keys(self):
+        """Test aggregate grouping by the domain of emails."""
+        for email in ("a@hbnb.io", "b@HBNB.io", "c@mail.com"):
+            with patch("sys.stdout", new=StringIO()) as output:
+                HBNBCommand().onecmd("create User")
+                HBNBCommand().onecmd("update User {} email {}".format(
+                    output.getvalue().strip(), email))
+        self.assertEqual(str({"hbnb.io": {"count": 2},
+                              "mail.com": {"count": 1}}),
+                         self.run_cmd("User.aggregate(by=email@domain)"))
+        self.assertEqual(str({datetime.now().year: {"count": 3}}),
+                         self.run_cmd("aggregate Place by=created_at@year"))
+
+    def test_Console_aggregate_errors(self):
+        """Test aggregate with invalid input."""
+        self.assertEqual("** class name missing **",
+                         self.run_cmd("aggregate"))
+        self.assertEqual("** class doesn't exist **",
+                         self.run_cmd("Unknown.aggregate(by=id)"))
+        self.assertEqual("** invalid arguments: price_by_night **",
+                         self.run_cmd("Place.aggregate(price_by_night)"))
+        self.assertEqual(
+            "** invalid arguments: median=price_by_night **",
+            self.run_cmd("Place.aggregate(median=price_by_night)"))
+        self.assertEqual("** invalid arguments: by=email@month **",
+                         self.run_cmd("User.aggregate(by=email@month)"))
+        self.assertEqual("** invalid arguments: count=id=email **",
+                         self.run_cmd("User.aggregate(count=id=email)"))
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "needs os.fork()")
+class ConsoleBgsaveTest(unittest.TestCase):
+    """Test cases for bgsave command"""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+
+    def test_Console_bgsave(self):
+        """Test bgsave reports its start and its end."""
+        console = HBNBCommand()
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(console.onecmd("create User"))
+            user_id = output.getvalue().strip()
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(console.onecmd("bgsave"))
+            self.assertEqual("Background saving started",
+                             output.getvalue().strip())
+        storage.bgsave_status(wait=True)
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(console.postcmd(False, "show"))
+            self.assertEqual("Background saving terminated with success",
+                             output.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as output:
+            console.postcmd(False, "show")
+            self.assertEqual("", output.getvalue())
+        with open("file.json") as file:
+            self.assertIn("User." + user_id, file.read())
+
+    def test_Console_bgsave_shards(self):
+        """Test bgsave is refused with a shards directory."""
+        with patch("console.storage", FileStorage(shards="test_shards")):
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(HBNBCommand().onecmd("bgsave"))
+                self.assertEqual(
+                    "** background saves need a single snapshot file **",
+                    output.getvalue().strip())
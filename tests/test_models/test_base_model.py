@@ -3,10 +3,13 @@
 """
 import unittest
 import inspect
+import json
 import os
 import uuid
 from time import sleep
+from unittest import mock
 from datetime import datetime
+import models
 from models.base_model import BaseModel
 
 
@@ -126,11 +129,82 @@ class BaseModelTest(unittest.TestCase):
         self.assertEqual(obj1.updated_at, dt)
         self.assertEqual(obj1.id, "2023")
 
+    def test_BaseModel_init_with_datetime_Kwarg(self):
+        """check datetimes are accepted as they are"""
+        dt = datetime.now()
+        obj1 = BaseModel(id="2023", created_at=dt, updated_at=dt)
+        self.assertEqual(obj1.created_at, dt)
+        self.assertEqual(obj1.updated_at, dt)
+
     def test_BaseModel_init_Kwargs_noneVal(self):
         """check init kwargs values equal to None"""
         with self.assertRaises(TypeError):
             BaseModel(id=None, created_at=None, updated_at=None)
 
+    def test_BaseModel_init_partial_Kwargs(self):
+        """check missing attributes get defaults, in their usual order"""
+        obj1 = BaseModel(name="Betty", created_at="2023-01-01T00:00:00.5")
+        self.assertEqual(["id", "created_at", "updated_at", "name"],
+                         list(obj1.__dict__))
+        self.assertEqual(datetime(2023, 1, 1, 0, 0, 0, 500000),
+                         obj1.created_at)
+        self.assertIsInstance(obj1.updated_at, datetime)
+        uuid.UUID(obj1.id)
+
+    def test_BaseModel_from_dict(self):
+        """check from_dict() builds the same object as kwargs"""
+        obj1 = BaseModel()
+        obj1.name = "Betty"
+        obj2 = BaseModel.from_dict(obj1.to_dict())
+        self.assertIs(type(obj2), BaseModel)
+        self.assertEqual(obj1.to_dict(), obj2.to_dict())
+        self.assertEqual(obj1.created_at, obj2.created_at)
+        self.assertEqual(obj1.updated_at, obj2.updated_at)
+        self.assertEqual(obj1.__dict__, obj2.__dict__)
+
+    def test_BaseModel_from_dict_not_stored(self):
+        """check from_dict() doesn't add the object to the storage"""
+        obj1 = BaseModel.from_dict({"id": "2023", "__class__": "BaseModel"})
+        self.assertNotIn("BaseModel.2023", models.storage.all())
+        self.assertEqual(3, len(obj1.__dict__))
+
+    def test_BaseModel_lazy_datetime(self):
+        """check dates read from a dictionary are parsed on first access"""
+        text = "2023-01-01T10:00:00.500000"
+        obj1 = BaseModel(id="2023", created_at=text, updated_at=text)
+        self.assertIs(text, obj1.__dict__["created_at"])
+        self.assertIs(text, obj1.to_dict()["updated_at"])
+        self.assertEqual(datetime(2023, 1, 1, 10, 0, 0, 500000),
+                         obj1.created_at)
+        self.assertIsInstance(obj1.__dict__["created_at"], datetime)
+        self.assertEqual(text, obj1.to_dict()["created_at"])
+        self.assertIn("datetime.datetime(2023, 1, 1, 10, 0, 0, 500000)",
+                      str(obj1))
+
+    def test_BaseModel_lazy_datetime_invalid(self):
+        """check an invalid date string fails when it's read"""
+        obj1 = BaseModel(id="2023", created_at="yesterday")
+        with self.assertRaises(ValueError):
+            obj1.created_at
+
+    def test_BaseModel_set_datetime(self):
+        """check a date set as a string is parsed when it's set"""
+        obj1 = BaseModel()
+        obj1.created_at = "2023-01-01T10:00:00"
+        self.assertEqual(datetime(2023, 1, 1, 10), obj1.__dict__["created_at"])
+        with self.assertRaises(ValueError):
+            obj1.created_at = "yesterday"
+        with self.assertRaises(TypeError):
+            obj1.updated_at = 2023
+        self.assertEqual(datetime(2023, 1, 1, 10), obj1.created_at)
+
+    def test_classes(self):
+        """check the class registry maps names to the model classes"""
+        self.assertIs(BaseModel, models.classes["BaseModel"])
+        for name, cls in models.classes.items():
+            self.assertEqual(name, cls.__name__)
+            self.assertTrue(issubclass(cls, BaseModel))
+
 
 # -- method save() -----------------------------
 class BaseModelSaveTest(unittest.TestCase):
@@ -244,3 +318,41 @@ class BaseModelToDictTest(unittest.TestCase):
             "updated_at": date.isoformat()
         }
         self.assertDictEqual(obj1.to_dict(), test_dict)
+
+    def test_BaseModel_to_json(self):
+        """check to_json() is the JSON text of to_dict()"""
+        obj1 = BaseModel(name="john", age=30)
+        self.assertEqual(obj1.to_dict(), json.loads(obj1.to_json()))
+
+    def test_BaseModel_to_json_cached(self):
+        """check to_json() is kept until an attribute is set"""
+        obj1 = BaseModel()
+        text = obj1.to_json()
+        obj1.__dict__["name"] = "john"
+        self.assertIs(text, obj1.to_json())
+        obj1.age = 30
+        self.assertEqual(obj1.to_dict(), json.loads(obj1.to_json()))
+        text = obj1.to_json()
+        with mock.patch.object(models.storage, "save"):
+            obj1.save()
+        self.assertEqual(obj1.updated_at.isoformat(),
+                         json.loads(obj1.to_json())["updated_at"])
+        self.assertNotEqual(text, obj1.to_json())
+
+
+# --method delete() -----------------------------
+class BaseModelDeleteTest(unittest.TestCase):
+    """test cases for BaseModel.delete() method"""
+    def test_BaseModel_delete(self):
+        """check delete() removes the instance from the storage"""
+        obj1 = BaseModel()
+        key = "BaseModel." + obj1.id
+        self.assertIn(key, models.storage.all())
+        obj1.delete()
+        self.assertNotIn(key, models.storage.all())
+
+    def test_BaseModel_delete_args(self):
+        """delete with an arg"""
+        obj1 = BaseModel()
+        with self.assertRaises(TypeError):
+            obj1.delete("val")
@@ -0,0 +1,71 @@
+#!/usr/bin/python3
+"""aggregate test cases"""
+
+import unittest
+from datetime import datetime
+from models.engine.aggregate import Aggregation, domain, year
+
+
+class AggregationTest(unittest.TestCase):
+    """Aggregation test cases"""
+
+    def test_Aggregation_functions(self):
+        """check every function of one attribute"""
+        aggregation = Aggregation({"count": "price", "sum": "price",
+                                   "min": "price", "max": "price",
+                                   "avg": "price"})
+        self.assertEqual(("price",), aggregation.attrs)
+        for group, price in (("a", 10), ("b", 4), ("a", 30), ("a", 5.0)):
+            aggregation.add(group, [price])
+        self.assertEqual(2, len(aggregation))
+        self.assertEqual({"a": {"count": 3, "sum": 45.0, "min": 5.0,
+                                "max": 30, "avg": 15.0},
+                          "b": {"count": 1, "sum": 4, "min": 4,
+                                "max": 4, "avg": 4.0}},
+                         aggregation.result())
+
+    def test_Aggregation_missing_values(self):
+        """check None isn't counted and only numbers are summed"""
+        aggregation = Aggregation({"count": "name", "avg": "price"})
+        aggregation.add(None, ["a", "free"])
+        aggregation.add(None, [None, None])
+        aggregation.add(["x", "y"], ["b", 3])
+        self.assertEqual({None: {"count": 1, "avg": None},
+                          ("x", "y"): {"count": 1, "avg": 3.0}},
+                         aggregation.result())
+
+    def test_Aggregation_unhashable_groups(self):
+        """check dictionaries and nested lists are grouped by their JSON"""
+        aggregation = Aggregation({"count": "name"})
+        aggregation.add({"b": 1, "a": [2]}, ["x"])
+        aggregation.add({"a": [2], "b": 1}, ["y"])
+        aggregation.add([[1, 2], {"c": 3}], ["z"])
+        self.assertEqual({'{"a": [2], "b": 1}': {"count": 2},
+                          '[[1, 2], {"c": 3}]': {"count": 1}},
+                         aggregation.result())
+
+    def test_Aggregation_empty(self):
+        """check there is no group before a row is added"""
+        self.assertEqual({}, Aggregation({"sum": "price"}).result())
+
+    def test_Aggregation_unknown_function(self):
+        """check unknown functions are refused"""
+        with self.assertRaises(ValueError):
+            Aggregation({"median": "price"})
+
+
+class KeysTest(unittest.TestCase):
+    """Group key functions test cases"""
+
+    def test_domain(self):
+        """check the domain of email addresses"""
+        self.assertEqual("hbnb.io", domain("Zak@HBNB.io"))
+        self.assertIsNone(domain("zak"))
+        self.assertIsNone(domain(None))
+
+    def test_year(self):
+        """check the year of dates and of their ISO strings"""
+        self.assertEqual(2017, year(datetime(2017, 9, 28)))
+        self.assertEqual(2017, year("2017-09-28T21:03:54.052298"))
+        self.assertIsNone(year("soon"))
+        self.assertIsNone(year(None))
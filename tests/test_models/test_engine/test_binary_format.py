@@ -0,0 +1,107 @@
+#!/usr/bin/python3
+"""binary_format test cases"""
+
+import unittest
+import json
+import os
+from datetime import datetime
+from io import BytesIO
+from models.engine import binary_format
+
+
+class BinaryFormatTest(unittest.TestCase):
+    """binary_format test cases"""
+
+    @classmethod
+    def tearDown(self):
+        for path in ("test.json", "test.bin", "test2.json"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+
+    def round_trip(self, records):
+        """dump records and load them back"""
+        file = BytesIO()
+        binary_format.dump(records, file)
+        file.seek(0)
+        return list(binary_format.load(file))
+
+    def test_binary_values(self):
+        """check every kind of value is read back"""
+        value = {"id": "1", "__class__": "Place", "name": "café",
+                 "rooms": 3, "big": -2 ** 70, "price": 12.5, "none": None,
+                 "flags": [True, False], "extra": {"a": [1, "b"]}}
+        self.assertEqual([("Place.1", value)],
+                         self.round_trip([("Place.1", value)]))
+
+    def test_binary_timestamps(self):
+        """check timestamps are stored as microseconds"""
+        moment = datetime(2017, 9, 28, 21, 5, 54, 119427)
+        records = [("User.1", {"id": "1", "created_at": moment,
+                               "updated_at": moment.isoformat()})]
+        key, value = self.round_trip(records)[0]
+        self.assertEqual(moment, value["created_at"])
+        self.assertEqual(moment, value["updated_at"])
+
+    def test_binary_schema(self):
+        """check attribute names are written once per class"""
+        records = [("User.{}".format(i), {"id": str(i), "first_name": "x"})
+                   for i in range(10)]
+        records.append(("City.1", {"id": "1", "state_id": "2"}))
+        file = BytesIO()
+        binary_format.dump(records, file)
+        self.assertEqual(1, file.getvalue().count(b"first_name"))
+        file.seek(0)
+        loaded = dict(binary_format.load(file))
+        self.assertEqual(11, len(loaded))
+        self.assertEqual("2", loaded["City.1"]["state_id"])
+
+    def test_binary_missing_attribute(self):
+        """check records of a class can have different attributes"""
+        records = [("User.1", {"id": "1", "email": "a"}),
+                   ("User.2", {"id": "2", "name": "b"})]
+        loaded = dict(self.round_trip(records))
+        self.assertNotIn("name", loaded["User.1"])
+        self.assertNotIn("email", loaded["User.2"])
+
+    def test_binary_detect(self):
+        """check detect() only accepts binary snapshots"""
+        file = BytesIO()
+        binary_format.dump([], file)
+        file.seek(0)
+        self.assertTrue(binary_format.detect(file))
+        self.assertEqual(0, file.tell())
+        self.assertFalse(binary_format.detect(BytesIO(b"{}")))
+
+    def test_binary_truncated(self):
+        """check a truncated snapshot raises ValueError"""
+        file = BytesIO()
+        binary_format.dump([("User.1", {"id": "1", "name": "Betty"})], file)
+        with self.assertRaises(ValueError):
+            list(binary_format.load(BytesIO(file.getvalue()[:-3])))
+
+    def test_binary_unserializable(self):
+        """check values JSON can't store are refused"""
+        with self.assertRaises(TypeError):
+            binary_format.dump([("User.1", {"id": "1", "x": {1, 2}})],
+                               BytesIO())
+
+    def test_binary_converters(self):
+        """check converting to binary and back keeps the records"""
+        data = {"User.1": {"id": "1", "__class__": "User",
+                           "created_at": "2017-09-28T21:05:54.119427",
+                           "updated_at": "2017-09-28T21:05:54.119572",
+                           "email": "betty@holberton.com"}}
+        with open("test.json", "w") as file:
+            json.dump(data, file)
+        binary_format.to_binary("test.json", "test.bin")
+        self.assertLess(os.path.getsize("test.bin"),
+                        os.path.getsize("test.json"))
+        binary_format.to_json("test.bin", "test2.json")
+        with open("test2.json") as file:
+            self.assertEqual(data, json.load(file))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+"""column_store test cases"""
+
+import unittest
+import math
+from array import array
+from unittest import mock
+from models.engine import column_store
+from models.engine.column_store import ColumnStore
+
+
+class ColumnStoreTest(unittest.TestCase):
+    """ColumnStore test cases"""
+
+    def setUp(self):
+        self.store = ColumnStore(["rooms", "price"])
+        self.store.update("a", [1, 100])
+        self.store.update("b", [2, 200.5])
+        self.store.update("c", [3, 300])
+
+    def test_ColumnStore_columns(self):
+        """check each attribute has an array of doubles"""
+        self.assertEqual(["a", "b", "c"], self.store.keys)
+        self.assertEqual(array("d", [1, 2, 3]), self.store.column("rooms"))
+        self.assertEqual(array("d", [100, 200.5, 300]),
+                         self.store.column("price"))
+        self.assertEqual(3, len(self.store))
+        with self.assertRaises(KeyError):
+            self.store.column("name")
+
+    def test_ColumnStore_update(self):
+        """check updating a key replaces its row"""
+        self.store.update("b", [5, 50])
+        self.assertEqual({"rooms": 5, "price": 50}, self.store.row("b"))
+        self.assertEqual(3, len(self.store))
+
+    def test_ColumnStore_not_a_number(self):
+        """check values that aren't numbers are stored as NaN"""
+        self.store.update("d", ["2", None])
+        self.store.update("e", [True, 10 ** 400])
+        self.assertTrue(math.isnan(self.store.row("d")["rooms"]))
+        self.assertTrue(math.isnan(self.store.row("d")["price"]))
+        self.assertEqual(1.0, self.store.row("e")["rooms"])
+        self.assertTrue(math.isnan(self.store.row("e")["price"]))
+
+    def test_ColumnStore_remove(self):
+        """check removing a row moves the last one into its place"""
+        self.store.remove("a")
+        self.assertEqual(["c", "b"], self.store.keys)
+        self.assertEqual(array("d", [3, 2]), self.store.column("rooms"))
+        self.assertEqual({"rooms": 3, "price": 300}, self.store.row("c"))
+        self.assertNotIn("a", self.store)
+        self.store.remove("b")
+        self.store.remove("a")
+        self.assertEqual(["c"], self.store.keys)
+        self.assertEqual(array("d", [300]), self.store.column("price"))
+
+    def test_ColumnStore_clear(self):
+        """check clear() removes every row"""
+        self.store.clear()
+        self.assertEqual(0, len(self.store))
+        self.assertEqual(array("d"), self.store.column("rooms"))
+        self.store.update("a", [1, 2])
+        self.assertEqual(["a"], self.store.keys)
+
+    def test_ColumnStore_select(self):
+        """check select() keeps the rows within every bound"""
+        self.store.update("d", [None, 150])
+        self.assertEqual(["a", "b", "d"],
+                         self.store.select({"price": (None, 250)}))
+        self.assertEqual(["b"], self.store.select({"rooms": (2, None),
+                                                   "price": (None, 250)}))
+        self.assertEqual(["a", "b", "c"],
+                         self.store.select({"rooms": (None, None)}))
+        self.assertEqual(["a", "b", "c", "d"], self.store.select({}))
+        self.assertEqual(["c"], self.store.select({"rooms": (2, 3)},
+                                                  ["c", "a", "x"]))
+        with self.assertRaises(KeyError):
+            self.store.select({"name": (1, 2)})
+        self.assertEqual([], ColumnStore(["a"]).select({"a": (1, 2)}))
+
+    def test_ColumnStore_select_paths(self):
+        """check select() gives the same keys with and without NumPy"""
+        for i in range(50):
+            self.store.update(str(i), [i % 7, i * 10])
+        self.store.remove("3")
+        queries = [({"rooms": (2, 5), "price": (100, None)}, None),
+                   ({"price": (None, 300)}, ["4", "40", "b", "a"])]
+        results = [self.store.select(*query) for query in queries]
+        with mock.patch.object(column_store, "numpy", None):
+            self.assertEqual(results, [self.store.select(*query)
+                                       for query in queries])
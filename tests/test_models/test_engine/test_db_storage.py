@@ -0,0 +1,129 @@
+#!/usr/bin/python3
+"""db_storage test cases"""
+
+import unittest
+import json
+import os
+import sqlite3
+from models.engine.db_storage import DBStorage
+from models.engine.file_storage import FileStorage
+from models.city import City
+from models.place import Place
+from models.state import State
+from models.user import User
+
+
+class DBStorageTest(unittest.TestCase):
+    """DBStorage test cases"""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.remove("test.db")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+        try:
+            os.remove("test.db")
+        except IOError:
+            pass
+
+    def rows(self, query):
+        connection = sqlite3.connect("test.db")
+        try:
+            return connection.execute(query).fetchall()
+        finally:
+            connection.close()
+
+    def test_db_is_file_storage(self):
+        """check DBStorage has the FileStorage API"""
+        self.assertTrue(issubclass(DBStorage, FileStorage))
+
+    def test_db_one_table_per_class(self):
+        """check save() writes one table per class"""
+        storage = DBStorage("test.db")
+        _user = User()
+        _city = City()
+        storage.save()
+        storage.close()
+        tables = self.rows("SELECT name FROM sqlite_master "
+                           "WHERE type = 'table' ORDER BY name")
+        self.assertEqual([("City",), ("User",)], tables)
+        data = self.rows('SELECT id, data FROM "User"')
+        self.assertEqual(_user.id, data[0][0])
+        self.assertEqual(_user.to_dict(), json.loads(data[0][1]))
+
+    def test_db_foreign_key_index(self):
+        """check foreign key columns are filled and indexed"""
+        storage = DBStorage("test.db")
+        _place = Place()
+        _place.city_id = "1234"
+        storage.save()
+        storage.close()
+        self.assertEqual([("1234",)],
+                         self.rows('SELECT city_id FROM "Place"'))
+        indexes = {row[0] for row in self.rows(
+            "SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertIn("Place_city_id", indexes)
+        self.assertIn("Place_user_id", indexes)
+
+    def test_db_upsert_and_delete(self):
+        """check save() updates and deletes rows"""
+        storage = DBStorage("test.db")
+        _user = User()
+        _state = State()
+        storage.save()
+        _user.first_name = "Betty"
+        _state.delete()
+        storage.save()
+        storage.close()
+        self.assertEqual([], self.rows('SELECT id FROM "State"'))
+        data = self.rows('SELECT data FROM "User"')
+        self.assertEqual(1, len(data))
+        self.assertEqual("Betty", json.loads(data[0][0])["first_name"])
+
+    def test_db_reload(self):
+        """check reload() reads the objects back"""
+        storage = DBStorage("test.db")
+        _user = User()
+        _user.email = "betty@holberton.com"
+        _city = City()
+        _city.state_id = "1234"
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual(2, storage.count())
+        self.assertEqual("betty@holberton.com",
+                         storage.get("User", _user.id).email)
+        self.assertEqual(["City." + _city.id],
+                         list(storage.where("City", state_id="1234")))
+        storage.close()
+
+    def test_db_reload_lazy(self):
+        """check reload() keeps the rows as text in lazy mode"""
+        storage = DBStorage("test.db")
+        _user = User()
+        storage.save()
+        storage.close()
+        FileStorage._FileStorage__objects = {}
+        storage = DBStorage("test.db", lazy=True)
+        storage.reload()
+        self.assertEqual({}, FileStorage._FileStorage__objects)
+        self.assertEqual(_user.id, storage.get(User, _user.id).id)
+        storage.close()
+
+    def test_db_compact(self):
+        """check compact() saves the changes"""
+        storage = DBStorage("test.db")
+        _user = User()
+        storage.compact()
+        storage.close()
+        self.assertEqual([(_user.id,)], self.rows('SELECT id FROM "User"'))
+
+
+if __name__ == "__main__":
+    unittest.main()
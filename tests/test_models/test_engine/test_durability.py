@@ -0,0 +1,102 @@
+#!/usr/bin/python3
+"""durability test cases"""
+
+import unittest
+import os
+import time
+from unittest import mock
+from models.engine.durability import Durability
+
+
+class DurabilityTest(unittest.TestCase):
+    """Durability test cases"""
+
+    @classmethod
+    def setUp(self):
+        with open("test.txt", "w") as file:
+            file.write("old")
+
+    @classmethod
+    def tearDown(self):
+        for path in ("test.txt", "test.txt.tmp"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+
+    def read(self):
+        with open("test.txt") as file:
+            return file.read()
+
+    def test_durability_policy(self):
+        """check unknown policies are refused"""
+        for policy in ("sometimes", -5, None):
+            with self.assertRaises(ValueError):
+                Durability(policy)
+        self.assertEqual("25", Durability("25").policy)
+
+    def test_durability_replace(self):
+        """check replace() swaps the file once it's written"""
+        with Durability().replace("test.txt") as file:
+            file.write("new")
+            self.assertEqual("old", self.read())
+        self.assertEqual("new", self.read())
+        self.assertFalse(os.path.exists("test.txt.tmp"))
+
+    def test_durability_replace_error(self):
+        """check a failed write leaves the file as it was"""
+        with self.assertRaises(RuntimeError):
+            with Durability().replace("test.txt") as file:
+                file.write("half")
+                raise RuntimeError("crash")
+        self.assertEqual("old", self.read())
+        self.assertFalse(os.path.exists("test.txt.tmp"))
+
+    def test_durability_always(self):
+        """check "always" syncs the file before replacing it"""
+        with mock.patch("os.fsync") as fsync:
+            with Durability("always").replace("test.txt") as file:
+                file.write("new")
+                fsync.assert_not_called()
+            self.assertGreaterEqual(fsync.call_count, 1)
+
+    def test_durability_never(self):
+        """check "never" doesn't sync"""
+        with mock.patch("os.fsync") as fsync:
+            durability = Durability("never")
+            with durability.replace("test.txt") as file:
+                file.write("new")
+            with open("test.txt", "a") as file:
+                durability.written(file)
+            durability.sync()
+            fsync.assert_not_called()
+
+    def test_durability_interval(self):
+        """check an interval groups the syncs of its writes"""
+        with mock.patch("os.fsync") as fsync:
+            durability = Durability(60000)
+            for _ in range(3):
+                with durability.replace("test.txt") as file:
+                    file.write("new")
+            fsync.assert_not_called()
+            durability.sync()
+            self.assertEqual(2, fsync.call_count)
+            durability.sync()
+            self.assertEqual(2, fsync.call_count)
+
+    def test_durability_interval_timer(self):
+        """check the writes are synced at the end of the interval"""
+        with mock.patch("os.fsync") as fsync:
+            durability = Durability(10)
+            with open("test.txt", "a") as file:
+                file.write("new")
+                durability.written(file)
+            for _ in range(100):
+                if fsync.called:
+                    break
+                time.sleep(0.01)
+            self.assertTrue(fsync.called)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,9 +2,16 @@
 """file_storage test cases"""
 
 import unittest
+import asyncio
+import json
 import os
+import shutil
+import threading
+import time
+from unittest import mock
 import models
 from models.base_model import BaseModel
+from models.engine import binary_format
 from models.engine.file_storage import FileStorage
 from models.amenity import Amenity
 from models.city import City
@@ -42,9 +49,8 @@ class StorageTest(unittest.TestCase):
         self.assertEqual(type(models.storage), FileStorage)
 
     def test_all_with_arg(self):
-        """check all() with an argument"""
-        with self.assertRaises(TypeError):
-            all_obj = models.storage.all(None)
+        """check all() with None returns every object"""
+        self.assertIs(models.storage.all(), models.storage.all(None))
 
     def test_all_not_empty(self):
         """check that all is not empty after saving"""
@@ -162,3 +168,1748 @@ class StorageTest(unittest.TestCase):
         self.assertIn("Place." + _place.id, content)
         self.assertIn("Review." + _review.id, content)
         self.assertIn("User." + _user.id, content)
+
+
+class StorageJournalTest(unittest.TestCase):
+    """FileStorage journal mode test cases"""
+
+    @classmethod
+    def setUp(self):
+        for name in ("file.json", "file.json.journal"):
+            try:
+                os.rename(name, "_" + name)
+            except IOError:
+                pass
+
+    @classmethod
+    def tearDown(self):
+        for name in ("file.json", "file.json.journal"):
+            try:
+                os.remove(name)
+            except IOError:
+                pass
+            try:
+                os.rename("_" + name, name)
+            except IOError:
+                pass
+
+    def test_FileStorage_journal_save_appends(self):
+        """check save() appends only the changed objects"""
+        storage = FileStorage(journal=True)
+        _user = User()
+        storage.save()
+        with open("file.json.journal", "r") as file:
+            count = len(file.readlines())
+        _user.first_name = "Betty"
+        storage.save()
+        with open("file.json.journal", "r") as file:
+            lines = file.readlines()
+        self.assertEqual(count + 1, len(lines))
+        self.assertIn('"put"', lines[-1])
+        self.assertIn("Betty", lines[-1])
+        self.assertFalse(os.path.exists("file.json"))
+
+    def test_FileStorage_journal_reload_replays(self):
+        """check reload() replays puts and deletes over the snapshot"""
+        storage = FileStorage(journal=True)
+        _user = User()
+        _city = City()
+        storage.save()
+        _city.delete()
+        _user.first_name = "Betty"
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        FileStorage(journal=True).reload()
+        content = FileStorage._FileStorage__objects
+        self.assertEqual("Betty", content["User." + _user.id].first_name)
+        self.assertNotIn("City." + _city.id, content)
+
+    def test_FileStorage_journal_failed_append(self):
+        """check the changes of a failed append are saved by the next one"""
+        storage = FileStorage(journal=True)
+        _user = User()
+        _city = City()
+        storage.save()
+        _user.first_name = "Betty"
+        _city.delete()
+        with mock.patch("models.engine.file_storage.Journal.append",
+                        side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                storage.save()
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        FileStorage(journal=True).reload()
+        content = FileStorage._FileStorage__objects
+        self.assertEqual("Betty", content["User." + _user.id].first_name)
+        self.assertNotIn("City." + _city.id, content)
+
+    def test_FileStorage_journal_compact(self):
+        """check the journal is folded into the JSON file"""
+        storage = FileStorage(journal=True, compact_threshold=2)
+        _user = User()
+        _city = City()
+        storage.save()
+        self.assertFalse(os.path.exists("file.json.journal"))
+        with open("file.json", "r") as file:
+            self.assertIn("User." + _user.id, file.read())
+        FileStorage._FileStorage__objects = {}
+        FileStorage(journal=True).reload()
+        self.assertIn("City." + _city.id, FileStorage._FileStorage__objects)
+
+
+class StorageDirtyTest(unittest.TestCase):
+    """FileStorage dirty tracking test cases"""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "_file.json")
+        except IOError:
+            pass
+
+    @classmethod
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("_file.json", "file.json")
+        except IOError:
+            pass
+
+    def test_FileStorage_save_reuses_encoding(self):
+        """check unchanged objects are not encoded again"""
+        _user = User()
+        _city = City()
+        models.storage.save()
+        calls = []
+        to_dict = City.to_dict
+
+        def counting_to_dict(obj):
+            calls.append(obj.id)
+            return to_dict(obj)
+        City.to_dict = counting_to_dict
+        try:
+            _user.first_name = "Betty"
+            models.storage.save()
+        finally:
+            City.to_dict = to_dict
+        self.assertNotIn(_city.id, calls)
+        with open("file.json", "r") as file:
+            file_content = file.read()
+        self.assertIn("Betty", file_content)
+        self.assertIn("City." + _city.id, file_content)
+
+    def test_FileStorage_delete(self):
+        """check delete() removes the object from the file"""
+        _user = User()
+        models.storage.save()
+        _user.delete()
+        self.assertNotIn("User." + _user.id, models.storage.all())
+        models.storage.save()
+        with open("file.json", "r") as file:
+            self.assertNotIn("User." + _user.id, file.read())
+
+    def test_FileStorage_delete_none(self):
+        """check delete() with None does nothing"""
+        count = len(models.storage.all())
+        models.storage.delete(None)
+        self.assertEqual(count, len(models.storage.all()))
+
+    def test_FileStorage_replaced_objects(self):
+        """check a replaced objects dictionary is saved in full"""
+        _user = User()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        _city = City()
+        models.storage.save()
+        with open("file.json", "r") as file:
+            file_content = file.read()
+        self.assertIn("City." + _city.id, file_content)
+        self.assertNotIn("User." + _user.id, file_content)
+
+    def test_FileStorage_replaced_objects_reuse_fragments(self):
+        """check objects moved to a new dictionary are not encoded again"""
+        _user = User()
+        _city = City()
+        models.storage.save()
+        FileStorage._FileStorage__objects = dict(models.storage.all())
+        _city.name = "Fes"
+        with mock.patch.object(User, "to_dict") as to_dict:
+            models.storage.save()
+        to_dict.assert_not_called()
+        with open("file.json", "r") as file:
+            data = json.load(file)
+        self.assertEqual(_user.to_dict(), data["User." + _user.id])
+        self.assertEqual("Fes", data["City." + _city.id]["name"])
+
+
+class StorageClassTest(unittest.TestCase):
+    """FileStorage per class partition test cases"""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "_file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("_file.json", "file.json")
+        except IOError:
+            pass
+
+    def test_all_with_class(self):
+        """check all() with a class or a class name"""
+        _user = User()
+        _city = City()
+        self.assertEqual({"User." + _user.id: _user},
+                         models.storage.all(User))
+        self.assertEqual({"City." + _city.id: _city},
+                         models.storage.all("City"))
+        self.assertEqual({}, models.storage.all("Unknown"))
+
+    def test_count(self):
+        """check count() with and without a class"""
+        User()
+        User()
+        City()
+        self.assertEqual(3, models.storage.count())
+        self.assertEqual(2, models.storage.count(User))
+        self.assertEqual(1, models.storage.count("City"))
+        self.assertEqual(0, models.storage.count("State"))
+
+    def test_count_after_delete(self):
+        """check delete() updates the class partition"""
+        _user = User()
+        _user.delete()
+        self.assertEqual(0, models.storage.count(User))
+        self.assertEqual({}, models.storage.all(User))
+
+    def test_count_after_reload(self):
+        """check reload() fills the class partitions"""
+        _user = User()
+        _user.save()
+        FileStorage._FileStorage__objects = {}
+        self.assertEqual(0, models.storage.count(User))
+        models.storage.reload()
+        self.assertEqual(1, models.storage.count(User))
+        self.assertIn("User." + _user.id, models.storage.all(User))
+
+    def test_count_after_direct_change(self):
+        """check objects removed from __objects directly aren't counted"""
+        _user = User()
+        del models.storage.all()["User." + _user.id]
+        self.assertEqual(0, models.storage.count(User))
+
+
+class StorageIndexTest(unittest.TestCase):
+    """FileStorage secondary index test cases"""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "_file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("_file.json", "file.json")
+        except IOError:
+            pass
+
+    def test_where_indexed(self):
+        """check where() on an indexed attribute"""
+        _city1 = City()
+        _city1.state_id = "s1"
+        _city2 = City()
+        _city2.state_id = "s2"
+        self.assertEqual({"City." + _city1.id: _city1},
+                         models.storage.where(City, state_id="s1"))
+
+    def test_where_follows_updates(self):
+        """check the index follows attribute changes and deletes"""
+        _city = City()
+        _city.state_id = "s1"
+        models.storage.where(City, state_id="s1")
+        _city.state_id = "s2"
+        self.assertEqual({}, models.storage.where(City, state_id="s1"))
+        self.assertIn("City." + _city.id,
+                      models.storage.where(City, state_id="s2"))
+        _city.delete()
+        self.assertEqual({}, models.storage.where(City, state_id="s2"))
+
+    def test_where_not_indexed(self):
+        """check where() on attributes without an index"""
+        _city = City()
+        _city.state_id = "s1"
+        _city.name = "Fes"
+        self.assertEqual({"City." + _city.id: _city},
+                         models.storage.where("City", name="Fes",
+                                              state_id="s1"))
+        self.assertEqual({}, models.storage.where("City", name="Rabat"))
+
+    def test_where_after_reload(self):
+        """check indexes are rebuilt after reload()"""
+        _review = Review()
+        _review.place_id = "p1"
+        _review.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertIn("Review." + _review.id,
+                      models.storage.where(Review, place_id="p1"))
+
+    def test_add_index(self):
+        """check add_index() indexes existing objects"""
+        _user = User()
+        _user.email = "betty@mail.com"
+        models.storage.add_index(User, "email")
+        self.assertIn("User." + _user.id,
+                      models.storage.where(User, email="betty@mail.com"))
+
+
+class StorageColumnsTest(unittest.TestCase):
+    """FileStorage column store test cases"""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "_file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("_file.json", "file.json")
+        except IOError:
+            pass
+
+    def rows(self, storage):
+        """return the rows of the Place column store by key"""
+        store = storage.columns(Place)
+        return {key: store.row(key) for key in store.keys}
+
+    def test_columns_declared(self):
+        """check the Place numeric attributes are kept in columns"""
+        self.assertEqual(("number_rooms", "number_bathrooms", "max_guest",
+                          "price_by_night", "latitude", "longitude"),
+                         models.storage.columns("Place").attrs)
+        self.assertIsNone(models.storage.columns(User))
+
+    def test_columns_new_update_delete(self):
+        """check the columns follow new(), updates and delete()"""
+        storage = FileStorage()
+        _place = Place()
+        _place2 = Place()
+        self.assertEqual(0, self.rows(storage)["Place." + _place.id]
+                         ["number_rooms"])
+        _place.number_rooms = 4
+        _place.latitude = 33.5
+        _place3 = Place()
+        row = self.rows(storage)["Place." + _place.id]
+        self.assertEqual(4, row["number_rooms"])
+        self.assertEqual(33.5, row["latitude"])
+        _place2.delete()
+        self.assertEqual({"Place." + _place.id, "Place." + _place3.id},
+                         set(self.rows(storage)))
+
+    def test_columns_reload(self):
+        """check the columns are built from the file"""
+        storage = FileStorage()
+        _place = Place()
+        _place.price_by_night = 120
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual(120, self.rows(storage)["Place." + _place.id]
+                         ["price_by_night"])
+
+    def test_columns_lazy(self):
+        """check the columns are built without hydrating objects"""
+        storage = FileStorage(lazy=True)
+        _place = Place()
+        _place.max_guest = 6
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual(6, self.rows(storage)["Place." + _place.id]
+                         ["max_guest"])
+        self.assertNotIn("Place." + _place.id,
+                         FileStorage._FileStorage__objects)
+
+    def test_add_columns_extends(self):
+        """check add_columns() adds to the attributes of a class"""
+        storage = FileStorage()
+        _user = User()
+        _user.age = 30
+        storage.add_columns(User, "age")
+        storage.add_columns("User", "age", "height")
+        try:
+            store = storage.columns("User")
+            self.assertEqual(("age", "height"), store.attrs)
+            self.assertEqual(30, store.row("User." + _user.id)["age"])
+        finally:
+            del FileStorage._FileStorage__columns["User"]
+
+
+class StorageSpatialTest(unittest.TestCase):
+    """FileStorage spatial index test cases"""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "_file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("_file.json", "file.json")
+        except IOError:
+            pass
+
+    def test_spatial_index_follows_changes(self):
+        """check the index follows new(), updates and delete()"""
+        storage = FileStorage()
+        _place = Place()
+        _place2 = Place()
+        _place.latitude = 40.0
+        _place.longitude = -3.7
+        index = storage.spatial_index(Place)
+        self.assertEqual(["Place." + _place.id], index.within(39, -4, 41, -3))
+        self.assertEqual(["Place." + _place2.id], index.within(-1, -1, 1, 1))
+        _place.delete()
+        self.assertEqual([], index.within(39, -4, 41, -3))
+        self.assertIsNone(storage.spatial_index(User))
+
+    def test_spatial_index_lazy(self):
+        """check the indexes decode each record once, without hydrating"""
+        storage = FileStorage(lazy=True)
+        _place = Place()
+        _place.latitude = 40.0
+        _place.longitude = -3.7
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        loads = mock.Mock(wraps=json.loads)
+        with mock.patch("models.engine.file_storage.json.loads", loads):
+            index = storage.spatial_index("Place")
+        self.assertEqual(1, loads.call_count)
+        self.assertEqual(["Place." + _place.id],
+                         [key for d, key in index.nearest(40.0, -3.7)])
+        self.assertNotIn("Place." + _place.id,
+                         FileStorage._FileStorage__objects)
+
+
+class StorageTextTest(unittest.TestCase):
+    """FileStorage full-text index test cases"""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "_file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__texts_indexed = False
+        for name in ("file.json", "file.json.text"):
+            try:
+                os.remove(name)
+            except IOError:
+                pass
+        try:
+            os.rename("_file.json", "file.json")
+        except IOError:
+            pass
+
+    def test_find_follows_changes(self):
+        """check find() follows new(), updates and delete()"""
+        storage = FileStorage()
+        _place = Place()
+        _place2 = Place()
+        _place.name = "Sea view"
+        _place2.description = "Pool with a sea view"
+        self.assertEqual([_place, _place2], storage.find(Place, "sea view"))
+        self.assertEqual([_place2], storage.find("Place", "pool"))
+        _place2.description = "Garden"
+        self.assertEqual([_place], storage.find(Place, "sea OR pool"))
+        _place.delete()
+        self.assertEqual([], storage.find(Place, "sea"))
+        with self.assertRaises(ValueError):
+            storage.find(User, "sea")
+        self.assertIsNone(storage.text_index(User))
+
+    def test_find_reviews(self):
+        """check find() on the text of reviews"""
+        storage = FileStorage()
+        _review = Review()
+        _review.text = "Great stay, great host"
+        Review().text = "Great"
+        self.assertEqual([_review], storage.find(Review, "host"))
+
+    def test_text_index_saved_beside_file(self):
+        """check the text indexes are restored from their file by reload()"""
+        storage = FileStorage()
+        _place = Place()
+        _place.name = "Sea view"
+        storage.save()
+        self.assertFalse(os.path.exists("file.json.text"))
+        storage.find(Place, "sea")
+        storage.save()
+        self.assertTrue(os.path.exists("file.json.text"))
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        with mock.patch.object(FileStorage,
+                               "_FileStorage__build_text_indexes") as build:
+            found = storage.find(Place, "sea")
+        build.assert_not_called()
+        self.assertEqual(["Place." + _place.id],
+                         ["Place." + obj.id for obj in found])
+
+    def test_text_index_file_read_on_first_use(self):
+        """check reload() only reads the fingerprint of the saved indexes"""
+        storage = FileStorage(lazy=True)
+        _place = Place()
+        _place.name = "Sea view"
+        _place2 = Place()
+        _place2.name = "Garden"
+        storage.find(Place, "sea")
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        load = mock.Mock(wraps=json.load)
+        with mock.patch("models.engine.file_storage.json.load", load):
+            storage.reload()
+        load.assert_not_called()
+        self.assertFalse(FileStorage._FileStorage__texts_indexed)
+        storage.get(Place, _place.id).name = "Garden view"
+        storage.get(Place, _place2.id).delete()
+        _place3 = Place()
+        _place3.description = "Sea"
+        with mock.patch.object(FileStorage,
+                               "_FileStorage__build_text_indexes") as build:
+            self.assertEqual([_place3.id],
+                             [obj.id for obj in storage.find(Place, "sea")])
+            self.assertEqual([_place.id],
+                             [obj.id for obj in storage.find(Place,
+                                                             "garden")])
+        build.assert_not_called()
+
+    def test_text_index_file_outdated(self):
+        """check text indexes saved with another file are rebuilt"""
+        storage = FileStorage()
+        _place = Place()
+        _place.name = "Sea view"
+        storage.find(Place, "sea")
+        storage.save()
+        with open("file.json", "r", encoding="UTF8") as file:
+            values = json.load(file)
+        values["Place." + _place.id]["name"] = "Garden"
+        with open("file.json", "w", encoding="UTF8") as file:
+            json.dump(values, file)
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual([], storage.find(Place, "sea"))
+        self.assertEqual(1, len(storage.find(Place, "garden")))
+
+    def test_text_index_lazy(self):
+        """check the index is built without hydrating objects"""
+        storage = FileStorage(lazy=True)
+        _place = Place()
+        _place.description = "Pool"
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual(["Place." + _place.id],
+                         [key for score, key in
+                          storage.text_index(Place).search("pool")])
+        self.assertNotIn("Place." + _place.id,
+                         FileStorage._FileStorage__objects)
+
+
+class StorageAggregateTest(unittest.TestCase):
+    """FileStorage aggregate test cases"""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "_file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("_file.json", "file.json")
+        except IOError:
+            pass
+
+    def create_places(self):
+        """create places in two cities"""
+        for city_id, price in (("c1", 100), ("c2", 40), ("c1", 50)):
+            _place = Place()
+            _place.city_id = city_id
+            _place.price_by_night = price
+
+    def test_aggregate_by(self):
+        """check the aggregates of each group"""
+        self.create_places()
+        storage = FileStorage()
+        self.assertEqual({"c1": {"avg": 75.0, "count": 2},
+                          "c2": {"avg": 40.0, "count": 1}},
+                         storage.aggregate(Place, avg="price_by_night",
+                                           count="id", by="city_id"))
+        self.assertEqual({None: {"count": 3}}, storage.aggregate("Place"))
+        self.assertEqual({}, storage.aggregate(User))
+        with self.assertRaises(ValueError):
+            storage.aggregate(Place, median="price_by_night")
+
+    def test_aggregate_key(self):
+        """check groups computed from the values of an attribute"""
+        for email in ("a@hbnb.io", "b@hbnb.io", "c@mail.com", ""):
+            User().email = email
+        self.assertEqual({"hbnb.io": {"count": 2}, "mail.com": {"count": 1},
+                          "": {"count": 1}},
+                         FileStorage().aggregate(
+                             User, by="email",
+                             key=lambda email: email.rpartition("@")[2]))
+
+    def test_aggregate_lazy(self):
+        """check aggregates are computed without hydrating objects"""
+        storage = FileStorage(lazy=True)
+        self.create_places()
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual({"c1": {"sum": 150, "max": 100},
+                          "c2": {"sum": 40, "max": 40}},
+                         storage.aggregate(Place, sum="price_by_night",
+                                           max="price_by_night",
+                                           by="city_id"))
+        self.assertEqual({}, FileStorage._FileStorage__objects)
+
+
+class StorageLazyTest(unittest.TestCase):
+    """FileStorage lazy mode test cases"""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "_file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("_file.json", "file.json")
+        except IOError:
+            pass
+
+    def reload(self):
+        """save the objects and reload them in a lazy storage"""
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage = FileStorage(lazy=True)
+        storage.reload()
+        return storage
+
+    def test_lazy_reload_builds_nothing(self):
+        """check reload() doesn't build the objects"""
+        User()
+        City()
+        storage = self.reload()
+        self.assertEqual({}, FileStorage._FileStorage__objects)
+        self.assertEqual(2, storage.count())
+        self.assertEqual(1, storage.count(User))
+
+    def test_lazy_get(self):
+        """check get() builds only the requested object"""
+        _user = User()
+        _user.first_name = "Betty"
+        _city = City()
+        storage = self.reload()
+        obj = storage.get(User, _user.id)
+        self.assertEqual("Betty", obj.first_name)
+        self.assertIs(obj, storage.get("User", _user.id))
+        self.assertEqual(["User." + _user.id],
+                         list(FileStorage._FileStorage__objects))
+        self.assertIsNone(storage.get(User, "unknown"))
+
+    def test_lazy_all(self):
+        """check all() builds the objects it returns"""
+        _user = User()
+        _city = City()
+        storage = self.reload()
+        self.assertEqual(["User." + _user.id], list(storage.all(User)))
+        self.assertNotIn("City." + _city.id,
+                         FileStorage._FileStorage__objects)
+        self.assertIn("City." + _city.id, storage.all())
+
+    def test_lazy_where(self):
+        """check where() builds only the matching objects"""
+        _city1 = City()
+        _city1.state_id = "s1"
+        _city1.name = "Fes"
+        _city2 = City()
+        _city2.state_id = "s2"
+        storage = self.reload()
+        self.assertEqual(["City." + _city1.id],
+                         list(storage.where(City, state_id="s1")))
+        self.assertEqual(["City." + _city1.id],
+                         list(storage.where(City, name="Fes")))
+        self.assertEqual(["City." + _city1.id],
+                         list(FileStorage._FileStorage__objects))
+
+    def test_lazy_save(self):
+        """check save() writes the objects that were never built"""
+        _user = User()
+        _city = City()
+        storage = self.reload()
+        storage.get(City, _city.id).name = "Fes"
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        content = FileStorage._FileStorage__objects
+        self.assertIn("User." + _user.id, content)
+        self.assertEqual("Fes", content["City." + _city.id].name)
+
+
+class StorageStreamTest(unittest.TestCase):
+    """FileStorage streaming reload test cases"""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "_file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("_file.json", "file.json")
+        except IOError:
+            pass
+
+    def test_reload_indented_file(self):
+        """check reload() of a file written with another layout"""
+        _user = User()
+        _user.first_name = "Betty"
+        data = {"User." + _user.id: _user.to_dict()}
+        with open("file.json", "w") as file:
+            json.dump(data, file, indent=4)
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        obj = models.storage.all()["User." + _user.id]
+        self.assertEqual("Betty", obj.first_name)
+        self.assertEqual(_user.created_at, obj.created_at)
+
+    def test_reload_then_save(self):
+        """check objects read by reload() are written back unchanged"""
+        _user = User()
+        _user.first_name = "Betty"
+        _user.save()
+        with open("file.json", "r") as file:
+            expected = json.load(file)
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        models.storage.save()
+        with open("file.json", "r") as file:
+            self.assertEqual(expected, json.load(file))
+
+    def test_save_empty(self):
+        """check save() with no objects writes an empty object"""
+        models.storage.save()
+        with open("file.json", "r") as file:
+            self.assertEqual({}, json.load(file))
+
+    def test_save_key_needing_escapes(self):
+        """check keys are escaped when written"""
+        _user = User()
+        _user.id = 'a"b'
+        models.storage.new(_user)
+        models.storage.save()
+        with open("file.json", "r") as file:
+            self.assertIn('User.a"b', json.load(file))
+
+
+class StorageShardsTest(unittest.TestCase):
+    """FileStorage sharded layout test cases"""
+
+    @classmethod
+    def setUp(self):
+        shutil.rmtree("test_shards", ignore_errors=True)
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+        shutil.rmtree("test_shards", ignore_errors=True)
+
+    def test_shards_journal(self):
+        """check shards can't be used with a journal"""
+        with self.assertRaises(ValueError):
+            FileStorage(journal=True, shards="test_shards")
+
+    def test_shards_one_file_per_class(self):
+        """check save() writes one file per class"""
+        storage = FileStorage(shards="test_shards")
+        _user = User()
+        _city = City()
+        storage.save()
+        self.assertEqual(["City.json", "User.json"],
+                         sorted(os.listdir("test_shards")))
+        with open(os.path.join("test_shards", "User.json")) as file:
+            self.assertEqual(["User." + _user.id], list(json.load(file)))
+
+    def test_shards_save_only_dirty(self):
+        """check save() only rewrites the files of changed classes"""
+        storage = FileStorage(shards="test_shards")
+        _user = User()
+        _city = City()
+        storage.save()
+        city_path = os.path.join("test_shards", "City.json")
+        with open(city_path, "w") as file:
+            file.write("{}")
+        _user.first_name = "Betty"
+        storage.save()
+        with open(city_path) as file:
+            self.assertEqual("{}", file.read())
+        with open(os.path.join("test_shards", "User.json")) as file:
+            self.assertIn("Betty", file.read())
+
+    def test_shards_delete(self):
+        """check save() rewrites the file of a deleted object"""
+        storage = FileStorage(shards="test_shards")
+        _user = User()
+        storage.save()
+        _user.delete()
+        storage.save()
+        with open(os.path.join("test_shards", "User.json")) as file:
+            self.assertEqual({}, json.load(file))
+
+    def test_shards_reload_on_demand(self):
+        """check reload() reads a class file when the class is needed"""
+        storage = FileStorage(shards="test_shards")
+        _user = User()
+        _city = City()
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual({}, FileStorage._FileStorage__objects)
+        self.assertIsNotNone(storage.get(User, _user.id))
+        self.assertEqual(["User." + _user.id],
+                         list(FileStorage._FileStorage__objects))
+        self.assertEqual(2, storage.count())
+
+    def test_shards_failed_write(self):
+        """check the classes of a failed write are written by the next save"""
+        storage = FileStorage(shards="test_shards")
+        _user = User()
+        storage.save()
+        _user.first_name = "Betty"
+        with mock.patch("models.engine.durability.Durability.replace",
+                        side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                storage.save()
+        storage.save()
+        with open(os.path.join("test_shards", "User.json")) as file:
+            self.assertEqual("Betty",
+                             json.load(file)["User." + _user.id]["first_name"])
+
+    def test_shards_save_unread_class(self):
+        """check saving a class whose file wasn't read keeps its objects"""
+        storage = FileStorage(shards="test_shards")
+        _user1 = User()
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        _user2 = User()
+        storage.save()
+        self.assertEqual(2, storage.count(User))
+        with open(os.path.join("test_shards", "User.json")) as file:
+            self.assertEqual(2, len(json.load(file)))
+
+
+class StorageBinaryTest(unittest.TestCase):
+    """FileStorage binary format test cases"""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "_file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("_file.json", "file.json")
+        except IOError:
+            pass
+
+    def test_binary_unknown_format(self):
+        """check an unknown format is refused"""
+        with self.assertRaises(ValueError):
+            FileStorage(format="xml")
+
+    def test_binary_shards(self):
+        """check the binary format can't be used with shards"""
+        with self.assertRaises(ValueError):
+            FileStorage(shards="test_shards", format="binary")
+
+    def test_binary_save(self):
+        """check save() writes a binary snapshot"""
+        storage = FileStorage(format="binary")
+        User()
+        storage.save()
+        with open("file.json", "rb") as file:
+            self.assertTrue(file.read().startswith(binary_format.MAGIC))
+
+    def test_binary_reload(self):
+        """check reload() reads a binary snapshot back"""
+        storage = FileStorage(format="binary")
+        _user = User()
+        _user.first_name = "Betty"
+        _place = Place()
+        _place.latitude = 37.77
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        obj = storage.get(User, _user.id)
+        self.assertEqual("Betty", obj.first_name)
+        self.assertEqual(_user.created_at, obj.created_at)
+        self.assertEqual(_user.updated_at, obj.updated_at)
+        self.assertEqual(37.77, storage.get(Place, _place.id).latitude)
+
+    def test_binary_detect_format(self):
+        """check reload() detects the format of the file"""
+        _user = User()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        FileStorage(format="binary").reload()
+        self.assertIn("User." + _user.id, models.storage.all())
+        FileStorage(format="binary").save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertIn("User." + _user.id, models.storage.all())
+
+    def test_binary_reload_lazy(self):
+        """check a binary snapshot can be read in lazy mode"""
+        _user = User()
+        FileStorage(format="binary").save()
+        FileStorage._FileStorage__objects = {}
+        storage = FileStorage(lazy=True, format="binary")
+        storage.reload()
+        self.assertEqual({}, FileStorage._FileStorage__objects)
+        obj = storage.get(User, _user.id)
+        self.assertEqual(_user.created_at, obj.created_at)
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual(1, storage.count(User))
+
+
+class StorageMappedTest(unittest.TestCase):
+    """FileStorage mapped mode test cases"""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "_file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+        if FileStorage._FileStorage__map is not None:
+            FileStorage._FileStorage__map.close()
+            FileStorage._FileStorage__map = None
+        for path in ("file.json", "file.json.idx"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        try:
+            os.rename("_file.json", "file.json")
+        except IOError:
+            pass
+
+    def test_mapped_binary(self):
+        """check mapped mode needs a single JSON file"""
+        with self.assertRaises(ValueError):
+            FileStorage(format="binary", mapped=True)
+        with self.assertRaises(ValueError):
+            FileStorage(shards="test_shards", mapped=True)
+
+    def test_mapped_reload(self):
+        """check reload() only keeps the location of each object"""
+        _user = User()
+        _user.first_name = "Béatrice"
+        _city = City()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage = FileStorage(mapped=True)
+        storage.reload()
+        self.assertEqual({}, FileStorage._FileStorage__objects)
+        self.assertEqual(2, storage.count())
+        with open("file.json.idx") as file:
+            index = json.load(file)["index"]
+        self.assertEqual(["City." + _city.id, "User." + _user.id],
+                         sorted(index))
+        obj = storage.get(User, _user.id)
+        self.assertEqual("Béatrice", obj.first_name)
+        self.assertEqual(_user.created_at, obj.created_at)
+        self.assertEqual(["City." + _city.id],
+                         list(FileStorage._FileStorage__pending))
+
+    def test_mapped_non_ascii_id(self):
+        """check the keys are decoded as written when the index is built"""
+        _user = User(id="café")
+        _user.first_name = "Béatrice"
+        models.storage.new(_user)
+        _city = City(id="東京")
+        models.storage.new(_city)
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage = FileStorage(mapped=True)
+        storage.reload()
+        self.assertEqual(["City.東京", "User.café"],
+                         sorted(FileStorage._FileStorage__pending))
+        self.assertEqual("Béatrice", storage.get(User, "café").first_name)
+        self.assertEqual(_city.created_at,
+                         storage.get(City, "東京").created_at)
+
+    def test_mapped_index_reused(self):
+        """check the index is only rebuilt when the file changed"""
+        _user = User()
+        _city = City()
+        models.storage.save()
+        storage = FileStorage(mapped=True)
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        with open("file.json.idx") as file:
+            data = json.load(file)
+        del data["index"]["City." + _city.id]
+        with open("file.json.idx", "w") as file:
+            json.dump(data, file)
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual(1, storage.count())
+        stat = os.stat("file.json")
+        os.utime("file.json", ns=(stat.st_atime_ns,
+                                  stat.st_mtime_ns + 1000))
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual(2, storage.count())
+
+    def test_mapped_file_rewritten(self):
+        """check objects removed from the file by another writer are gone"""
+        _user = User()
+        _user.first_name = "Béatrice"
+        _city = City()
+        _place = Place()
+        models.storage.save()
+        storage = FileStorage(mapped=True)
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        with open("file.json", "r", encoding="UTF8") as file:
+            values = json.load(file)
+        del values["City." + _city.id]
+        values["Place." + _place.id]["name"] = "Château"
+        with open("file.json", "w", encoding="UTF8") as file:
+            json.dump(values, file)
+        storage.reload()
+        objs = storage.all()
+        self.assertEqual(["Place." + _place.id, "User." + _user.id],
+                         sorted(objs))
+        self.assertEqual("Château", objs["Place." + _place.id].name)
+        self.assertEqual("Béatrice", objs["User." + _user.id].first_name)
+
+    def test_mapped_save(self):
+        """check save() keeps the objects never built readable"""
+        _user = User()
+        _user.first_name = "Béatrice"
+        _place = Place()
+        _city = City()
+        models.storage.save()
+        storage = FileStorage(mapped=True)
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        storage.get(Place, _place.id).name = "Château"
+        storage.save()
+        with open("file.json", "rb") as file:
+            data = file.read()
+        with open("file.json.idx") as file:
+            index = json.load(file)
+        self.assertEqual(len(data), index["size"])
+        for key, (offset, length) in index["index"].items():
+            value = json.loads(data[offset:offset + length])
+            self.assertEqual(key, value["__class__"] + "." + value["id"])
+        self.assertEqual("Béatrice",
+                         storage.get(User, _user.id).first_name)
+        self.assertEqual(_city.id, storage.get(City, _city.id).id)
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual("Château", storage.get(Place, _place.id).name)
+
+
+class StorageDurabilityTest(unittest.TestCase):
+    """FileStorage atomic writes and fsync policy test cases"""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "_file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+        for path in ("file.json", "file.json.journal"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        try:
+            os.rename("_file.json", "file.json")
+        except IOError:
+            pass
+
+    def test_fsync_unknown_policy(self):
+        """check an unknown fsync policy is refused"""
+        with self.assertRaises(ValueError):
+            FileStorage(fsync="sometimes")
+
+    def test_fsync_always(self):
+        """check save() syncs the file with the "always" policy"""
+        storage = FileStorage(fsync="always")
+        _user = User()
+        with mock.patch("os.fsync") as fsync:
+            storage.save()
+            self.assertTrue(fsync.called)
+        self.assertFalse(os.path.exists("file.json.tmp"))
+        with open("file.json") as file:
+            self.assertIn("User." + _user.id, json.load(file))
+
+    def test_fsync_journal(self):
+        """check journal appends follow the policy"""
+        storage = FileStorage(journal=True, fsync="always")
+        User()
+        with mock.patch("os.fsync") as fsync:
+            storage.save()
+            self.assertEqual(1, fsync.call_count)
+
+    def test_save_failure_keeps_file(self):
+        """check a failed save leaves the previous file"""
+        _user = User()
+        models.storage.save()
+        with open("file.json") as file:
+            expected = file.read()
+        with mock.patch("json.JSONEncoder.encode",
+                        side_effect=RuntimeError("crash")):
+            _user.first_name = "Betty"
+            with self.assertRaises(RuntimeError):
+                models.storage.save()
+        with open("file.json") as file:
+            self.assertEqual(expected, file.read())
+
+
+class StorageCoalesceTest(unittest.TestCase):
+    """FileStorage write coalescing test cases"""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "_file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("_file.json", "file.json")
+        except IOError:
+            pass
+
+    def test_batch(self):
+        """check the saves of a batch are written once at its end"""
+        storage = FileStorage()
+        with mock.patch.object(storage, "_prepare",
+                               wraps=storage._prepare) as write:
+            with storage.batch():
+                for _ in range(10):
+                    User()
+                    storage.save()
+                with storage.batch():
+                    storage.save()
+                write.assert_not_called()
+            self.assertEqual(1, write.call_count)
+        with open("file.json") as file:
+            self.assertEqual(10, len(json.load(file)))
+
+    def test_batch_flush(self):
+        """check flush() writes inside a batch"""
+        storage = FileStorage()
+        with storage.batch():
+            _user = User()
+            storage.save()
+            storage.flush()
+            self.assertTrue(os.path.exists("file.json"))
+
+    def test_coalesce_window(self):
+        """check saves within the window are deferred"""
+        storage = FileStorage(coalesce=60000)
+        with mock.patch.object(storage, "_prepare",
+                               wraps=storage._prepare) as write:
+            User()
+            storage.save()
+            _user = User()
+            storage.save()
+            storage.save()
+            self.assertEqual(1, write.call_count)
+            storage.flush()
+            self.assertEqual(2, write.call_count)
+            storage.flush()
+            self.assertEqual(2, write.call_count)
+        with open("file.json") as file:
+            self.assertIn("User." + _user.id, json.load(file))
+
+    def test_coalesce_window_elapsed(self):
+        """check a save after the window writes"""
+        storage = FileStorage(coalesce=1)
+        with mock.patch.object(storage, "_prepare",
+                               wraps=storage._prepare) as write:
+            storage.save()
+            time.sleep(0.01)
+            storage.save()
+            self.assertEqual(2, write.call_count)
+
+    def test_coalesce_window_closed(self):
+        """check a deferred save is written when the window closes"""
+        storage = FileStorage(coalesce=50)
+        with mock.patch.object(storage, "_prepare",
+                               wraps=storage._prepare) as write:
+            storage.save()
+            _user = User()
+            storage.save()
+            self.assertEqual(1, write.call_count)
+            time.sleep(0.3)
+            self.assertEqual(2, write.call_count)
+        with open("file.json") as file:
+            self.assertIn("User." + _user.id, json.load(file))
+
+    def test_coalesce_batch_window_closed(self):
+        """check the window closing inside a batch doesn't write"""
+        storage = FileStorage(coalesce=50)
+        with mock.patch.object(storage, "_prepare",
+                               wraps=storage._prepare) as write:
+            storage.save()
+            User()
+            storage.save()
+            with storage.batch():
+                time.sleep(0.3)
+                self.assertEqual(1, write.call_count)
+            self.assertEqual(2, write.call_count)
+
+    def test_coalesce_reload(self):
+        """check reload() writes the deferred saves first"""
+        storage = FileStorage(coalesce=60000)
+        storage.save()
+        _user = User()
+        _user.first_name = "Betty"
+        storage.save()
+        storage.reload()
+        self.assertEqual("Betty", storage.get(User, _user.id).first_name)
+        with open("file.json") as file:
+            self.assertIn("User." + _user.id, json.load(file))
+
+
+class StorageBackgroundTest(unittest.TestCase):
+    """FileStorage background writer test cases"""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "_file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+        for path in ("file.json", "file.json.journal"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        try:
+            os.rename("_file.json", "file.json")
+        except IOError:
+            pass
+
+    def test_background_mapped(self):
+        """check mapped mode can't write in the background"""
+        with self.assertRaises(ValueError):
+            FileStorage(mapped=True, background=True)
+
+    def test_background_save(self):
+        """check save() returns before the write and wait() waits"""
+        storage = FileStorage(background=True)
+        release = threading.Event()
+        storage._FileStorage__writer.submit(release.wait)
+        _user = User()
+        storage.save()
+        self.assertFalse(os.path.exists("file.json"))
+        release.set()
+        storage.wait()
+        with open("file.json") as file:
+            self.assertIn("User." + _user.id, json.load(file))
+
+    def test_background_snapshot(self):
+        """check a save writes the state at the time of the call"""
+        storage = FileStorage(background=True)
+        release = threading.Event()
+        storage._FileStorage__writer.submit(release.wait)
+        _user = User()
+        _user.first_name = "Betty"
+        storage.save()
+        _user.first_name = "Holberton"
+        release.set()
+        storage.wait()
+        with open("file.json") as file:
+            data = json.load(file)
+        self.assertEqual("Betty", data["User." + _user.id]["first_name"])
+        storage.flush()
+
+    def test_background_journal(self):
+        """check journal appends are written in order"""
+        storage = FileStorage(journal=True, background=True)
+        _user = User()
+        for name in ("a", "b", "c"):
+            _user.first_name = name
+            storage.save()
+        storage.flush()
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual("c", storage.get(User, _user.id).first_name)
+
+    def test_background_error(self):
+        """check a failed write is reported by the next call"""
+        storage = FileStorage(background=True)
+        with mock.patch.object(FileStorage, "_FileStorage__dump",
+                               side_effect=OSError("disk full")):
+            User()
+            storage.save()
+            with self.assertRaises(OSError):
+                storage.wait()
+        storage.save()
+        storage.wait()
+        self.assertTrue(os.path.exists("file.json"))
+
+    def test_background_error_journal(self):
+        """check a change whose append failed is appended by the next save"""
+        storage = FileStorage(journal=True, background=True)
+        _user = User()
+        storage.save()
+        storage.wait()
+        _user.first_name = "Betty"
+        with mock.patch("models.engine.file_storage.Journal.append",
+                        side_effect=OSError("disk full")):
+            storage.save()
+            with self.assertRaises(OSError):
+                storage.wait()
+        storage.save()
+        storage.wait()
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual("Betty", storage.get(User, _user.id).first_name)
+
+
+def slow_members(members):
+    """Return a FileStorage.__members that sleeps before working."""
+    def slow(*args, **kwargs):
+        time.sleep(0.3)
+        return members(*args, **kwargs)
+    return slow
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "needs os.fork()")
+class StorageBgsaveTest(unittest.TestCase):
+    """FileStorage background snapshot test cases"""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "_file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+        for path in ("file.json", "file.json.journal", "file.json.bgsave"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        try:
+            os.rename("_file.json", "file.json")
+        except IOError:
+            pass
+
+    def read(self):
+        with open("file.json") as file:
+            return json.load(file)
+
+    def test_bgsave_shards(self):
+        """check bgsave() needs a single snapshot file"""
+        with self.assertRaises(ValueError):
+            FileStorage(shards="test_shards").bgsave()
+
+    def test_bgsave(self):
+        """check bgsave() writes the snapshot from a child process"""
+        storage = FileStorage()
+        self.assertIsNone(storage.bgsave_status())
+        _user = User()
+        self.assertTrue(storage.bgsave())
+        self.assertEqual("ok", storage.bgsave_status(wait=True))
+        self.assertIn("User." + _user.id, self.read())
+        self.assertFalse(os.path.exists("file.json.bgsave"))
+
+    def test_bgsave_copy_on_write(self):
+        """check the snapshot holds the objects as they were at the fork"""
+        storage = FileStorage()
+        _user = User()
+        _user.first_name = "Betty"
+        members = FileStorage._FileStorage__members
+        with mock.patch.object(FileStorage, "_FileStorage__members",
+                               slow_members(members)):
+            storage.bgsave()
+        _user.first_name = "Holberton"
+        self.assertEqual("in progress", storage.bgsave_status())
+        self.assertFalse(storage.bgsave())
+        self.assertEqual("ok", storage.bgsave_status(wait=True))
+        data = self.read()["User." + _user.id]
+        self.assertEqual("Betty", data["first_name"])
+        storage.save()
+        self.assertEqual("Holberton",
+                         self.read()["User." + _user.id]["first_name"])
+
+    def test_bgsave_newer_save(self):
+        """check a save made during the background save isn't replaced"""
+        storage = FileStorage()
+        _user = User()
+        members = FileStorage._FileStorage__members
+        with mock.patch.object(FileStorage, "_FileStorage__members",
+                               slow_members(members)):
+            storage.bgsave()
+        _user2 = User()
+        storage.save()
+        self.assertEqual("ok", storage.bgsave_status(wait=True))
+        self.assertIn("User." + _user2.id, self.read())
+        self.assertFalse(os.path.exists("file.json.bgsave"))
+
+    def test_bgsave_failure(self):
+        """check a failed background save leaves the file"""
+        storage = FileStorage()
+        User()
+        with mock.patch.object(FileStorage, "_FileStorage__members",
+                               side_effect=RuntimeError("crash")), \
+                mock.patch("sys.stderr"):
+            storage.bgsave()
+            self.assertEqual("err", storage.bgsave_status(wait=True))
+        self.assertFalse(os.path.exists("file.json"))
+        self.assertFalse(os.path.exists("file.json.bgsave"))
+
+    def test_bgsave_journal(self):
+        """check the journal keeps the records written after the fork"""
+        storage = FileStorage(journal=True)
+        _user = User()
+        _user.first_name = "Betty"
+        storage.save()
+        members = FileStorage._FileStorage__members
+        with mock.patch.object(FileStorage, "_FileStorage__members",
+                               slow_members(members)):
+            storage.bgsave()
+        _user.first_name = "Holberton"
+        storage.save()
+        self.assertEqual("ok", storage.bgsave_status(wait=True))
+        data = self.read()["User." + _user.id]
+        self.assertEqual("Betty", data["first_name"])
+        with open("file.json.journal") as file:
+            lines = file.readlines()
+        self.assertEqual(1, len(lines))
+        self.assertIn("Holberton", lines[0])
+        FileStorage._FileStorage__objects = {}
+        storage.reload()
+        self.assertEqual("Holberton", storage.get(User, _user.id).first_name)
+
+
+class StorageAsyncTest(unittest.TestCase):
+    """FileStorage asyncio API test cases"""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "_file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("_file.json", "file.json")
+        except IOError:
+            pass
+
+    def test_asave(self):
+        """check asave() writes on another thread"""
+        storage = FileStorage()
+        _user = User()
+        threads = []
+        prepare = storage._prepare
+
+        def record(*args):
+            threads.append(threading.current_thread())
+            return prepare(*args)
+        with mock.patch.object(storage, "_prepare", side_effect=record):
+            asyncio.run(storage.asave())
+        self.assertEqual(1, len(threads))
+        self.assertIsNot(threading.main_thread(), threads[0])
+        with open("file.json") as file:
+            self.assertIn("User." + _user.id, json.load(file))
+
+    def test_asave_while_objects_change(self):
+        """check asave() while the event loop adds and changes objects"""
+        for format in ("json", "binary"):
+            FileStorage._FileStorage__objects = {}
+            storage = FileStorage(format=format)
+            users = []
+
+            async def main():
+                saves = [asyncio.ensure_future(storage.asave())
+                         for _ in range(20)]
+                while not all(save.done() for save in saves):
+                    for _ in range(50):
+                        _user = User()
+                        _user.first_name = str(len(users))
+                        users.append(_user)
+                    users.pop(0).delete()
+                    await asyncio.sleep(0)
+                await asyncio.gather(*saves)
+                await storage.asave()
+            asyncio.run(main())
+            FileStorage._FileStorage__objects = {}
+            storage.reload()
+            self.assertEqual({_user.id: _user.first_name for _user in users},
+                             {obj.id: obj.first_name
+                              for obj in storage.all(User).values()})
+
+    def test_asave_with_saves(self):
+        """check asave() while the event loop saves synchronously"""
+        for format in ("json", "binary"):
+            FileStorage._FileStorage__objects = {}
+            storage = FileStorage(format=format)
+            places = []
+
+            async def main():
+                saves = [asyncio.ensure_future(storage.asave())
+                         for _ in range(20)]
+                while not all(save.done() for save in saves):
+                    for _ in range(50):
+                        places.append(Place())
+                    storage.save()
+                    await asyncio.sleep(0)
+                await asyncio.gather(*saves)
+            asyncio.run(main())
+            FileStorage._FileStorage__objects = {}
+            storage.reload()
+            self.assertEqual({_place.id for _place in places},
+                             {obj.id for obj in storage.all(Place).values()})
+
+    def test_areload(self):
+        """check areload() reads the file back"""
+        storage = FileStorage()
+        _user = User()
+        storage.save()
+        FileStorage._FileStorage__objects = {}
+        asyncio.run(storage.areload())
+        self.assertEqual(_user.id, storage.get(User, _user.id).id)
+
+    def test_aall(self):
+        """check aall() yields the objects of a class"""
+        storage = FileStorage()
+        users = {User().id for _ in range(3)}
+        City()
+
+        async def collect(cls):
+            return [obj async for obj in storage.aall(cls)]
+        self.assertEqual(users, {obj.id for obj in asyncio.run(
+            collect(User))})
+        self.assertEqual(4, len(asyncio.run(collect(None))))
+
+    def test_aall_lazy(self):
+        """check aall() builds lazily loaded objects as it goes"""
+        _user = User()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        storage = FileStorage(lazy=True)
+        storage.reload()
+
+        async def first():
+            async for obj in storage.aall("User"):
+                return obj
+        self.assertEqual(_user.id, asyncio.run(first()).id)
+        self.assertIn("User." + _user.id, FileStorage._FileStorage__objects)
+
+    def test_aall_yields_control(self):
+        """check aall() lets other tasks run during a long iteration"""
+        storage = FileStorage()
+        for _ in range(250):
+            User()
+        ticks = []
+
+        async def tick():
+            while True:
+                ticks.append(len(seen))
+                await asyncio.sleep(0)
+        seen = []
+
+        async def main():
+            task = asyncio.ensure_future(tick())
+            await asyncio.sleep(0)
+            async for obj in storage.aall(User, chunk=100):
+                seen.append(obj)
+            task.cancel()
+        asyncio.run(main())
+        self.assertEqual(250, len(seen))
+        self.assertIn(100, ticks)
+        self.assertIn(200, ticks)
+
+
+class StorageParallelTest(unittest.TestCase):
+    """FileStorage parallel save test cases"""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "_file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("_file.json", "file.json")
+        except IOError:
+            pass
+
+    def test_save_parallel(self):
+        """check the workers encode a save with enough objects"""
+        storage = FileStorage(workers=2, parallel_threshold=10)
+        users = [User() for _ in range(25)]
+        users[3].first_name = "Betty"
+        with mock.patch("models.engine.parallel.encode",
+                        wraps=models.engine.parallel.encode) as encode:
+            storage.save()
+        self.assertEqual(1, encode.call_count)
+        with open("file.json") as file:
+            data = json.load(file)
+        self.assertEqual({"User." + user.id: user.to_dict()
+                          for user in users}, data)
+
+    def test_save_serial_below_threshold(self):
+        """check a save with few objects doesn't use the workers"""
+        storage = FileStorage(workers=2, parallel_threshold=10)
+        users = [User() for _ in range(25)]
+        storage.save()
+        users[0].first_name = "Betty"
+        with mock.patch("models.engine.parallel.encode") as encode:
+            storage.save()
+        encode.assert_not_called()
+        with open("file.json") as file:
+            self.assertEqual("Betty",
+                             json.load(file)["User." + users[0].id]
+                             ["first_name"])
@@ -0,0 +1,89 @@
+#!/usr/bin/python3
+"""grid_index test cases"""
+
+import unittest
+import random
+from models.engine.grid_index import GridIndex
+
+
+class GridIndexTest(unittest.TestCase):
+    """GridIndex test cases"""
+
+    def setUp(self):
+        random.seed(7)
+        self.index = GridIndex("lat", "lng", cell=2.0)
+        self.points = {}
+        for i in range(500):
+            lat = random.uniform(-90, 90)
+            lng = random.uniform(-180, 180)
+            self.points[str(i)] = (lat, lng)
+            self.index.update(str(i), lat, lng)
+
+    def brute_radius(self, lat, lng, distance):
+        """return the (distance, key) within distance by a full scan"""
+        found = [(GridIndex.distance(lat, lng, *point), key)
+                 for key, point in self.points.items()]
+        return sorted(item for item in found if item[0] <= distance)
+
+    def test_GridIndex_distance(self):
+        """check great-circle distances"""
+        self.assertAlmostEqual(0, GridIndex.distance(10, 20, 10, 20))
+        self.assertAlmostEqual(111.2, GridIndex.distance(0, 0, 1, 0), 1)
+        self.assertAlmostEqual(111.2, GridIndex.distance(0, 179.5, 0, -179.5),
+                               1)
+        self.assertAlmostEqual(20015.1, GridIndex.distance(90, 0, -90, 0), 1)
+
+    def test_GridIndex_radius(self):
+        """check radius() finds what a full scan finds"""
+        for lat, lng, distance in ((0, 0, 1500), (45, 179, 2000),
+                                   (-88, 10, 800), (30, -60, 0),
+                                   (10, 10, 30000)):
+            self.assertEqual(self.brute_radius(lat, lng, distance),
+                             self.index.radius(lat, lng, distance))
+
+    def test_GridIndex_nearest(self):
+        """check nearest() returns the k nearest keys"""
+        for lat, lng in ((0, 0), (89, -179), (-45, 180)):
+            expected = self.brute_radius(lat, lng, 30000)[:5]
+            self.assertEqual(expected, self.index.nearest(lat, lng, 5))
+        self.assertEqual(500, len(self.index.nearest(0, 0, 1000)))
+        self.assertEqual([], self.index.nearest(0, 0, 0))
+        self.assertEqual([], GridIndex("a", "b").nearest(0, 0, 3))
+
+    def test_GridIndex_within(self):
+        """check bounding boxes, across the 180th meridian too"""
+        for south, west, north, east in ((-10, -20, 10, 20),
+                                         (20, 170, 60, -170),
+                                         (-90, -180, 90, 180),
+                                         (80, 0, 90, 90)):
+            def inside(lat, lng):
+                if not south <= lat <= north:
+                    return False
+                if west <= east:
+                    return west <= lng <= east
+                return lng >= west or lng <= east
+            expected = sorted(key for key, point in self.points.items()
+                              if inside(*point))
+            self.assertEqual(expected, sorted(self.index.within(
+                south, west, north, east)))
+
+    def test_GridIndex_update_remove(self):
+        """check keys move with their position and can be removed"""
+        index = GridIndex("lat", "lng")
+        index.update("a", 10, 10)
+        index.update("a", -10, 190)
+        self.assertEqual(["a"], index.within(-11, -171, -9, -169))
+        self.assertEqual([], index.within(9, 9, 11, 11))
+        index.remove("a")
+        index.remove("a")
+        self.assertEqual(0, len(index))
+
+    def test_GridIndex_invalid_positions(self):
+        """check positions that aren't valid are not indexed"""
+        index = GridIndex("lat", "lng")
+        index.update("a", 10, 10)
+        index.update("a", "10", 10)
+        index.update("b", 91, 0)
+        index.update("c", None, None)
+        index.update("d", 0, float("inf"))
+        self.assertEqual(0, len(index))
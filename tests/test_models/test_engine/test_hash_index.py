@@ -0,0 +1,55 @@
+#!/usr/bin/python3
+"""hash_index test cases"""
+
+import unittest
+from models.engine.hash_index import HashIndex
+
+
+class HashIndexTest(unittest.TestCase):
+    """HashIndex test cases"""
+
+    def test_HashIndex_lookup(self):
+        """check lookup of indexed values"""
+        index = HashIndex("state_id")
+        index.update("City.1", "s1")
+        index.update("City.2", "s1")
+        index.update("City.3", "s2")
+        self.assertEqual({"City.1", "City.2"}, index.lookup("s1"))
+        self.assertEqual(set(), index.lookup("s3"))
+
+    def test_HashIndex_update_moves_key(self):
+        """check a new value moves the key"""
+        index = HashIndex("state_id")
+        index.update("City.1", "s1")
+        index.update("City.1", "s2")
+        self.assertEqual(set(), index.lookup("s1"))
+        self.assertEqual({"City.1"}, index.lookup("s2"))
+
+    def test_HashIndex_remove(self):
+        """check remove of indexed and unknown keys"""
+        index = HashIndex("state_id")
+        index.update("City.1", "s1")
+        index.remove("City.1")
+        index.remove("City.2")
+        self.assertEqual(set(), index.lookup("s1"))
+
+    def test_HashIndex_unhashable(self):
+        """check unhashable values are not indexed"""
+        index = HashIndex("amenity_ids")
+        index.update("Place.1", ["a1"])
+        self.assertEqual(set(), index.lookup(["a1"]))
+        index.remove("Place.1")
+
+    def test_HashIndex_lookup_copy(self):
+        """check lookup returns a copy of the keys"""
+        index = HashIndex("state_id")
+        index.update("City.1", "s1")
+        index.lookup("s1").clear()
+        self.assertEqual({"City.1"}, index.lookup("s1"))
+
+    def test_HashIndex_clear(self):
+        """check clear removes every key"""
+        index = HashIndex("state_id")
+        index.update("City.1", "s1")
+        index.clear()
+        self.assertEqual(set(), index.lookup("s1"))
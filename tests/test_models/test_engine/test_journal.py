@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+"""journal test cases"""
+
+import unittest
+import os
+from models.engine.journal import Journal
+
+
+class JournalTest(unittest.TestCase):
+    """Journal test cases"""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.remove("test.journal")
+        except IOError:
+            pass
+
+    @classmethod
+    def tearDown(self):
+        try:
+            os.remove("test.journal")
+        except IOError:
+            pass
+
+    def test_Journal_replay_missing_file(self):
+        """check replay of a journal that doesn't exist"""
+        journal = Journal("test.journal")
+        self.assertEqual([], list(journal.replay()))
+        self.assertEqual(0, journal.count)
+
+    def test_Journal_append_and_replay(self):
+        """check records are replayed in order"""
+        journal = Journal("test.journal")
+        journal.append([Journal.put("User", "1", '{"id": "1"}')])
+        journal.append([Journal.delete("User", "1")])
+        self.assertEqual(2, journal.count)
+        records = list(Journal("test.journal").replay())
+        self.assertEqual(["put", "delete"], [r["op"] for r in records])
+        self.assertEqual({"id": "1"}, records[0]["value"])
+
+    def test_Journal_append_empty(self):
+        """check appending nothing doesn't create the file"""
+        journal = Journal("test.journal")
+        journal.append([])
+        self.assertFalse(os.path.exists("test.journal"))
+
+    def test_Journal_torn_tail(self):
+        """check an incomplete last record is dropped and cut off"""
+        journal = Journal("test.journal")
+        journal.append([Journal.delete("User", "1")])
+        with open("test.journal", "a") as file:
+            file.write('{"op": "put", "cla')
+        journal = Journal("test.journal")
+        self.assertEqual(1, len(list(journal.replay())))
+        journal.append([Journal.delete("User", "2")])
+        records = list(Journal("test.journal").replay())
+        self.assertEqual(["1", "2"], [r["id"] for r in records])
+
+    def test_Journal_truncate(self):
+        """check truncate empties the journal"""
+        journal = Journal("test.journal")
+        journal.append([Journal.delete("User", "1")])
+        journal.truncate()
+        self.assertEqual(0, journal.count)
+        self.assertEqual([], list(journal.replay()))
+
+    def test_Journal_drop(self):
+        """check drop removes the records written before an offset"""
+        journal = Journal("test.journal")
+        journal.append([Journal.delete("User", "1"),
+                        Journal.delete("User", "2")])
+        size = os.path.getsize("test.journal")
+        journal.append([Journal.delete("User", "3")])
+        journal.drop(size)
+        self.assertEqual(1, journal.count)
+        records = list(Journal("test.journal").replay())
+        self.assertEqual(["3"], [r["id"] for r in records])
@@ -0,0 +1,128 @@
+#!/usr/bin/python3
+"""json_stream test cases"""
+
+import unittest
+import json
+from io import StringIO
+from models.engine.json_stream import ObjectReader, ObjectWriter
+
+
+class ObjectReaderTest(unittest.TestCase):
+    """ObjectReader test cases"""
+
+    def read(self, text, chunk_size=4):
+        """read every member of text with small chunks"""
+        return list(ObjectReader(StringIO(text), chunk_size).members())
+
+    def test_ObjectReader_empty_object(self):
+        """check an empty object"""
+        self.assertEqual([], self.read("{}"))
+        self.assertEqual([], self.read("  {\n}\n"))
+
+    def test_ObjectReader_members(self):
+        """check members are read in order with their text"""
+        data = {"User.1": {"id": "1", "name": "a {b} \"c\""},
+                "City.2": {"id": "2", "rooms": [1, 2.5, None, True]}}
+        members = self.read(json.dumps(data))
+        self.assertEqual(list(data.items()),
+                         [(key, value) for key, value, text in members])
+        for key, value, text in members:
+            self.assertEqual(value, json.loads(text))
+
+    def test_ObjectReader_spans(self):
+        """check spans locate the text of each value"""
+        text = '{"a": [1, 2],\n  "b": {"c": "d"}, "\\u00e9": 3.5}'
+        spans = list(ObjectReader(StringIO(text), 5).spans())
+        self.assertEqual(["a", "b", "\u00e9"],
+                         [key for key, k, o, n in spans])
+        for key, key_text, offset, length in spans:
+            self.assertEqual(key, json.loads(key_text))
+            self.assertEqual(json.loads(text)[key],
+                             json.loads(text[offset:offset + length]))
+
+    def test_ObjectReader_iter(self):
+        """check iterating gives (key, value) pairs"""
+        text = json.dumps({"a": 1, "b": {"c": 2}}, indent=4)
+        self.assertEqual([("a", 1), ("b", {"c": 2})],
+                         list(ObjectReader(StringIO(text), 3)))
+
+    def test_ObjectReader_number_across_chunks(self):
+        """check a number cut by a chunk boundary"""
+        members = self.read('{"a": 1234567, "b": 89}', chunk_size=9)
+        self.assertEqual([1234567, 89], [value for k, value, t in members])
+
+    def test_ObjectReader_fraction_across_chunks(self):
+        """check a number cut after its dot or exponent"""
+        text = '{"a": 3.5, "b": -1.25e+3}'
+        for chunk_size in range(1, len(text)):
+            members = self.read(text, chunk_size)
+            self.assertEqual([3.5, -1250.0],
+                             [value for k, value, t in members])
+
+    def test_ObjectReader_one_chunk(self):
+        """check a file read in a single chunk"""
+        data = {str(i): {"id": i} for i in range(100)}
+        members = self.read(json.dumps(data), chunk_size=1 << 20)
+        self.assertEqual(100, len(members))
+
+    def test_ObjectReader_not_an_object(self):
+        """check a file that doesn't hold an object"""
+        with self.assertRaises(ValueError):
+            self.read("[1, 2]")
+        with self.assertRaises(ValueError):
+            self.read("")
+
+    def test_ObjectReader_truncated(self):
+        """check a file cut in the middle of a member"""
+        with self.assertRaises(ValueError):
+            self.read('{"a": {"id": 1}, "b": {"id"')
+        with self.assertRaises(ValueError):
+            self.read('{"a": 1')
+
+    def test_ObjectReader_bad_key(self):
+        """check a member whose key isn't a string"""
+        with self.assertRaises(ValueError):
+            self.read('{1: 2}')
+
+    def test_ObjectReader_extra_data(self):
+        """check data after the object"""
+        with self.assertRaises(ValueError):
+            self.read('{"a": 1} {}')
+
+
+class ObjectWriterTest(unittest.TestCase):
+    """ObjectWriter test cases"""
+
+    def write(self, members, chunk_size=2):
+        """write members with small chunks, return the text and spans"""
+        file = StringIO()
+        writer = ObjectWriter(file, chunk_size)
+        spans = [writer.write(key, text) for key, text in members]
+        writer.close()
+        return file.getvalue(), spans
+
+    def test_ObjectWriter_empty_object(self):
+        """check an object without members"""
+        self.assertEqual("{}", self.write([])[0])
+
+    def test_ObjectWriter_members(self):
+        """check the text is the object of the members, in order"""
+        data = {"User.1": {"id": "1"}, 'a "b"\n': [1, 2.5],
+                "City.\u00e9": {"name": "F\u00e8s"}, "d": None, "e": 3}
+        for chunk_size in range(1, 7):
+            text, spans = self.write([(key, json.dumps(value))
+                                      for key, value in data.items()],
+                                     chunk_size)
+            self.assertEqual(json.dumps(data), text)
+            self.assertEqual(list(data.items()),
+                             list(ObjectReader(StringIO(text))))
+
+    def test_ObjectWriter_spans(self):
+        """check the spans locate each text in the UTF-8 file"""
+        members = [("User.\u00e9", '{"name": "F\u00e8s"}'),
+                   ("b", "[1, 2]"), ("c", '"\u2603"')]
+        text, spans = self.write(members)
+        data = text.encode("UTF8")
+        for (key, value), (offset, length) in zip(members, spans):
+            self.assertEqual(value,
+                             data[offset:offset + length].decode("UTF8"))
@@ -0,0 +1,46 @@
+#!/usr/bin/python3
+"""parallel test cases"""
+
+import unittest
+import json
+from unittest import mock
+from models.engine import parallel
+from models.engine.file_storage import FileStorage
+from models.user import User
+
+
+class ParallelTest(unittest.TestCase):
+    """parallel.encode test cases"""
+
+    @classmethod
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+
+    def test_encode_order(self):
+        """check the texts come back in the order of the objects"""
+        users = [User() for _ in range(7)]
+        texts = parallel.encode(users, 3)
+        self.assertEqual([user.to_dict() for user in users],
+                         [json.loads(text) for text in texts])
+
+    def test_encode_more_workers_than_objects(self):
+        """check a list shorter than the number of workers"""
+        users = [User()]
+        self.assertEqual([json.dumps(users[0].to_dict())],
+                         parallel.encode(users, 4))
+
+    def test_encode_without_fork(self):
+        """check the dictionaries are sent where fork isn't available"""
+        users = [User() for _ in range(5)]
+        with mock.patch("multiprocessing.get_all_start_methods",
+                        return_value=["spawn"]):
+            texts = parallel.encode(users, 2)
+        self.assertEqual([user.to_dict() for user in users],
+                         [json.loads(text) for text in texts])
+
+    def test_encode_error(self):
+        """check an object that can't be encoded raises in the caller"""
+        user = User()
+        user.data = {1, 2}
+        with self.assertRaises(TypeError):
+            parallel.encode([User(), user], 2)
@@ -0,0 +1,83 @@
+#!/usr/bin/python3
+"""text_index test cases"""
+
+import unittest
+import json
+import math
+from models.engine.text_index import TextIndex
+
+
+class TextIndexTest(unittest.TestCase):
+    """TextIndex test cases"""
+
+    def setUp(self):
+        self.index = TextIndex(["name", "description"])
+        self.index.update("a", ["Sea view", "A flat with a pool"])
+        self.index.update("b", ["Garden house", "Pool, garden and garden"])
+        self.index.update("c", ["Studio", None])
+
+    def keys(self, query):
+        """return the keys matching query, best first"""
+        return [key for score, key in self.index.search(query)]
+
+    def test_TextIndex_words(self):
+        """check texts are cut into lowercased words"""
+        self.assertEqual(["l", "été", "à", "paris_2"],
+                         TextIndex.words("L'Été à PARIS_2!"))
+
+    def test_TextIndex_and(self):
+        """check every word must be found by default"""
+        self.assertEqual(["a", "b"], sorted(self.keys("POOL")))
+        self.assertEqual(["b"], self.keys("pool garden"))
+        self.assertEqual(["b"], self.keys("pool AND garden"))
+        self.assertEqual([], self.keys("pool studio"))
+        self.assertEqual([], self.keys("unknown"))
+        self.assertEqual([], self.keys(" AND "))
+
+    def test_TextIndex_or(self):
+        """check OR matches any word and ranks the keys"""
+        self.assertEqual(["c", "b", "a"], self.keys("studio OR garden OR sea"))
+        self.assertEqual(["b", "a"], self.keys("garden OR pool"))
+
+    def test_TextIndex_ranking(self):
+        """check scores are term frequency times inverse document frequency"""
+        (score, key), = self.index.search("studio")
+        self.assertAlmostEqual(math.log(1 + 3 / 1), score)
+        self.assertEqual(["b", "a"], self.keys("pool OR garden"))
+
+    def test_TextIndex_update_remove(self):
+        """check updates replace the words of a key"""
+        version = self.index.version
+        self.index.update("a", ["Sea view", "A flat with a pool"])
+        self.assertEqual(version, self.index.version)
+        self.index.update("a", ["Loft", ""])
+        self.assertEqual(["b"], self.keys("pool"))
+        self.assertEqual(["a"], self.keys("loft"))
+        self.assertNotEqual(version, self.index.version)
+        self.index.remove("b")
+        self.index.remove("b")
+        self.assertEqual([], self.keys("pool"))
+        self.index.update("a", [None, 3])
+        self.assertEqual(1, len(self.index))
+
+    def test_TextIndex_dump_restore(self):
+        """check an index is rebuilt from its JSON dump"""
+        data = json.loads(json.dumps(self.index.dump()))
+        self.assertEqual(["a", "b", "c"], data["keys"])
+        self.assertEqual([[0, 1], [1, 1]], data["postings"]["pool"])
+        self.assertEqual([[1], [3]], data["postings"]["garden"])
+        self.assertEqual([7, 6, 1], data["lengths"])
+        index = TextIndex(["name", "description"])
+        index.restore(data)
+        self.assertEqual(self.index.search("pool OR sea"),
+                         index.search("pool OR sea"))
+        index.update("a", ["Sea view", "A flat with a pool"])
+        version = index.version
+        index.update("b", ["Garden house", ""])
+        index.remove("c")
+        self.assertNotEqual(version, index.version)
+        self.assertEqual(["a"], [key for score, key in index.search("pool")])
+        self.assertEqual(["b"], [key for score, key in index.search("house")])
+        self.assertEqual(2, len(index))
+        with self.assertRaises(ValueError):
+            TextIndex(["text"]).restore(data)
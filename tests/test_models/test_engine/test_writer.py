@@ -0,0 +1,59 @@
+#!/usr/bin/python3
+"""writer test cases"""
+
+import unittest
+import threading
+from models.engine.writer import Writer
+
+
+class WriterTest(unittest.TestCase):
+    """Writer test cases"""
+
+    def test_writer_order(self):
+        """check jobs run in order on another thread"""
+        writer = Writer()
+        done = []
+        for i in range(10):
+            writer.submit(lambda i=i: done.append(
+                (i, threading.current_thread().name)))
+        writer.wait()
+        self.assertEqual(list(range(10)), [i for i, name in done])
+        self.assertEqual({"storage writer"}, {name for i, name in done})
+        writer.close()
+
+    def test_writer_backpressure(self):
+        """check submit() blocks while the backlog is full"""
+        writer = Writer(backlog=1)
+        release = threading.Event()
+        writer.submit(release.wait)
+        writer.submit(lambda: None)
+        submitted = threading.Event()
+
+        def submit():
+            writer.submit(lambda: None)
+            submitted.set()
+        thread = threading.Thread(target=submit)
+        thread.start()
+        self.assertFalse(submitted.wait(0.05))
+        release.set()
+        self.assertTrue(submitted.wait(5))
+        thread.join()
+        writer.close()
+
+    def test_writer_error(self):
+        """check the error of a job is raised once by the next call"""
+        writer = Writer()
+
+        def fail():
+            raise OSError("disk full")
+        writer.submit(fail)
+        with self.assertRaises(OSError):
+            writer.wait()
+        writer.wait()
+        writer.submit(fail)
+        with self.assertRaises(OSError):
+            writer.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,6 +4,7 @@
 import unittest
 import os
 import models
+from unittest import mock
 from time import sleep
 from datetime import datetime
 from models.base_model import BaseModel
@@ -233,3 +234,94 @@ class PlaceToDictTest(unittest.TestCase):
 49f"]
         }
         self.assertDictEqual(place.to_dict(), td)
+
+
+class PlaceSearchTest(unittest.TestCase):
+    """Place.search() test cases"""
+
+    @classmethod
+    def setUp(self):
+        models.storage.all().clear()
+        self.places = []
+        for city_id, price, guests, rooms, bathrooms in (
+                ("c1", 80, 4, 2, 1), ("c1", 150, 6, 3, 2),
+                ("c2", 60, 2, 1, 1), ("c2", 100, 4, 2, 2)):
+            place = Place()
+            place.city_id = city_id
+            place.price_by_night = price
+            place.max_guest = guests
+            place.number_rooms = rooms
+            place.number_bathrooms = bathrooms
+            self.places.append(place)
+
+    @classmethod
+    def tearDown(self):
+        models.storage.all().clear()
+
+    def ids(self, *indexes):
+        """return the set of the ids of places"""
+        return {self.places[i].id for i in indexes}
+
+    def test_Place_search_all(self):
+        """check search() without criteria returns every place"""
+        self.assertEqual(self.ids(0, 1, 2, 3), set(Place.search()))
+
+    def test_Place_search_criteria(self):
+        """check every criterion is applied"""
+        self.assertEqual(self.ids(0, 2, 3), set(Place.search(max_price=100)))
+        self.assertEqual(self.ids(0, 3), set(Place.search(max_price=100,
+                                                          min_guests=3)))
+        self.assertEqual(self.ids(1, 3), set(Place.search(min_rooms=2,
+                                                          min_bathrooms=2)))
+        self.assertEqual(self.ids(0), set(Place.search(city_id="c1",
+                                                       max_price=100)))
+        self.assertEqual([], Place.search(city_id="c3"))
+
+    def test_Place_search_follows_changes(self):
+        """check search() sees updated and deleted places"""
+        self.places[1].price_by_night = 90
+        self.places[0].delete()
+        self.assertEqual(self.ids(1), set(Place.search(city_id="c1",
+                                                       max_price=100)))
+
+    def test_Place_search_without_numpy(self):
+        """check the pure Python path gives the same places"""
+        with mock.patch("models.engine.column_store.numpy", None):
+            self.assertEqual(self.ids(0, 3), set(Place.search(max_price=100,
+                                                              min_guests=3)))
+            self.assertEqual(self.ids(0), set(Place.search(city_id="c1",
+                                                           max_price=100)))
+
+
+class PlaceSpatialTest(unittest.TestCase):
+    """Place.near() and Place.within() test cases"""
+
+    @classmethod
+    def setUp(self):
+        models.storage.all().clear()
+        self.places = {}
+        for name, lat, lng in (("casa", 33.57, -7.59), ("rabat", 34.02, -6.84),
+                               ("paris", 48.86, 2.35)):
+            place = Place()
+            place.latitude = lat
+            place.longitude = lng
+            self.places[name] = place.id
+
+    @classmethod
+    def tearDown(self):
+        models.storage.all().clear()
+
+    def test_Place_near(self):
+        """check near() returns the k nearest places, nearest first"""
+        self.assertEqual([self.places["rabat"], self.places["casa"]],
+                         Place.near(34.0, -6.9, 2))
+        self.assertEqual([self.places["paris"]], Place.near(50, 3))
+
+    def test_Place_within(self):
+        """check within() a radius and within a box"""
+        self.assertEqual([self.places["casa"], self.places["rabat"]],
+                         Place.within(33.5, -7.5, 150))
+        self.assertEqual({self.places["casa"], self.places["rabat"]},
+                         set(Place.within(30, -10, 35, -5)))
+        with self.assertRaises(TypeError):
+            Place.within(1, 2)